@@ -2,7 +2,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib import rc
 import seaborn as sns
-import os
+from src.services.food_table import read_table, stage_path
 
 # -----------------------------
 # 한글 깨짐 방지
@@ -20,8 +20,8 @@ pd.set_option('display.width', 200)      # 출력 폭 조절
 # -----------------------------
 # 1. 엑셀 파일 불러오기
 # -----------------------------
-DATA_PATH = os.path.join("src", "data", "cleaned_food_db.xlsx")
-food_db = pd.read_excel(DATA_PATH)
+DATA_PATH = stage_path("cleaned")
+food_db = read_table(DATA_PATH)
 
 # -----------------------------
 # 2. 기본 정보 확인
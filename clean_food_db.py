@@ -1,28 +1,16 @@
 import pandas as pd
 import numpy as np
-import os
 import re
+from src.services.food_table import read_table, write_table, stage_path
 
 # -----------------------------
 # 1. 파일 경로 설정
 # -----------------------------
-INPUT_PATH = os.path.join("src", "data", "combined_food_db.xlsx")
-OUTPUT_PATH = os.path.join("src", "data", "cleaned_food_db.xlsx")
+INPUT_PATH = stage_path("combined")
+OUTPUT_PATH = stage_path("cleaned")
 
 # -----------------------------
-# 2. 데이터 불러오기
-# -----------------------------
-food_df = pd.read_excel(INPUT_PATH)
-print(f"✅ 원본 데이터 로드 완료: {food_df.shape}")
-
-# -----------------------------
-# 3. 결측치 처리 (영양소 NaN → 0)
-# -----------------------------
-nutrient_cols = ['energy_kcal', 'protein_g', 'fat_g', 'carb_g', 'fiber_g', 'sugar_g', 'sodium_mg']
-food_df[nutrient_cols] = food_df[nutrient_cols].fillna(0)
-
-# -----------------------------
-# 4. serving_size 정제 ("200g" → 200)
+# serving_size 정제 ("200g" → 200)
 # -----------------------------
 def extract_number(value):
     if pd.isna(value):
@@ -30,10 +18,9 @@ def extract_number(value):
     match = re.search(r'(\d+\.?\d*)', str(value))
     return float(match.group(1)) if match else np.nan
 
-food_df['serving_size_g'] = food_df['serving_size'].apply(extract_number)
 
 # -----------------------------
-# 5. 100g 결측치 처리 (냉면 등 총중량 보정)
+# 100g 결측치 처리 (냉면 등 총중량 보정)
 # -----------------------------
 def estimate_serving(row):
     name = str(row['food_name'])
@@ -64,37 +51,64 @@ def estimate_serving(row):
     # 추정 불가 → 그대로 유지
     return size if pd.notna(size) else 100.0, pd.isna(size) or size == 100.0
 
-food_df[['serving_size_g', 'is_estimated']] = food_df.apply(lambda r: pd.Series(estimate_serving(r)), axis=1)
 
-# -----------------------------
-# 6. category_detail 정제 ("해당없음" → NaN)
-# -----------------------------
-food_df['category_detail'] = food_df['category_detail'].replace('해당없음', np.nan)
+def clean_food_db(input_path: str = INPUT_PATH, output_path: str = OUTPUT_PATH) -> str:
+    """통합 DB 정제: 영양소 결측 0, 1회 제공량(g) 추출/추정, 칼로리 이상치 제거"""
+    # -----------------------------
+    # 2. 데이터 불러오기
+    # -----------------------------
+    food_df = read_table(input_path)
+    print(f"✅ 원본 데이터 로드 완료: {food_df.shape}")
 
-# -----------------------------
-# 7. 이상치 제거 (칼로리 10,000 kcal 이상)
-# -----------------------------
-before = food_df.shape[0]
-food_df = food_df[food_df['energy_kcal'] < 10000]
-after = food_df.shape[0]
-print(f"⚙️ 칼로리 이상치 제거: {before - after}개 항목 제거됨")
+    # -----------------------------
+    # 3. 결측치 처리 (영양소 NaN → 0)
+    # -----------------------------
+    nutrient_cols = ['energy_kcal', 'protein_g', 'fat_g', 'carb_g', 'fiber_g', 'sugar_g', 'sodium_mg']
+    food_df[nutrient_cols] = food_df[nutrient_cols].fillna(0)
 
-# -----------------------------
-# 8. 정렬 및 컬럼 순서 정리
-# -----------------------------
-cols_order = [
-    'food_code', 'food_name',
-    'category_large', 'category_medium', 'category_small', 'category_detail',
-    'energy_kcal', 'protein_g', 'fat_g', 'carb_g', 'fiber_g', 'sugar_g', 'sodium_mg',
-    'serving_size', 'serving_size_g', 'is_estimated',
-    'food_origin', 'data_type', 'source', 'company'
-]
-food_df = food_df[cols_order].sort_values(['category_large', 'category_medium', 'food_name']).reset_index(drop=True)
+    # -----------------------------
+    # 4. serving_size 정제 ("200g" → 200)
+    # -----------------------------
+    food_df['serving_size_g'] = food_df['serving_size'].apply(extract_number)
 
-# -----------------------------
-# 9. 저장
-# -----------------------------
-os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-food_df.to_excel(OUTPUT_PATH, index=False)
-print(f"✅ 정제된 데이터 저장 완료: {OUTPUT_PATH}")
-print(f"✅ 최종 데이터 크기: {food_df.shape}")
+    # -----------------------------
+    # 5. 100g 결측치 처리 (냉면 등 총중량 보정)
+    # -----------------------------
+    food_df[['serving_size_g', 'is_estimated']] = food_df.apply(lambda r: pd.Series(estimate_serving(r)), axis=1)
+
+    # -----------------------------
+    # 6. category_detail 정제 ("해당없음" → NaN)
+    # -----------------------------
+    food_df['category_detail'] = food_df['category_detail'].replace('해당없음', np.nan)
+
+    # -----------------------------
+    # 7. 이상치 제거 (칼로리 10,000 kcal 이상)
+    # -----------------------------
+    before = food_df.shape[0]
+    food_df = food_df[food_df['energy_kcal'] < 10000]
+    after = food_df.shape[0]
+    print(f"⚙️ 칼로리 이상치 제거: {before - after}개 항목 제거됨")
+
+    # -----------------------------
+    # 8. 정렬 및 컬럼 순서 정리
+    # -----------------------------
+    cols_order = [
+        'food_code', 'food_name',
+        'category_large', 'category_medium', 'category_small', 'category_detail',
+        'energy_kcal', 'protein_g', 'fat_g', 'carb_g', 'fiber_g', 'sugar_g', 'sodium_mg',
+        'serving_size', 'serving_size_g', 'is_estimated',
+        'food_origin', 'data_type', 'source', 'company'
+    ]
+    food_df = food_df[cols_order].sort_values(['category_large', 'category_medium', 'food_name']).reset_index(drop=True)
+
+    # -----------------------------
+    # 9. 저장
+    # -----------------------------
+    output_path = write_table(food_df, output_path)
+    print(f"✅ 정제된 데이터 저장 완료: {output_path}")
+    print(f"✅ 최종 데이터 크기: {food_df.shape}")
+    return output_path
+
+
+if __name__ == "__main__":
+    clean_food_db()
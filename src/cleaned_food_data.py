@@ -1,9 +1,9 @@
-import pandas as pd
+from src.services.food_table import read_table, stage_path
 
 # --------------------------------------------
 # 파일 로드
 # --------------------------------------------
-df = pd.read_excel("src/data/cleaned_food_db.xlsx")
+df = read_table(stage_path("cleaned"))
 
 # "해당없음"을 결측치처럼 처리
 df = df.replace("해당없음", "")
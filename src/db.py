@@ -1,6 +1,6 @@
 # src/db.py
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, ForeignKey, UniqueConstraint, inspect
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, ForeignKey, UniqueConstraint, Index, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 
@@ -35,8 +35,49 @@ class Food(Base):
     weight = Column(Float, default=100.0)
     glycemic_index = Column(Float, default=50.0)
     processing_level = Column(Integer, default=1)
+    fdc_id = Column(Integer, nullable=True, unique=True, index=True)  # USDA FoodData Central ID (USDA 임포트 행만)
+    # 오프라인 파이프라인 모델 기반 군집/점수 (저장 시 food_scorer가 채움)
+    category_cluster = Column(Integer, nullable=True)
+    nutrition_cluster = Column(Integer, nullable=True)
+    health_score = Column(Float, nullable=True)
+    ml_health_score = Column(Float, nullable=True)
+    hybrid_health_score = Column(Float, nullable=True)
     __table_args__ = (UniqueConstraint('name', 'company', name='_name_company_uc'),)
 
+# ----------------------
+# 식단 플래너용 음식 풀 (오프라인 파이프라인 산출물을 적재, 100g 기준)
+# ----------------------
+class PlannerFood(Base):
+    __tablename__ = "planner_foods"
+    id = Column(Integer, primary_key=True)
+    food_id = Column(Integer, ForeignKey("foods.id"), index=True, nullable=True)  # 같은 음식의 foods 행 (이름 기준 연결)
+    food_name = Column(String, index=True, nullable=False)
+    company = Column(String, default="해당없음")
+    energy_kcal = Column(Float, default=0.0)
+    protein_g = Column(Float, default=0.0)
+    fat_g = Column(Float, default=0.0)
+    carb_g = Column(Float, default=0.0)
+    fiber_g = Column(Float, nullable=True)
+    sugar_g = Column(Float, nullable=True)
+    sodium_mg = Column(Float, nullable=True)
+    serving_size_g = Column(Float, default=100.0)
+    serving_min_g = Column(Float, default=50.0)
+    serving_max_g = Column(Float, default=300.0)
+    is_flexible = Column(Integer, default=0)
+    glycemic_index = Column(Float, default=50.0)
+    processing_level = Column(Integer, default=1)
+    category_cluster = Column(Integer, nullable=True)
+    nutrition_cluster = Column(Integer, nullable=True)
+    health_score = Column(Float, default=60.0)
+    ml_health_score = Column(Float, default=60.0)
+    hybrid_health_score = Column(Float, nullable=True)
+    # 적재 시 MealPlanner 규칙으로 미리 계산 (시작 시 이름 분류 생략)
+    is_meal_candidate = Column(Integer, default=1)
+    role = Column(String, default="misc")          # main | protein | side | misc
+    carb_source = Column(String, default="none")
+    protein_source = Column(String, default="none")
+    __table_args__ = (Index("ix_planner_foods_pool", "is_meal_candidate"),)
+
 # ----------------------
 # User 모델
 # ----------------------
@@ -163,6 +204,48 @@ class DailyHealthScore(Base):
     balance_score = Column(Float, default=0.0)
     total_score = Column(Float, default=0.0)
 
+# ----------------------
+# 주간 / 월간 롤업 (일일 요약·점수의 누적합, 증분 갱신)
+# ----------------------
+class _UserRollupColumns:
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
+    period = Column(String, nullable=False)          # 주간 'YYYY-Www' / 월간 'YYYY-MM'
+    period_start = Column(Date, nullable=False)      # 주 시작(월요일) / 월 1일
+
+    # 섭취 (DailyNutritionSummary)
+    nut_days = Column(Integer, default=0)
+    kcal_sum = Column(Float, default=0.0)
+    protein_g_sum = Column(Float, default=0.0)
+    fat_g_sum = Column(Float, default=0.0)
+    carb_g_sum = Column(Float, default=0.0)
+    sodium_mg_sum = Column(Float, default=0.0)
+    processed_ratio_sum = Column(Float, default=0.0)
+
+    # 운동 (DailyExerciseSummary)
+    ex_days = Column(Integer, default=0)
+    active_ex_days = Column(Integer, default=0)      # duration_min > 0 인 날
+    duration_min_sum = Column(Float, default=0.0)
+    calories_burned_sum = Column(Float, default=0.0)
+    avg_intensity_sum = Column(Float, default=0.0)
+
+    # 점수 (DailyHealthScore)
+    score_days = Column(Integer, default=0)
+    total_score_sum = Column(Float, default=0.0)
+    nutrition_score_sum = Column(Float, default=0.0)
+    exercise_score_sum = Column(Float, default=0.0)
+    balance_score_sum = Column(Float, default=0.0)
+
+
+class WeeklyUserRollup(_UserRollupColumns, Base):
+    __tablename__ = "weekly_user_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "period", name="_weekly_rollup_uc"),)
+
+
+class MonthlyUserRollup(_UserRollupColumns, Base):
+    __tablename__ = "monthly_user_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "period", name="_monthly_rollup_uc"),)
+
 # ----------------------
 # 운동 추천 기록 (AI 루틴)
 # ----------------------
@@ -180,6 +263,98 @@ class UserExerciseRec(Base):
     completed = Column(Boolean, default=False)     # 수행 여부
     created_at = Column(Date, nullable=False)
 
+# ----------------------
+# LLM 응답 캐시 (Gemini)
+# ----------------------
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+    key = Column(String, primary_key=True)              # sha256(model + 정규화 프롬프트 + 생성 옵션)
+    endpoint = Column(String, index=True, nullable=False)
+    model = Column(String, nullable=False)
+    response = Column(String, nullable=False)           # 응답 텍스트
+    created_at = Column(Float, nullable=False)          # epoch seconds
+    expires_at = Column(Float, index=True, nullable=False)
+
+# ----------------------
+# USDA 검색 응답 캐시 (결과 없음도 저장)
+# ----------------------
+class UsdaQueryCache(Base):
+    __tablename__ = "usda_query_cache"
+    query = Column(String, primary_key=True)            # 정규화된 검색어 + pageSize
+    response = Column(String, nullable=True)            # 원본 JSON (결과 없음이면 NULL)
+    hit_count = Column(Integer, default=0)              # 응답 foods 개수
+    fetched_at = Column(Float, nullable=False)          # epoch seconds
+    expires_at = Column(Float, nullable=False)
+
+# ----------------------
+# 음식 궁합 학습 누적 카운트 (food_pair_trainer 증분 학습)
+# ----------------------
+class FoodSingleCount(Base):
+    __tablename__ = "food_single_counts"
+    food_name = Column(String, primary_key=True)
+    count = Column(Integer, default=0)                  # 등장한 끼니 수
+
+
+class FoodPairCount(Base):
+    __tablename__ = "food_pair_counts"
+    food_a = Column(String, primary_key=True)           # food_a <= food_b
+    food_b = Column(String, primary_key=True, index=True)
+    count_ab = Column(Integer, default=0)               # 함께 등장한 끼니 수
+    pmi = Column(Float, nullable=True)                  # 노이즈 필터 미통과 시 NULL
+    lift = Column(Float, nullable=True)
+    score = Column(Float, nullable=True)
+
+
+class FoodPairTrainerState(Base):
+    __tablename__ = "food_pair_trainer_state"
+    log_path = Column(String, primary_key=True)
+    offset = Column(Integer, default=0)                 # 처리 완료한 바이트 위치
+    n_meals = Column(Integer, default=0)                # 누적 끼니 수 (PMI의 N)
+    refresh_meals = Column(Integer, default=0)          # 마지막 전체 PMI 재계산 시점의 N
+    updated_at = Column(Float, nullable=True)           # epoch seconds
+
+# ----------------------
+# 사용자별 음식 선호 (별점 EMA, user_preference_updater)
+# ----------------------
+class UserFoodPreference(Base):
+    __tablename__ = "user_food_prefs"
+    user_id = Column(String, primary_key=True)          # PK (user_id, food_name) → 사용자별 조회 인덱스
+    food_name = Column(String, primary_key=True)
+    ema_score = Column(Float, nullable=False)           # 0~100
+    count = Column(Integer, default=1)                  # 평가 횟수
+    updated_ts = Column(Integer, nullable=False)        # epoch seconds
+
+# ----------------------
+# 음식/식단 만족도 피드백 (추가 전용 로그 + 사용자·음식별 집계)
+# ----------------------
+class UserFeedback(Base):
+    __tablename__ = "user_feedback"
+    id = Column(Integer, primary_key=True, autoincrement=True)   # 기록 순서
+    user_id = Column(String, index=True, nullable=True)
+    food_name = Column(String, nullable=True)
+    rating = Column(Float, nullable=True)               # 1~5
+    payload = Column(String, nullable=False)            # 요청 원문 + timestamp (JSON)
+    created_at = Column(String, nullable=False)         # ISO timestamp
+
+
+class UserFoodFeedback(Base):
+    __tablename__ = "user_food_feedback"
+    user_id = Column(String, primary_key=True)          # PK (user_id, food_name) → 사용자별 조회 인덱스
+    food_name = Column(String, primary_key=True)
+    rating_count = Column(Integer, default=0)
+    rating_sum = Column(Float, default=0.0)
+    last_rating = Column(Float, nullable=False)
+    last_feedback_id = Column(Integer, index=True, nullable=False)  # 최신 평가의 user_feedback.id
+
+# ----------------------
+# 음식명 번역 저장소 (영문 → 한글)
+# ----------------------
+class Translation(Base):
+    __tablename__ = "translations"
+    source = Column(String, primary_key=True)           # 원문 (영문 음식명)
+    target = Column(String, nullable=False)             # 번역 (한글)
+    origin = Column(String, default="googletrans")      # seed | googletrans
+
 # ----------------------
 # DB 초기화
 # ----------------------
@@ -189,6 +364,22 @@ def init_db():
     # Food 테이블 확인
     if not inspector.has_table("foods"):
         Food.__table__.create(bind=engine)
+    else:
+        # 기존 DB: 이후 추가된 컬럼 보충 (USDA FDC ID, 군집/점수)
+        existing = {c["name"] for c in inspector.get_columns("foods")}
+        added = {
+            "fdc_id": "INTEGER",
+            "category_cluster": "INTEGER",
+            "nutrition_cluster": "INTEGER",
+            "health_score": "FLOAT",
+            "ml_health_score": "FLOAT",
+            "hybrid_health_score": "FLOAT",
+        }
+        with engine.begin() as conn:
+            for col, ddl in added.items():
+                if col not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE foods ADD COLUMN {col} {ddl}")
+            conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_foods_fdc_id ON foods (fdc_id)")
 
     # ----------------------
     # 삭제 후 재생성할 테이블 리스트
@@ -212,3 +403,32 @@ def init_db():
     if not inspector.has_table("user_exercise_recs"):
         UserExerciseRec.__table__.create(bind=engine)
 
+    # 주간/월간 롤업 (비어 있으면 main에서 일일 테이블 기준으로 백필)
+    for table in [WeeklyUserRollup, MonthlyUserRollup]:
+        if not inspector.has_table(table.__tablename__):
+            table.__table__.create(bind=engine)
+
+    if not inspector.has_table("llm_response_cache"):
+        LLMResponseCache.__table__.create(bind=engine)
+
+    if not inspector.has_table("translations"):
+        Translation.__table__.create(bind=engine)
+
+    if not inspector.has_table("usda_query_cache"):
+        UsdaQueryCache.__table__.create(bind=engine)
+
+    # 음식 궁합 증분 학습 상태
+    for table in [FoodSingleCount, FoodPairCount, FoodPairTrainerState]:
+        if not inspector.has_table(table.__tablename__):
+            table.__table__.create(bind=engine)
+
+    for table in [UserFeedback, UserFoodFeedback]:
+        if not inspector.has_table(table.__tablename__):
+            table.__table__.create(bind=engine)
+
+    if not inspector.has_table("user_food_prefs"):
+        UserFoodPreference.__table__.create(bind=engine)
+
+    # 플래너 음식 풀 (food_pipeline의 load_db 단계가 채움)
+    if not inspector.has_table("planner_foods"):
+        PlannerFood.__table__.create(bind=engine)
@@ -1,24 +1,19 @@
-import pandas as pd
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
 import numpy as np
+from src.services.food_table import read_table, write_table, stage_path
 
 # --------------------------------------------
 # 파일 경로
 # --------------------------------------------
-input_path = "src/data/cleaned_food_db.xlsx"
-output_path = "src/data/extended_food_db_clustered_stage1.xlsx"
+input_path = stage_path("cleaned")
+output_path = stage_path("clustered_stage1")
 
-# --------------------------------------------
-# 1️⃣ 데이터 로드
-# --------------------------------------------
-print("📂 Loading dataset...")
-df = pd.read_excel(input_path)
-print(f"✅ Loaded {len(df):,} rows and {len(df.columns)} columns")
+CATEGORY_COLS = ["category_large", "category_medium", "category_small", "category_main", "category_function"]
 
 # --------------------------------------------
-# 2️⃣ 기능성 + 카테고리 확장
+# 1️⃣ 기능성 + 카테고리 확장
 # --------------------------------------------
 def map_main(x):
     x = str(x)
@@ -47,11 +42,8 @@ def infer_function(row):
         return "기타 특수영양식품"
     return "일반식품"
 
-df["category_main"] = df["category_large"].apply(map_main)
-df["category_function"] = df.apply(infer_function, axis=1)
-
 # --------------------------------------------
-# 3️⃣ 최적 k 탐색 함수 (Elbow + Silhouette)
+# 2️⃣ 최적 k 탐색 함수 (Elbow + Silhouette)
 # --------------------------------------------
 def find_optimal_k(data, k_min=15, k_max=30, min_sil=0.1):
     inertias, silhouettes = [], []
@@ -70,25 +62,37 @@ def find_optimal_k(data, k_min=15, k_max=30, min_sil=0.1):
     return final_k
 
 # --------------------------------------------
-# 4️⃣ 1차 군집화 (카테고리 중심)
+# 3️⃣ 1차 군집화 (카테고리 중심)
 # --------------------------------------------
-print("🔧 Running category-based clustering (Stage 1)...")
+def cluster_categories(input_path: str = input_path, output_path: str = output_path) -> str:
+    """정제 DB → category_main / category_function / category_cluster 추가"""
+    print("📂 Loading dataset...")
+    df = read_table(input_path)
+    print(f"✅ Loaded {len(df):,} rows and {len(df.columns)} columns")
 
-encoded_df = df[["category_large", "category_medium", "category_small", "category_main", "category_function"]].copy()
-for col in encoded_df.columns:
-    encoded_df[col] = LabelEncoder().fit_transform(encoded_df[col].astype(str))
+    df["category_main"] = df["category_large"].apply(map_main)
+    df["category_function"] = df.apply(infer_function, axis=1)
 
-scaled_cat = StandardScaler().fit_transform(encoded_df)
+    print("🔧 Running category-based clustering (Stage 1)...")
 
-print("🔍 Finding optimal number of clusters between 15–30...")
-opt_k_cat = find_optimal_k(scaled_cat, k_min=15, k_max=30)
+    encoded_df = df[CATEGORY_COLS].copy()
+    for col in encoded_df.columns:
+        encoded_df[col] = LabelEncoder().fit_transform(encoded_df[col].astype(str))
 
-df["category_cluster"] = KMeans(n_clusters=opt_k_cat, random_state=42, n_init=10).fit_predict(scaled_cat)
+    scaled_cat = StandardScaler().fit_transform(encoded_df)
 
-# --------------------------------------------
-# 5️⃣ 저장
-# --------------------------------------------
-df.to_excel(output_path, index=False)
-print(f"✅ Stage 1 clustering saved: {output_path}")
-print(f"Category clusters: {opt_k_cat}")
-print(f"현재 단계에서는 영양 기반 군집화는 수행하지 않습니다.")
+    print("🔍 Finding optimal number of clusters between 15–30...")
+    opt_k_cat = find_optimal_k(scaled_cat, k_min=15, k_max=30)
+
+    df["category_cluster"] = KMeans(n_clusters=opt_k_cat, random_state=42, n_init=10).fit_predict(scaled_cat)
+
+    # 저장
+    output_path = write_table(df, output_path)
+    print(f"✅ Stage 1 clustering saved: {output_path}")
+    print(f"Category clusters: {opt_k_cat}")
+    print(f"현재 단계에서는 영양 기반 군집화는 수행하지 않습니다.")
+    return output_path
+
+
+if __name__ == "__main__":
+    cluster_categories()
@@ -1,16 +1,17 @@
 # src/load_food_data.py
 import os
+import time
 import pandas as pd
 import src.db as db
-
-# DB 초기화
-db.init_db()
+from src.services.food_scorer import SCORE_COLS, score_foods
 
 # 현재 파일 기준 data 디렉토리
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 FILE_FOOD = os.path.join(DATA_DIR, "food_db.xlsx")
 FILE_PROCESSED = os.path.join(DATA_DIR, "processed_food_db.xlsx")
 
+BULK_BATCH_SIZE = int(os.getenv("FOOD_BULK_BATCH_SIZE", "50000"))   # executemany 1회당 행 수
+
 # 매핑 테이블에 '식품중량' 추가 ✅
 MAPPING = {
     "식품명": "name",
@@ -24,70 +25,141 @@ MAPPING = {
     "식품중량": "weight",  # ✅ 추가된 부분
     "업체명": "company"
 }
+NUMERIC_COLS = ["calories", "carbs", "protein", "fat", "fiber", "sugar", "sodium"]
+# glycemic_index / processing_level은 ORM 기본값과 동일하게 채움
+INSERT_COLS = ["name", "company"] + NUMERIC_COLS + ["weight", "glycemic_index", "processing_level"]
+
+
+# ----------------------
+# 1️⃣ 원본 읽기 + 정제 (컬럼 단위)
+# ----------------------
+def read_source(filepath: str) -> pd.DataFrame:
+    """매핑 대상 컬럼만 한 번에 읽기 (xlsx / csv / parquet)"""
+    wanted = lambda c: c in MAPPING  # noqa: E731
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".parquet":
+        df = pd.read_parquet(filepath)
+        df = df[[c for c in df.columns if wanted(c)]]
+    elif ext == ".csv":
+        df = pd.read_csv(filepath, usecols=wanted)
+    else:
+        df = pd.read_excel(filepath, usecols=wanted)
+    return df.rename(columns=MAPPING)
 
-def safe_float(val):
-    try:
-        return float(val) if pd.notna(val) else 0.0
-    except Exception:
-        return 0.0
 
-def parse_weight(val):
+def parse_weight(s: pd.Series) -> pd.Series:
     """
-    "900g", "100 g" 같은 문자열 처리 후 float 반환
+    "900g", "100 g" 같은 문자열 처리 후 float 반환 (변환 불가/결측은 0.0)
     """
-    if pd.isna(val):
-        return 0.0
-    val_str = str(val).strip().lower().replace("g", "").replace(" ", "")
-    try:
-        return float(val_str)
-    except ValueError:
-        return 0.0
-
-def load_excel_to_db(filepath: str):
-    df = pd.read_excel(filepath)
-
-    # 매핑 가능한 컬럼만 필터링
-    available_mapping = {k: v for k, v in MAPPING.items() if k in df.columns}
-    df = df[list(available_mapping.keys())].rename(columns=available_mapping)
-
-    session = db.SessionLocal()
-    existing_names = {(f.name, f.company) for f in session.query(db.Food).all()}
-    count = 0
-
-    for idx, (_, row) in enumerate(df.iterrows(), 1):
-        name = str(row["name"]).strip()
-        company = str(row.get("company") or "해당없음").strip()
-        key = (name, company)
-        counter = 1
-        while key in existing_names:
-            name_candidate = f"{row['name']}_{counter}"
-            key = (name_candidate, company)
+    s = s.astype(str).str.strip().str.lower().str.replace("g", "", regex=False).str.replace(" ", "", regex=False)
+    return pd.to_numeric(s, errors="coerce").fillna(0.0)
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame(index=df.index)
+    out["name"] = df["name"].astype(str).str.strip()
+    company = df["company"] if "company" in df.columns else pd.Series(pd.NA, index=df.index)
+    out["company"] = company.fillna("").astype(str).str.strip().replace("", "해당없음")
+    for col in NUMERIC_COLS:
+        out[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0) if col in df.columns else 0.0
+    out["weight"] = parse_weight(df["weight"]) if "weight" in df.columns else 0.0
+    out["glycemic_index"] = 50.0
+    out["processing_level"] = 1
+    return out[out["name"].ne("") & out["name"].ne("nan")]
+
+
+# ----------------------
+# 2️⃣ 이름 중복 처리 (벡터화)
+# ----------------------
+def dedupe_names(df: pd.DataFrame, existing: set) -> pd.DataFrame:
+    """
+    (name, company)가 DB 또는 파일 안에서 겹치면 name_1, name_2 ... 로 변경.
+    n번째 중복 = 파일 내 순번 + (DB에 이미 있으면 1). 접미사가 다시 겹치는 드문 경우만 개별 처리.
+    """
+    keys = list(zip(df["name"], df["company"]))
+    in_db = pd.Series([k in existing for k in keys], index=df.index, dtype=int)
+    n = df.groupby(["name", "company"], sort=False).cumcount() + in_db
+
+    df = df.copy()
+    base_names = df["name"].copy()
+    df.loc[n > 0, "name"] = base_names[n > 0] + "_" + n[n > 0].astype(str)
+
+    # 예: 원본에 "라면_1"이 따로 있거나 DB에 이미 "라면_1"이 있는 경우
+    taken = set(existing)
+    clash = df.duplicated(["name", "company"]) | pd.Series(
+        [k in existing for k in zip(df["name"], df["company"])], index=df.index
+    )
+    taken.update(zip(df["name"][~clash], df["company"][~clash]))
+    for idx in df.index[clash]:
+        base, company = base_names[idx], df.at[idx, "company"]
+        counter, name = int(n[idx]) + 1, df.at[idx, "name"]
+        while (name, company) in taken:
+            name = f"{base}_{counter}"
             counter += 1
-        name = key[0]
-        existing_names.add(key)
-
-        food = db.Food(
-            name=name,
-            company=company,
-            calories=safe_float(row.get("calories")),
-            carbs=safe_float(row.get("carbs")),
-            protein=safe_float(row.get("protein")),
-            fat=safe_float(row.get("fat")),
-            fiber=safe_float(row.get("fiber")),
-            sugar=safe_float(row.get("sugar")),
-            sodium=safe_float(row.get("sodium")),
-            weight=parse_weight(row.get("weight")),  # ✅ 수정된 부분
-        )
-        session.add(food)
-        count += 1
-
-        if idx % 1000 == 0:
-            session.commit()
-
-    session.commit()
-    session.close()
-    print(f"{count}개 새 데이터 저장 완료: {os.path.basename(filepath)}")
+        df.at[idx, "name"] = name
+        taken.add((name, company))
+    return df
+
+
+# ----------------------
+# 3️⃣ 일괄 INSERT (단일 트랜잭션, 인덱스 지연 생성)
+# ----------------------
+def bulk_insert_foods(df: pd.DataFrame, batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    foods의 보조 인덱스(ix_foods_*)를 내리고 executemany로 일괄 삽입한 뒤 같은 DDL로 다시 생성.
+    SQLite DDL도 트랜잭션에 포함되므로 실패 시 인덱스까지 원상 복구.
+    (name, company) 유니크 제약은 dedupe_names로 이미 보장.
+    군집/점수 컬럼(SCORE_COLS)이 df에 있으면 함께 저장.
+    """
+    cols = INSERT_COLS + [c for c in SCORE_COLS if c in df.columns]
+    sql = f"INSERT INTO foods ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+    rows = df[cols]
+
+    with db.engine.begin() as conn:
+        indexes = conn.exec_driver_sql(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = 'foods' AND sql IS NOT NULL"
+        ).fetchall()
+        for name, _ in indexes:
+            conn.exec_driver_sql(f'DROP INDEX "{name}"')
+
+        for start in range(0, len(rows), batch_size):
+            chunk = rows.iloc[start:start + batch_size]
+            conn.exec_driver_sql(sql, list(chunk.itertuples(index=False, name=None)))
+
+        for _, ddl in indexes:
+            conn.exec_driver_sql(ddl)
+    return len(rows)
+
+
+def load_excel_to_db(filepath: str) -> int:
+    t0 = time.perf_counter()
+    df = prepare_frame(read_source(filepath))
+    t_read = time.perf_counter() - t0
+
+    with db.engine.connect() as conn:
+        existing = set(conn.exec_driver_sql("SELECT name, company FROM foods").fetchall())
+    df = dedupe_names(df, existing)
+
+    # ORM 이벤트를 거치지 않으므로 군집/점수는 여기서 한 번에 계산 (아티팩트 없으면 생략)
+    scores = score_foods(df)
+    if scores is not None:
+        df = df.join(scores)
+
+    t1 = time.perf_counter()
+    count = bulk_insert_foods(df)
+    t_insert = time.perf_counter() - t1
+    total = time.perf_counter() - t0
+
+    rate = count / t_insert if t_insert > 0 else float("inf")
+    print(
+        f"{count}개 새 데이터 저장 완료: {os.path.basename(filepath)} "
+        f"(읽기 {t_read:.2f}s, 삽입 {t_insert:.2f}s, 전체 {total:.2f}s, {rate:,.0f} rows/s)"
+    )
+    return count
 
 if __name__ == "__main__":
+    # DB 초기화
+    db.init_db()
     load_excel_to_db(FILE_FOOD)
     load_excel_to_db(FILE_PROCESSED)
@@ -1,6 +1,12 @@
 # src/main.py
 from fastapi import FastAPI
-from src.db import init_db
+from src.db import init_db, SessionLocal
+from src.services.rollup_store import ensure_backfilled
+from src.services.gemini_client import purge_expired
+from src.services.llm_json import parse_metrics
+from src.services.translation_store import seed_from_food_db
+from src.services.food_scorer import register_food_scoring
+from src.services.user_context import register_context_invalidation
 from src.routers import food, user, exercise, recommendation
 from dotenv import load_dotenv
 import os
@@ -48,6 +54,25 @@ app = FastAPI(title="Diet AI API")
 # DB 초기화
 init_db()
 
+# 주간/월간 롤업 백필 (최초 1회)
+_session = SessionLocal()
+try:
+    ensure_backfilled(_session)
+finally:
+    _session.close()
+
+# 만료된 LLM 응답 캐시 정리
+purge_expired()
+
+# 번역 저장소에 기존 한글 음식명 등록
+seed_from_food_db()
+
+# 새 음식 저장 시 영양 군집/건강 점수 자동 배정
+register_food_scoring()
+
+# 프로필/인바디 변경 commit 후 사용자 문맥 캐시 무효화
+register_context_invalidation()
+
 # 라우터 등록
 app.include_router(food.router, prefix="/food")
 app.include_router(user.router, prefix="/user")
@@ -67,6 +92,11 @@ app.include_router(exercise_feedback.router)
 app.include_router(home_feedback_router)
 app.include_router(home.router) 
 
+# LLM 응답 JSON 파싱 지표 (엔드포인트별 direct / extracted / schema_invalid / no_json)
+@app.get("/metrics/llm_parse", tags=["Metrics"])
+def llm_parse_metrics():
+    return parse_metrics()
+
 
 if __name__ == "__main__":
     import uvicorn
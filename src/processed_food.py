@@ -1,15 +1,12 @@
 import os
 import pandas as pd
+from src.services.food_table import read_table, write_table, stage_path
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
 food_db_path = os.path.join(DATA_DIR, "food_db.xlsx")
 processed_food_db_path = os.path.join(DATA_DIR, "processed_food_db.xlsx")
-output_path = os.path.join(DATA_DIR, "combined_food_db.xlsx")
-
-# 엑셀 불러오기
-food_db = pd.read_excel(food_db_path)
-processed_food_db = pd.read_excel(processed_food_db_path)
+output_path = stage_path("combined")
 
 # 2. 필요한 컬럼 정의 및 이름 통일
 food_columns = {
@@ -37,30 +34,42 @@ processed_food_columns = food_columns.copy()
 # processed_food_db에는 '업체명' 대신 '제조사명'과 '수입업체명' 사용
 processed_food_columns.pop("업체명")  # 기존 '업체명' 제거
 
-# 3. processed_food_db에서 company 컬럼 생성
-processed_food_db["제조사명"] = processed_food_db["제조사명"].fillna("해당없음")
-processed_food_db["수입업체명"] = processed_food_db["수입업체명"].fillna("해당없음")
-processed_food_db["company"] = processed_food_db.apply(
-    lambda row: row["제조사명"] if row["제조사명"] != "해당없음" else row["수입업체명"],
-    axis=1
-)
 
-# 4. 필요한 컬럼만 선택 및 이름 변경
-food_db_processed = food_db[list(food_columns.keys())].rename(columns=food_columns)
-processed_food_db_processed = processed_food_db[list(processed_food_columns.keys()) + ["company"]].rename(
-    columns=processed_food_columns
-)
+def combine_food_db(
+    food_path: str = food_db_path,
+    processed_path: str = processed_food_db_path,
+    out_path: str = output_path,
+) -> str:
+    """식품 DB + 가공식품 DB → 공통 컬럼으로 통합 (식품코드 기준 중복 제거)"""
+    # 원본 불러오기 (같은 이름의 Parquet 변환본이 있으면 그쪽을 읽음)
+    food_db = read_table(food_path)
+    processed_food_db = read_table(processed_path)
+
+    # 3. processed_food_db에서 company 컬럼 생성
+    processed_food_db["제조사명"] = processed_food_db["제조사명"].fillna("해당없음")
+    processed_food_db["수입업체명"] = processed_food_db["수입업체명"].fillna("해당없음")
+    processed_food_db["company"] = processed_food_db["제조사명"].where(
+        processed_food_db["제조사명"] != "해당없음", processed_food_db["수입업체명"]
+    )
+
+    # 4. 필요한 컬럼만 선택 및 이름 변경
+    food_db_processed = food_db[list(food_columns.keys())].rename(columns=food_columns)
+    processed_food_db_processed = processed_food_db[list(processed_food_columns.keys()) + ["company"]].rename(
+        columns=processed_food_columns
+    )
+
+    # 5. 두 DB 합치기
+    combined_db = pd.concat([food_db_processed, processed_food_db_processed], ignore_index=True)
+
+    # 6. 중복 제거 (식품코드 기준)
+    combined_db = combined_db.drop_duplicates(subset="food_code")
 
-# 5. 두 DB 합치기
-combined_db = pd.concat([food_db_processed, processed_food_db_processed], ignore_index=True)
+    # 7. src/data 경로에 저장 (Parquet, FOOD_PIPELINE_EXCEL=1이면 Excel 사본도)
+    output_file = write_table(combined_db, out_path)
 
-# 6. 중복 제거 (식품코드 기준)
-combined_db = combined_db.drop_duplicates(subset="food_code")
+    print(f"통합 DB가 '{output_file}'로 생성되었습니다.")
+    return output_file
 
-# 7. src/data 경로에 저장
-data_dir = os.path.join("src", "data")
-os.makedirs(data_dir, exist_ok=True)
-output_file = os.path.join(data_dir, "combined_food_db.xlsx")
-combined_db.to_excel(output_file, index=False)
 
-print(f"통합 DB가 '{output_file}'로 생성되었습니다.")
+if __name__ == "__main__":
+    combine_food_db()
@@ -1,23 +1,13 @@
 # src/routers/analytics.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
-import matplotlib.pyplot as plt
-import io
 from fastapi.responses import StreamingResponse, JSONResponse
 from src import db
-import matplotlib
-import os
-matplotlib.use("Agg") 
-from matplotlib import font_manager, rc
-font_path = "C:/Windows/Fonts/malgun.ttf"  # Windows: 맑은 고딕
-if not os.path.exists(font_path):
-    # Windows 폰트 없을 때 대체
-    font_path = font_manager.findfont("DejaVu Sans")
-
-font_prop = font_manager.FontProperties(fname=font_path)
-rc("font", family=font_prop.get_name())
-plt.rcParams["axes.unicode_minus"] = False
+from src.services.chart_renderer import ChartTimeout, get_chart_png, png_stream
+from src.services.timeseries import calorie_balance_series, downsample
+from src.services.rollup_query import rollup
+from src.services.rollup_store import get_rollup, rollup_averages
 
 router = APIRouter(tags=["Analytics"])
 
@@ -79,44 +69,48 @@ def get_weekly_trend(user_id: str, session: Session = Depends(get_db)):
     today = date.today()
     start = today - timedelta(days=6)
 
-    # 최근 7일 데이터 조회
-    rows_nut = (
-        session.query(db.DailyNutritionSummary)
-        .filter(db.DailyNutritionSummary.user_id == user_id)
-        .filter(db.DailyNutritionSummary.date >= start)
-        .all()
-    )
-    rows_ex = (
-        session.query(db.DailyExerciseSummary)
-        .filter(db.DailyExerciseSummary.user_id == user_id)
-        .filter(db.DailyExerciseSummary.date >= start)
-        .all()
-    )
-
-    if not rows_nut and not rows_ex:
+    # 최근 7일 섭취/소모를 날짜별로 조인 (단일 쿼리)
+    days, kcal_in, kcal_out = calorie_balance_series(session, user_id, start)
+    if not days:
         raise HTTPException(status_code=404, detail="No data in last 7 days")
+    days = [date.fromisoformat(d) for d in days]
+
+    spec = {
+        "figsize": [9, 5],
+        "title": f"{user_id} — 최근 7일 칼로리 트렌드",
+        "xlabel": "날짜",
+        "ylabel": "kcal",
+        "series": [
+            {"x": days, "y": kcal_in, "label": "섭취 칼로리 (kcal)"},
+            {"x": days, "y": kcal_out, "label": "운동 소모 칼로리 (kcal)"},
+        ],
+        "fill_between": [0, 1],
+        "legend": True,
+        "grid": {"alpha": 0.3},
+    }
+    try:
+        png = get_chart_png("analytics_weekly", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
 
-    # 날짜별 매핑
-    days = sorted(list({r.date for r in rows_nut + rows_ex}))
-    kcal_in = [next((r.kcal for r in rows_nut if r.date == d), 0) for d in days]
-    kcal_out = [next((r.calories_burned for r in rows_ex if r.date == d), 0) for d in days]
-
-    plt.figure(figsize=(9, 5))
-    plt.plot(days, kcal_in, marker="o", label="섭취 칼로리 (kcal)")
-    plt.plot(days, kcal_out, marker="o", label="운동 소모 칼로리 (kcal)")
-    plt.fill_between(days, kcal_in, kcal_out, color="lightgray", alpha=0.3)
-    plt.title(f"{user_id} — 최근 7일 칼로리 트렌드")
-    plt.xlabel("날짜")
-    plt.ylabel("kcal")
-    plt.legend()
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+# ----------------------------------------------------------
+# 2️⃣-1 주간 트렌드 JSON (섭취 vs 소모, 정렬된 배열)
+# ----------------------------------------------------------
+@router.get("/analytics/weekly/{user_id}/series", response_class=JSONResponse)
+def get_weekly_trend_series(user_id: str, days: int = 7, max_points: int | None = Query(None, ge=3), session: Session = Depends(get_db)):
+    start = date.today() - timedelta(days=days - 1)
+    dates, kcal_in, kcal_out = calorie_balance_series(session, user_id, start)
+    if not dates:
+        raise HTTPException(status_code=404, detail=f"No data in last {days} days")
+
+    dates, kcal_in, kcal_out = downsample(dates, kcal_in, kcal_out, max_points=max_points)
+    return JSONResponse(content={
+        "user_id": user_id,
+        "dates": dates,
+        "kcal_in": kcal_in,
+        "kcal_out": kcal_out,
+    })
 
 # ----------------------------------------------------------
 # 3️⃣ 월간 통계 요약 (평균값 JSON)
@@ -125,31 +119,40 @@ def get_weekly_trend(user_id: str, session: Session = Depends(get_db)):
 def get_monthly_average(user_id: str, session: Session = Depends(get_db)):
     today = date.today()
     start = today.replace(day=1) - timedelta(days=30)
-    rows = (
-        session.query(db.DailyNutritionSummary)
-        .filter(db.DailyNutritionSummary.user_id == user_id)
-        .filter(db.DailyNutritionSummary.date >= start)
-        .all()
-    )
+    row = rollup(
+        session, db.DailyNutritionSummary, user_id, start,
+        avg=["kcal", "protein_g", "fat_g", "carb_g"],
+    )[0]
 
-    if not rows:
+    if not row.days:
         raise HTTPException(status_code=404, detail="No monthly data")
 
-    avg_kcal = sum(r.kcal for r in rows) / len(rows)
-    avg_prot = sum(r.protein_g for r in rows) / len(rows)
-    avg_fat = sum(r.fat_g for r in rows) / len(rows)
-    avg_carb = sum(r.carb_g for r in rows) / len(rows)
-
     return JSONResponse(
         content={
             "user_id": user_id,
             "period": f"{start} ~ {today}",
             "average": {
-                "kcal": round(avg_kcal, 1),
-                "protein_g": round(avg_prot, 1),
-                "fat_g": round(avg_fat, 1),
-                "carb_g": round(avg_carb, 1),
+                "kcal": round(row.avg_kcal or 0.0, 1),
+                "protein_g": round(row.avg_protein_g or 0.0, 1),
+                "fat_g": round(row.avg_fat_g or 0.0, 1),
+                "carb_g": round(row.avg_carb_g or 0.0, 1),
             },
-            "days_counted": len(rows),
+            "days_counted": row.days,
         }
     )
+
+
+# ----------------------------------------------------------
+# 4️⃣ 주간 / 월간 롤업 조회 (단일 행 lookup)
+# ----------------------------------------------------------
+@router.get("/analytics/rollup/{period}/{user_id}", response_class=JSONResponse)
+def get_period_rollup(period: str, user_id: str, day: date | None = None, session: Session = Depends(get_db)):
+    """day(기본: 오늘)가 속한 ISO 주 / 달의 평균 섭취·운동·점수"""
+    if period not in ("weekly", "monthly"):
+        raise HTTPException(status_code=400, detail="period must be 'weekly' or 'monthly'")
+
+    row = get_rollup(session, user_id, period, day)
+    if not row:
+        raise HTTPException(status_code=404, detail=f"No {period} rollup data")
+
+    return JSONResponse(content={"user_id": user_id, **rollup_averages(row)})
@@ -1,10 +1,13 @@
 # src/routers/chat_coach.py
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from src import db
 from datetime import date, timedelta
-import os, requests, json
+import os, json
 from src.services.coach import build_weekly_coach_report
+from src.services.user_context import get_user_context
+from src.services.gemini_client import GeminiError, generate_text, stream_text
 
 router = APIRouter(tags=["AI Coach Chat"])
 
@@ -12,8 +15,6 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise RuntimeError("Gemini API key not set in .env")
 
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
-
 def get_db():
     session = db.SessionLocal()
     try:
@@ -22,55 +23,38 @@ def get_db():
         session.close()
 
 # ---------------------------------------------------------------
-# 💬 AI 코치 대화 (건강점수 + 리포트 기반)
+# 🧩 코치 프롬프트 + 데이터 문맥 구성 (일반 / 스트리밍 공용)
 # ---------------------------------------------------------------
-@router.post("/chat/coach", response_model=dict)
-def chat_with_coach(user_id: str, message: str, session: Session = Depends(get_db)):
-    """
-    AI가 최근 점수, 건강 리포트, 인바디, 식단/운동 통계를 종합해 문맥형 답변 제공.
-    """
+def _build_coach_prompt(user_id: str, message: str, session: Session):
+    """(Gemini 프롬프트, 응답에 함께 내려줄 context dict)"""
 
     # -----------------------
     # 1️⃣ 유저 정보
     # -----------------------
-    user = session.query(db.User).filter_by(id=user_id).first()
-    if not user:
+    ctx = get_user_context(user_id, session)
+    if ctx is None:
         raise HTTPException(status_code=404, detail="User not found")
+    user = ctx.profile
 
     # -----------------------
-    # 2️⃣ 주간 리포트 / 점수
+    # 2️⃣ 주간 리포트 / 점수 (같은 스냅샷 재사용)
     # -----------------------
-    report = build_weekly_coach_report(user_id, session)
+    report = build_weekly_coach_report(user_id, session, ctx)
     metrics = report.get("metrics", {})
     score = metrics.get("health_score", None)
 
     # 최근 점수 트렌드 (3일치)
-    scores = (
-        session.query(db.DailyHealthScore)
-        .filter_by(user_id=user_id)
-        .order_by(db.DailyHealthScore.date.desc())
-        .limit(3)
-        .all()
-    )
-    score_text = ""
-    if scores:
-        score_text = " / ".join([f"{s.date.strftime('%m-%d')} : {s.total_score:.1f}" for s in reversed(scores)])
-        latest_score = scores[0].total_score
-    else:
-        latest_score = None
+    scores = ctx.latest_scores(3)
+    score_text = " / ".join([f"{s.date.strftime('%m-%d')} : {s.total_score:.1f}" for s in scores])
+    latest_score = ctx.latest_score
 
     # -----------------------
     # 3️⃣ 최신 인바디 (선택)
     # -----------------------
-    latest_inbody = (
-        session.query(db.BodyCompLog)
-        .filter_by(user_id=user_id)
-        .order_by(db.BodyCompLog.date.desc())
-        .first()
-    )
+    bc = ctx.body_comp
     inbody_str = (
-        f"체중 {latest_inbody.weight_kg}kg, 체지방률 {latest_inbody.body_fat_pct}%, 골격근량 {latest_inbody.smm_kg}kg"
-        if latest_inbody else "인바디 데이터 없음"
+        f"체중 {bc['weight_kg']}kg, 체지방률 {bc['body_fat_pct']}%, 골격근량 {bc['smm_kg']}kg"
+        if bc else "인바디 데이터 없음"
     )
 
     # -----------------------
@@ -81,9 +65,9 @@ def chat_with_coach(user_id: str, message: str, session: Session = Depends(get_d
 아래 데이터를 참고해 사용자에게 정확하고 친절하게 대답하세요.
 
 [사용자 프로필]
-- 이름: {user.name}, 나이: {user.age}, 성별: {user.sex}
-- 목표: {user.goal}
-- 활동계수: {user.activity_level}
+- 이름: {user["name"]}, 나이: {user["age"]}, 성별: {user["sex"]}
+- 목표: {user["goal"]}
+- 활동계수: {user["activity_level"]}
 - 최신 인바디: {inbody_str}
 
 [최근 건강 점수 요약]
@@ -106,25 +90,69 @@ def chat_with_coach(user_id: str, message: str, session: Session = Depends(get_d
 
     user_prompt = f"사용자 질문: {message}"
 
-    payload = {
-        "contents": [{"parts": [{"text": f"{system_prompt}\n\n{user_prompt}"}]}]
+    context = {
+        "latest_score": latest_score,
+        "weekly_score": score,
+        "avg_protein": metrics.get("avg_protein"),
+        "exercise_days": metrics.get("exercise_days")
     }
+    return f"{system_prompt}\n\n{user_prompt}", context
 
-    headers = {"Content-Type": "application/json", "X-goog-api-key": GEMINI_API_KEY}
-    response = requests.post(GEMINI_URL, headers=headers, json=payload)
-    if response.status_code != 200:
-        raise HTTPException(status_code=500, detail=f"Gemini API error: {response.text}")
 
-    raw_text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+# ---------------------------------------------------------------
+# 💬 AI 코치 대화 (건강점수 + 리포트 기반)
+# ---------------------------------------------------------------
+@router.post("/chat/coach", response_model=dict)
+def chat_with_coach(user_id: str, message: str, session: Session = Depends(get_db)):
+    """
+    AI가 최근 점수, 건강 리포트, 인바디, 식단/운동 통계를 종합해 문맥형 답변 제공.
+    """
+    prompt, context = _build_coach_prompt(user_id, message, session)
+
+    try:
+        raw_text = generate_text(prompt, endpoint="chat_coach")
+    except GeminiError as e:
+        raise HTTPException(status_code=500, detail=f"Gemini API error: {e.text}")
 
     return {
         "user_id": user_id,
         "question": message,
         "ai_reply": raw_text,
-        "context": {
-            "latest_score": latest_score,
-            "weekly_score": score,
-            "avg_protein": metrics.get("avg_protein"),
-            "exercise_days": metrics.get("exercise_days")
-        }
+        "context": context
     }
+
+
+# ---------------------------------------------------------------
+# 📡 AI 코치 대화 (스트리밍, Server-Sent Events)
+# ---------------------------------------------------------------
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/coach/stream")
+def chat_with_coach_stream(user_id: str, message: str, session: Session = Depends(get_db)):
+    """
+    /chat/coach와 같은 프롬프트를 streamGenerateContent로 호출해 SSE로 전달.
+    이벤트 순서: context(데이터 문맥) → chunk(텍스트 조각)... → done | error
+    """
+    prompt, context = _build_coach_prompt(user_id, message, session)
+
+    def events():
+        yield _sse("context", {"user_id": user_id, "question": message, "context": context})
+        try:
+            for text in stream_text(prompt, endpoint="chat_coach"):
+                yield _sse("chunk", {"text": text})
+        except GeminiError as e:
+            yield _sse("error", {"detail": f"Gemini API error: {e.text}"})
+            return
+        except Exception as e:
+            # 응답 헤더가 이미 나간 뒤라 HTTP 상태로 알릴 수 없음 → 마지막 error 이벤트로 종료
+            yield _sse("error", {"detail": f"stream failed: {type(e).__name__}"})
+            return
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
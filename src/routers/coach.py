@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from src import db
 from src.services.coach import build_weekly_coach_report
+from src.services.user_context import get_user_context
 from datetime import date
 import json
 
@@ -17,11 +18,11 @@ def get_db():
 
 @router.get("/coach/weekly_report/{user_id}", response_model=dict)
 def get_weekly_coach_report(user_id: str, session: Session = Depends(get_db)):
-    user = session.query(db.User).filter_by(id=user_id).first()
-    if not user:
+    ctx = get_user_context(user_id, session)
+    if ctx is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    report = build_weekly_coach_report(user_id, session)
+    report = build_weekly_coach_report(user_id, session, ctx)
 
     # DB 저장 (코치노트 기록)
     note = db.CoachNote(
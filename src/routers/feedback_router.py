@@ -1,8 +1,8 @@
 from fastapi import APIRouter
-import os, json, datetime
+from src.services.feedback_store import append_feedback
+from src.services.preference_cache import invalidate_user
 
 router = APIRouter(tags=["Feedback"])
-FEEDBACK_PATH = os.path.join("src", "data", "user_feedback.json")
 
 @router.post("/feedback/rate")
 def rate_feedback(payload: dict):
@@ -16,21 +16,8 @@ def rate_feedback(payload: dict):
         "comment": "조합이 괜찮아요"
     }
     """
-    os.makedirs(os.path.dirname(FEEDBACK_PATH), exist_ok=True)
-    feedback = {
-        "timestamp": datetime.datetime.now().isoformat(),
-        **payload
-    }
-
-    # 기존 피드백 로드
-    data = []
-    if os.path.exists(FEEDBACK_PATH):
-        with open(FEEDBACK_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-    # 새 피드백 추가
-    data.append(feedback)
-    with open(FEEDBACK_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
+    # 추가 전용 기록 + 사용자·음식별 집계 증분 갱신 (파일 전체 재작성 없음)
+    feedback = append_feedback(payload)
+    if feedback.get("user_id"):
+        invalidate_user(feedback["user_id"])  # 다음 식단 요청부터 바로 반영
     return {"message": "Feedback saved successfully", "feedback": feedback}
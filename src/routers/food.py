@@ -2,40 +2,22 @@ from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from src import db
-from src.usda_api import search_usda_food
+from src.services.usda_import import import_usda_foods
 from src.schemas import FoodOut, MealLogOut, MealItemOut
 import os
 import json
-import re
 import requests
 from dotenv import load_dotenv
 from datetime import datetime
 from typing import List,  Optional
 # 맨 위에 추가
 from src.services.summary import recompute_daily_summaries
+from src.services.gemini_client import GeminiError
+from src.services.llm_json import LLMParseError, generate_json
 import hashlib
 from io import BytesIO
 from PIL import Image
-# ⬇️ import 블록 바로 아래에 추가
-from googletrans import Translator
-translator = Translator()
-_translate_cache = {}
-
-def ko(name_en: str) -> str:
-    if not name_en:
-        return name_en
-    try:
-        if name_en in _translate_cache:
-            return _translate_cache[name_en]
-        txt = translator.translate(name_en, src="en", dest="ko").text
-        _translate_cache[name_en] = txt
-        return txt
-    except Exception:
-        # 번역 실패 시 영어 그대로 반환
-        return name_en
-
-
-
+from src.services.translation_store import ko, translate_batch
 
 
 load_dotenv()
@@ -58,7 +40,22 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise RuntimeError("Gemini API key not set in .env")
 
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+# 사진 음식 추정 응답 스키마 (100g 기준 영양 + 사진 속 총량)
+PHOTO_FOOD_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "name": {"type": "STRING"},
+        "calories": {"type": "NUMBER"},
+        "carbs": {"type": "NUMBER"},
+        "protein": {"type": "NUMBER"},
+        "fat": {"type": "NUMBER"},
+        "weight": {"type": "NUMBER"},
+        "total_weight": {"type": "NUMBER"},
+        "total_calories": {"type": "NUMBER"},
+    },
+    "required": ["name", "calories", "carbs", "protein", "fat"],
+}
+PHOTO_FOODS_SCHEMA = {"type": "ARRAY", "items": PHOTO_FOOD_SCHEMA}
 
 # ----------------------
 # Azure Computer Vision 설정
@@ -83,22 +80,10 @@ def search_food(name: str, session: Session = Depends(get_db)):
     if results:
         return results
 
-    usda_data = search_usda_food(name)
-    if usda_data and "foods" in usda_data:
-        added_foods = []
-        for item in usda_data["foods"]:
-            food = db.Food(
-                name=item.get("description"),
-                calories=item.get("foodNutrients", [{}])[0].get("value", 0),
-                carbs=0,
-                protein=0,
-                fat=0,
-                company="해당없음",
-                weight=100.0  # ✅ 기본값
-            )
-            session.add(food)
-            added_foods.append(food)
-        session.commit()
+    added_foods = import_usda_foods(session, name)
+    if added_foods:
+        # 한글명 미리 번역 (대기 없이 백그라운드)
+        translate_batch((f.name for f in added_foods), timeout=0)
         return added_foods
 
     return [{"name": name, "direct_input_needed": True}]
@@ -151,11 +136,12 @@ async def upload_food(file: UploadFile = File(...), session: Session = Depends(g
     existing_foods = session.query(db.Food).filter_by(company=img_hash).all()
     if existing_foods:
         print(f"[CACHE HIT] 동일 이미지 해시: {img_hash}")
+        names_ko = translate_batch(f.name for f in existing_foods)
         return {
             "ai_result": [
               {
                 "name_en": f.name,
-                "name_ko": ko(f.name),
+                "name_ko": names_ko.get(f.name, f.name),
                 "calories": f.calories,
                 "carbs": f.carbs,
                 "protein": f.protein,
@@ -279,28 +265,16 @@ async def upload_food(file: UploadFile = File(...), session: Session = Depends(g
         """
 
 
-    # 6️⃣ Gemini 호출
-    headers = {"Content-Type": "application/json", "X-goog-api-key": GEMINI_API_KEY}
-    payload = {"contents": [{"parts": [{"text": prompt}]}]}
-    gemini_response = requests.post(GEMINI_URL, headers=headers, json=payload)
-    if gemini_response.status_code != 200:
-        raise HTTPException(status_code=500, detail=f"Gemini API failed: {gemini_response.text}")
-
-    raw_text = gemini_response.json().get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-    if not raw_text:
-        raise HTTPException(status_code=400, detail="Gemini returned empty response")
-
-    # 7️⃣ JSON 파싱 (단일 or 다중)
-    json_match = re.search(r"```json\s*(\[.*?\]|\{.*?\})\s*```", raw_text, re.DOTALL)
-    fallback_match = re.search(r"(\[.*\]|\{.*\})", raw_text, re.DOTALL)
-    json_text = json_match.group(1) if json_match else (fallback_match.group(1) if fallback_match else None)
-    if not json_text:
-        raise HTTPException(status_code=400, detail="Gemini result could not be parsed")
-
+    # 6️⃣ Gemini 호출 + 7️⃣ JSON 파싱 (단일 or 다중, 스키마 검증)
+    schema = PHOTO_FOODS_SCHEMA if len(object_names) > 1 else PHOTO_FOOD_SCHEMA
     try:
-        result = json.loads(json_text)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Gemini JSON parsing failed")
+        result = generate_json(prompt, endpoint="food_photo", schema=schema)
+    except GeminiError as e:
+        if e.status_code == 200:
+            raise HTTPException(status_code=400, detail="Gemini returned empty response")
+        raise HTTPException(status_code=500, detail=f"Gemini API failed: {e.text}")
+    except LLMParseError:
+        raise HTTPException(status_code=400, detail="Gemini result could not be parsed")
 
     # 8️⃣ DB 저장 (다중 음식 지원)
     saved_foods = []
@@ -347,11 +321,12 @@ async def upload_food(file: UploadFile = File(...), session: Session = Depends(g
     
 
 
+    names_ko = translate_batch(f.name for f in saved_foods)
     return {
     "ai_result": [
         {
             "name": f.name,
-            "name_ko": ko(f.name),
+            "name_ko": names_ko.get(f.name, f.name),
             "calories": f.calories,
             "carbs": f.carbs,
             "protein": f.protein,
@@ -569,23 +544,13 @@ async def add_food_to_meal(
                 - Do not use a fixed serving size (like 350g); base it on the photo.
                 """
 
-            headers = {"Content-Type": "application/json", "X-goog-api-key": GEMINI_API_KEY}
-            payload = {"contents": [{"parts": [{"text": prompt}]}]}
-            gemini_response = requests.post(GEMINI_URL, headers=headers, json=payload)
-            if gemini_response.status_code != 200:
-                raise HTTPException(status_code=500, detail=f"Gemini API failed: {gemini_response.text}")
-
-            raw_text = gemini_response.json().get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-            json_match = re.search(r"```json\s*(\[.*?\]|\{.*?\})\s*```", raw_text, re.DOTALL)
-            fallback_match = re.search(r"(\[.*\]|\{.*\})", raw_text, re.DOTALL)
-            json_text = json_match.group(1) if json_match else (fallback_match.group(1) if fallback_match else None)
-            if not json_text:
-                raise HTTPException(status_code=400, detail="Gemini result could not be parsed")
-
+            schema = PHOTO_FOODS_SCHEMA if len(objects) > 1 else PHOTO_FOOD_SCHEMA
             try:
-                result = json.loads(json_text)
-            except:
-                raise HTTPException(status_code=400, detail="Gemini JSON parsing failed")
+                result = generate_json(prompt, endpoint="food_photo", schema=schema)
+            except GeminiError as e:
+                raise HTTPException(status_code=500, detail=f"Gemini API failed: {e.text}")
+            except LLMParseError:
+                raise HTTPException(status_code=400, detail="Gemini result could not be parsed")
 
             # 6️⃣ DB 저장 (다중 음식 지원)
             if isinstance(result, list):
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from src import db
 from src.services.home_feedback_service import generate_home_feedback
+from src.services.user_context import get_user_context
 
 router = APIRouter(tags=["Home"])
 
@@ -17,9 +18,9 @@ def get_db():
 
 @router.get("/home/feedback/{user_id}", response_model=dict)
 def home_feedback(user_id: str, session: Session = Depends(get_db)):
-    user = session.query(db.User).filter_by(id=user_id).first()
-    if not user:
+    ctx = get_user_context(user_id, session)
+    if ctx is None:
         return {"error": "User not found"}
 
-    result = generate_home_feedback(user_id, session)
+    result = generate_home_feedback(user_id, session, ctx)
     return result
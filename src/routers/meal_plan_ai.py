@@ -1,14 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from src import db
 from src.services.meal_planner import MealPlanner
 from src.services import nutrition
-import os
 from src.services.meal_logger import append_meal_log
+from src.services.chart_renderer import ChartTimeout, get_chart_png, png_stream
 
 router = APIRouter(tags=["AI Healthy Meal Plan"])
-planner = MealPlanner()  # 하루 + 주간 모두 처리
 
 # -----------------------
 # DB 세션
@@ -20,6 +19,12 @@ def get_db():
     finally:
         session.close()
 
+# -----------------------
+# 요청별 플래너 (궁합 인덱스/음식 풀은 공유 캐시, 사용자 선호는 plan_day에서 요청 사용자 기준으로 로드)
+# -----------------------
+def get_planner() -> MealPlanner:
+    return MealPlanner()
+
 # -----------------------
 # 사용자별 칼로리/매크로 계산
 # -----------------------
@@ -42,7 +47,7 @@ def _calc_targets(user):
 # 하루 식단 생성
 # -----------------------
 @router.get("/generate_daily_plan", response_model=dict)
-def generate_daily_plan(user_id: str, meals_per_day: int = 3, session: Session = Depends(get_db)):
+def generate_daily_plan(user_id: str, meals_per_day: int = 3, session: Session = Depends(get_db), planner: MealPlanner = Depends(get_planner)):
     """일간 식단 생성 (AI 품질 기반)"""
     
     user = session.query(db.User).filter_by(id=user_id).first()
@@ -63,7 +68,7 @@ def generate_daily_plan(user_id: str, meals_per_day: int = 3, session: Session =
 # 주간 식단 생성
 # -----------------------
 @router.get("/generate_weekly_plan", response_model=dict)
-def generate_weekly_plan(user_id: str, meals_per_day: int = 3, days: int = 7, session: Session = Depends(get_db)):
+def generate_weekly_plan(user_id: str, meals_per_day: int = 3, days: int = 7, session: Session = Depends(get_db), planner: MealPlanner = Depends(get_planner)):
     """7일치 AI 품질 기반 주간 식단 생성"""
     user = session.query(db.User).filter_by(id=user_id).first()
     if not user:
@@ -100,10 +105,8 @@ def generate_weekly_plan(user_id: str, meals_per_day: int = 3, days: int = 7, se
 # 주간 식단 시각화 (선택)
 # -----------------------
 @router.get("/visualize_weekly_plan")
-def visualize_weekly_plan(user_id: str, meals_per_day: int = 3, days: int = 7, session: Session = Depends(get_db)):
+def visualize_weekly_plan(user_id: str, meals_per_day: int = 3, days: int = 7, session: Session = Depends(get_db), planner: MealPlanner = Depends(get_planner)):
     """주간 식단을 그래프로 시각화 (PNG 반환)"""
-    import matplotlib.pyplot as plt
-
     user = session.query(db.User).filter_by(id=user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -111,31 +114,37 @@ def visualize_weekly_plan(user_id: str, meals_per_day: int = 3, days: int = 7, s
     # 하루 단위 식단 반복 생성
     week_data = [planner.plan_day(user, meals_per_day, _calc_targets) for _ in range(days)]
 
-    days_range = range(1, days + 1)
+    days_range = list(range(1, days + 1))
     kcal = [day["actual_daily"]["kcal"] for day in week_data]
     protein = [day["actual_daily"]["protein_g"] for day in week_data]
     fat = [day["actual_daily"]["fat_g"] for day in week_data]
     carb = [day["actual_daily"]["carb_g"] for day in week_data]
     quality = [day.get("avg_quality", 0) for day in week_data]
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(days_range, kcal, label="Calories (kcal)", marker="o")
-    plt.plot(days_range, protein, label="Protein (g)", marker="o")
-    plt.plot(days_range, fat, label="Fat (g)", marker="o")
-    plt.plot(days_range, carb, label="Carbs (g)", marker="o")
-    plt.plot(days_range, quality, label="Quality Score", marker="*")
-    plt.title("Weekly Nutrition Trend")
-    plt.xlabel("Day")
-    plt.ylabel("Amount")
-    plt.legend()
-    plt.grid(True)
-
-    os.makedirs("outputs", exist_ok=True)
-    output_path = "outputs/weekly_plan_chart.png"
-    plt.savefig(output_path, dpi=200, bbox_inches="tight")
-    plt.close()
-
-    if not os.path.exists(output_path):
-        raise HTTPException(status_code=500, detail="Visualization failed")
-
-    return FileResponse(output_path, media_type="image/png", filename="weekly_plan_chart.png")
+    spec = {
+        "figsize": [10, 6],
+        "title": "Weekly Nutrition Trend",
+        "xlabel": "Day",
+        "ylabel": "Amount",
+        "series": [
+            {"x": days_range, "y": kcal, "label": "Calories (kcal)"},
+            {"x": days_range, "y": protein, "label": "Protein (g)"},
+            {"x": days_range, "y": fat, "label": "Fat (g)"},
+            {"x": days_range, "y": carb, "label": "Carbs (g)"},
+            {"x": days_range, "y": quality, "label": "Quality Score", "marker": "*"},
+        ],
+        "legend": True,
+        "grid": {"visible": True},
+        "tight": False,
+        "savefig": {"dpi": 200, "bbox_inches": "tight"},
+    }
+    # 요청마다 독립된 in-memory PNG (공유 파일 outputs/weekly_plan_chart.png 사용 안 함)
+    try:
+        png = get_chart_png("weekly_plan", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(
+        png_stream(png),
+        media_type="image/png",
+        headers={"Content-Disposition": 'attachment; filename="weekly_plan_chart.png"'},
+    )
@@ -4,9 +4,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from src import db
 from src.services import nutrition
-from src.services.ai_meal_generator_gemini import generate_realistic_meal_plan
+from src.services.meal_plan_orchestrator import plan_with_budget, weekly_plan_with_budget
 import json
-import random
 
 router = APIRouter(tags=["Meal Recommendation"])
 
@@ -31,11 +30,13 @@ def recommend_daily_meal(
     goal: str = "maintain",
     period: str = "daily",                       # ✅ 일일 / 주간 식단 선택 가능
     excluded_foods: list[str] | None = None,     # ✅ 프론트에서 X 버튼 누른 음식
+    budget_s: float | None = None,               # ✅ Gemini 대기 한도(초), 기본 MEAL_PLAN_BUDGET_S
     session: Session = Depends(get_db)
 ):
     """
-    현실적인 AI 식단 추천 (Gemini 기반)
+    현실적인 AI 식단 추천 (Gemini 기반, 지연 시 로컬 플래너로 대체)
     - 기존 recommend_daily_meal 구조 유지
+    - source: 식단을 만든 엔진 ("gemini" | "local")
     - 일일 / 주간 식단 모두 지원
     - 선호/비선호 음식 자동 반영
     """
@@ -100,39 +101,32 @@ def recommend_daily_meal(
 
     custom_comment = f"🍽️ {comment_line}\n아래는 {'일일' if period=='daily' else '주간'} 식단 추천입니다."
 
-    # 5️⃣ Gemini 기반 식단 생성
-    ai_plan = generate_realistic_meal_plan(
+    # 5️⃣ 식단 생성 (Gemini vs 로컬 MealPlanner, 지연 예산 내 먼저 성공한 쪽)
+    macros = {"protein": protein_target, "fat": fat_target, "carb": carbs_target}
+    plan_args = dict(
         user=user,
-        tdee=target_kcal,
-        macros={"protein": protein_target, "fat": fat_target, "carb": carbs_target},
+        target_kcal=target_kcal,
+        macros=macros,
         meals_per_day=meals_per_day,
         preferred_foods=preferred_foods,
         excluded_foods=disliked_foods,
+        budget_s=budget_s,
     )
 
-    # 6️⃣ 주간 모드 지원
+    # 6️⃣ 주간 모드: 서로 다른 7일 (Gemini 배치 1회 또는 로컬 7일 연속 계획), 날짜별 kcal·매크로 검증 포함
     if period == "weekly":
-        ai_plan["request_type"] = "weekly"
-        ai_plan["days"] = [
-            {
-                "day": f"Day {i+1}",
-                "meals": ai_plan.get("meals", []),
-            }
-            for i in range(7)
-        ]
-        # 중복 최소화 처리
-        all_foods = []
-        for d in ai_plan["days"]:
-            for meal in d["meals"]:
-                for f in meal["foods"]:
-                    all_foods.append(f["name"])
-        unique_foods = list(set(all_foods))
-        random.shuffle(unique_foods)
-        for i, d in enumerate(ai_plan["days"]):
-            for meal in d["meals"]:
-                for f in meal["foods"]:
-                    if unique_foods:
-                        f["name"] = unique_foods[(i + hash(f["name"])) % len(unique_foods)]
+        week, source = weekly_plan_with_budget(**plan_args)
+        ai_plan = {
+            "goal": week.get("goal", goal),
+            "request_type": "weekly",
+            "days": [
+                {"day": f"Day {d['day']}", "meals": d["meals"], "macro_check": d["macro_check"]}
+                for d in week["days"]
+            ],
+        }
+        ai_plan["meals"] = ai_plan["days"][0]["meals"] if ai_plan["days"] else []
+    else:
+        ai_plan, source = plan_with_budget(**plan_args)
 
     # 7️⃣ 프론트 호환형 반환 구조
     return {
@@ -146,4 +140,5 @@ def recommend_daily_meal(
         "target_carbs": round(carbs_target, 1),
         "comment": custom_comment.strip(),
         "ai_meal_plan": ai_plan,     # ✅ AI 식단 전체 구조 추가 (기존 meals 대체)
+        "source": source,
     }
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 from src import db
+from src.services.rollup_query import rollup
 
 router = APIRouter(tags=["Health Score"])
 
@@ -38,22 +39,23 @@ def get_daily_scores(user_id: str, session: Session = Depends(get_db)):
 def get_weekly_score(user_id: str, session: Session = Depends(get_db)):
     today = date.today()
     start = today - timedelta(days=6)
+    summary = rollup(session, db.DailyHealthScore, user_id, start, avg=["total_score"])[0]
+    if not summary.days:
+        raise HTTPException(status_code=404, detail="No data in last 7 days")
+
+    # 상세 목록은 (date, total_score) 튜플만 조회
     rows = (
-        session.query(db.DailyHealthScore)
+        session.query(db.DailyHealthScore.date, db.DailyHealthScore.total_score)
         .filter(db.DailyHealthScore.user_id == user_id)
         .filter(db.DailyHealthScore.date >= start)
         .all()
     )
-    if not rows:
-        raise HTTPException(status_code=404, detail="No data in last 7 days")
-
-    avg_score = sum(r.total_score for r in rows) / len(rows)
     return {
         "user_id": user_id,
         "period": f"{start}~{today}",
-        "days": len(rows),
-        "average_total_score": round(avg_score, 1),
+        "days": summary.days,
+        "average_total_score": round(summary.avg_total_score, 1),
         "details": [
-            {"date": r.date.isoformat(), "score": r.total_score} for r in rows
+            {"date": d.isoformat(), "score": score} for d, score in rows
         ],
     }
@@ -1,11 +1,11 @@
 # src/routers/score_trend.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 from fastapi.responses import StreamingResponse
-import matplotlib.pyplot as plt
-import io
 from src import db
+from src.services.chart_renderer import ChartTimeout, get_chart_png, png_stream
+from src.services.timeseries import score_series, downsample
 
 router = APIRouter(tags=["Health Score Trend"])
 
@@ -37,19 +37,19 @@ def daily_score_trend(user_id: str, session: Session = Depends(get_db)):
     days = [r.date for r in rows]
     scores = [r.total_score for r in rows]
 
-    plt.figure(figsize=(9, 5))
-    plt.plot(days, scores, marker='o', color='mediumseagreen', linewidth=2)
-    plt.title(f"{user_id} — 최근 14일 건강 점수 추이")
-    plt.xlabel("날짜")
-    plt.ylabel("점수 (0~100)")
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+    spec = {
+        "figsize": [9, 5],
+        "title": f"{user_id} — 최근 14일 건강 점수 추이",
+        "xlabel": "날짜",
+        "ylabel": "점수 (0~100)",
+        "series": [{"x": days, "y": scores, "color": "mediumseagreen", "linewidth": 2}],
+        "grid": {"alpha": 0.3},
+    }
+    try:
+        png = get_chart_png("score_trend_daily", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
 
 
 # ------------------------------------------------------------
@@ -59,40 +59,26 @@ def daily_score_trend(user_id: str, session: Session = Depends(get_db)):
 def weekly_score_trend(user_id: str, session: Session = Depends(get_db)):
     today = date.today()
     start = today - timedelta(weeks=8)
-    rows = (
-        session.query(db.DailyHealthScore)
-        .filter(db.DailyHealthScore.user_id == user_id)
-        .filter(db.DailyHealthScore.date >= start)
-        .order_by(db.DailyHealthScore.date)
-        .all()
-    )
-    if not rows:
-        raise HTTPException(status_code=404, detail="No weekly score data found")
-
-    # 주차별 평균
-    week_scores = {}
-    for r in rows:
-        year, week, _ = r.date.isocalendar()
-        key = f"{year}-W{week}"
-        week_scores.setdefault(key, []).append(r.total_score)
-
-    labels = list(week_scores.keys())
-    avgs = [sum(v) / len(v) for v in week_scores.values()]
 
-    plt.figure(figsize=(9, 5))
-    plt.plot(labels, avgs, marker='o', color='steelblue', linewidth=2)
-    plt.title(f"{user_id} — 최근 8주 평균 건강 점수 추이")
-    plt.xlabel("주차")
-    plt.ylabel("평균 점수 (0~100)")
-    plt.xticks(rotation=45)
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
+    # 주차별 평균 (SQL GROUP BY)
+    labels, _, avgs = score_series(session, user_id, start, "weekly")
+    if not labels:
+        raise HTTPException(status_code=404, detail="No weekly score data found")
 
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+    spec = {
+        "figsize": [9, 5],
+        "title": f"{user_id} — 최근 8주 평균 건강 점수 추이",
+        "xlabel": "주차",
+        "ylabel": "평균 점수 (0~100)",
+        "series": [{"x": labels, "y": avgs, "color": "steelblue", "linewidth": 2}],
+        "xticks_rotation": 45,
+        "grid": {"alpha": 0.3},
+    }
+    try:
+        png = get_chart_png("score_trend_weekly", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
 
 
 # ------------------------------------------------------------
@@ -102,35 +88,58 @@ def weekly_score_trend(user_id: str, session: Session = Depends(get_db)):
 def monthly_score_trend(user_id: str, session: Session = Depends(get_db)):
     today = date.today()
     start = today.replace(day=1) - timedelta(days=180)  # 최근 6개월
-    rows = (
-        session.query(db.DailyHealthScore)
-        .filter(db.DailyHealthScore.user_id == user_id)
-        .filter(db.DailyHealthScore.date >= start)
-        .order_by(db.DailyHealthScore.date)
-        .all()
-    )
-    if not rows:
+
+    # 월별 평균 (SQL GROUP BY)
+    labels, _, avgs = score_series(session, user_id, start, "monthly")
+    if not labels:
         raise HTTPException(status_code=404, detail="No monthly score data found")
 
-    # 월별 평균
-    month_scores = {}
-    for r in rows:
-        key = f"{r.date.year}-{r.date.month:02d}"
-        month_scores.setdefault(key, []).append(r.total_score)
-
-    labels = list(month_scores.keys())
-    avgs = [sum(v) / len(v) for v in month_scores.values()]
-
-    plt.figure(figsize=(9, 5))
-    plt.plot(labels, avgs, marker='o', color='darkorange', linewidth=2)
-    plt.title(f"{user_id} — 최근 6개월 건강 점수 추이")
-    plt.xlabel("월")
-    plt.ylabel("평균 점수 (0~100)")
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+    spec = {
+        "figsize": [9, 5],
+        "title": f"{user_id} — 최근 6개월 건강 점수 추이",
+        "xlabel": "월",
+        "ylabel": "평균 점수 (0~100)",
+        "series": [{"x": labels, "y": avgs, "color": "darkorange", "linewidth": 2}],
+        "grid": {"alpha": 0.3},
+    }
+    try:
+        png = get_chart_png("score_trend_monthly", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
+
+
+# ------------------------------------------------------------
+# 4️⃣ JSON 시계열 (모바일 클라이언트 직접 렌더링용)
+#    - 정렬된 dates / values 배열 (SQL GROUP BY 집계)
+#    - max_points 지정 시 LTTB 다운샘플링
+# ------------------------------------------------------------
+def _series_response(session: Session, user_id: str, start: date, period: str, max_points: int | None):
+    labels, dates, values = score_series(session, user_id, start, period)
+    if not values:
+        raise HTTPException(status_code=404, detail=f"No {period} score data found")
+
+    if period == "daily":
+        dates, values = downsample(dates, values, max_points=max_points)
+        return {"user_id": user_id, "period": period, "dates": dates, "values": values}
+
+    labels, values, dates = downsample(labels, values, dates, max_points=max_points)
+    return {"user_id": user_id, "period": period, "labels": labels, "dates": dates, "values": values}
+
+
+@router.get("/score/trend/daily/{user_id}/series")
+def daily_score_series(user_id: str, days: int = 14, max_points: int | None = Query(None, ge=3), session: Session = Depends(get_db)):
+    start = date.today() - timedelta(days=days - 1)
+    return _series_response(session, user_id, start, "daily", max_points)
+
+
+@router.get("/score/trend/weekly/{user_id}/series")
+def weekly_score_series(user_id: str, weeks: int = 8, max_points: int | None = Query(None, ge=3), session: Session = Depends(get_db)):
+    start = date.today() - timedelta(weeks=weeks)
+    return _series_response(session, user_id, start, "weekly", max_points)
+
+
+@router.get("/score/trend/monthly/{user_id}/series")
+def monthly_score_series(user_id: str, months: int = 6, max_points: int | None = Query(None, ge=3), session: Session = Depends(get_db)):
+    start = date.today().replace(day=1) - timedelta(days=30 * months)
+    return _series_response(session, user_id, start, "monthly", max_points)
@@ -16,10 +16,9 @@ from src.services.nutrition import (
     get_monthly_trend
 )
 from datetime import date, timedelta, datetime
+from dateutil.relativedelta import relativedelta
 from fastapi.responses import StreamingResponse
-import matplotlib.pyplot as plt
-import io
-from datetime import date
+from src.services.chart_renderer import ChartTimeout, get_chart_png, png_stream
 
 
 router = APIRouter(tags=["User"])
@@ -160,21 +159,21 @@ def weekly_graph(user_id: str, session: Session = Depends(get_db)):
     labels = [f"{t['week_start'][5:]}~{t['week_end'][5:]}" for t in trends]  # MM-DD~MM-DD
     goal_calories = [t["avg_goal_calories"] for t in trends]
 
-    plt.figure(figsize=(10,5))
-    plt.plot(labels, goal_calories, marker='o', color='orange', label="Avg Goal Calories")
-    plt.title(f"Weekly Calorie Trend for {user.name}")
-    plt.xlabel("Week")
-    plt.ylabel("Avg Goal Calories")
-    plt.xticks(rotation=45)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend()
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+    spec = {
+        "figsize": [10, 5],
+        "title": f"Weekly Calorie Trend for {user.name}",
+        "xlabel": "Week",
+        "ylabel": "Avg Goal Calories",
+        "series": [{"x": labels, "y": goal_calories, "color": "orange", "label": "Avg Goal Calories"}],
+        "xticks_rotation": 45,
+        "grid": {"axis": "y", "linestyle": "--", "alpha": 0.7},
+        "legend": True,
+    }
+    try:
+        png = get_chart_png("user_weekly_calories", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
 
 
 # ----------------------
@@ -194,21 +193,21 @@ def monthly_graph(user_id: str, session: Session = Depends(get_db)):
     labels = [t["month"] for t in trends]
     goal_calories = [t["avg_goal_calories"] for t in trends]
 
-    plt.figure(figsize=(10,5))
-    plt.plot(labels, goal_calories, marker='o', color='green', label="Avg Goal Calories")
-    plt.title(f"Monthly Calorie Trend for {user.name}")
-    plt.xlabel("Month")
-    plt.ylabel("Avg Goal Calories")
-    plt.xticks(rotation=45)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend()
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+    spec = {
+        "figsize": [10, 5],
+        "title": f"Monthly Calorie Trend for {user.name}",
+        "xlabel": "Month",
+        "ylabel": "Avg Goal Calories",
+        "series": [{"x": labels, "y": goal_calories, "color": "green", "label": "Avg Goal Calories"}],
+        "xticks_rotation": 45,
+        "grid": {"axis": "y", "linestyle": "--", "alpha": 0.7},
+        "legend": True,
+    }
+    try:
+        png = get_chart_png("user_monthly_calories", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
 
 
 @router.get("/{user_id}/weekly-nutrition-graph")
@@ -227,23 +226,25 @@ def weekly_nutrition_graph(user_id: str, session: Session = Depends(get_db)):
     fat = [t["avg_fat_g"] for t in trends]
     carbs = [t["avg_carbs_g"] for t in trends]
 
-    plt.figure(figsize=(10,5))
-    plt.plot(labels, protein, marker='o', label="Protein (g)", color='blue')
-    plt.plot(labels, fat, marker='o', label="Fat (g)", color='red')
-    plt.plot(labels, carbs, marker='o', label="Carbs (g)", color='green')
-    plt.title(f"Weekly Nutrition Trend for {user.name}")
-    plt.xlabel("Week")
-    plt.ylabel("Grams")
-    plt.xticks(rotation=45)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend()
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+    spec = {
+        "figsize": [10, 5],
+        "title": f"Weekly Nutrition Trend for {user.name}",
+        "xlabel": "Week",
+        "ylabel": "Grams",
+        "series": [
+            {"x": labels, "y": protein, "label": "Protein (g)", "color": "blue"},
+            {"x": labels, "y": fat, "label": "Fat (g)", "color": "red"},
+            {"x": labels, "y": carbs, "label": "Carbs (g)", "color": "green"},
+        ],
+        "xticks_rotation": 45,
+        "grid": {"axis": "y", "linestyle": "--", "alpha": 0.7},
+        "legend": True,
+    }
+    try:
+        png = get_chart_png("user_weekly_nutrition", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
 
 
 @router.get("/{user_id}/monthly-nutrition-graph")
@@ -279,20 +280,22 @@ def monthly_nutrition_graph(user_id: str, session: Session = Depends(get_db)):
             fat.append(0)
             carbs.append(0)
 
-    plt.figure(figsize=(10,5))
-    plt.plot(labels, protein, marker='o', label="Protein (g)", color='blue')
-    plt.plot(labels, fat, marker='o', label="Fat (g)", color='red')
-    plt.plot(labels, carbs, marker='o', label="Carbs (g)", color='green')
-    plt.title(f"Monthly Nutrition Trend for {user.name}")
-    plt.xlabel("Month")
-    plt.ylabel("Grams")
-    plt.xticks(rotation=45)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.legend()
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    plt.close()
-    return StreamingResponse(buf, media_type="image/png")
+    spec = {
+        "figsize": [10, 5],
+        "title": f"Monthly Nutrition Trend for {user.name}",
+        "xlabel": "Month",
+        "ylabel": "Grams",
+        "series": [
+            {"x": labels, "y": protein, "label": "Protein (g)", "color": "blue"},
+            {"x": labels, "y": fat, "label": "Fat (g)", "color": "red"},
+            {"x": labels, "y": carbs, "label": "Carbs (g)", "color": "green"},
+        ],
+        "xticks_rotation": 45,
+        "grid": {"axis": "y", "linestyle": "--", "alpha": 0.7},
+        "legend": True,
+    }
+    try:
+        png = get_chart_png("user_monthly_nutrition", user_id, spec)
+    except ChartTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return StreamingResponse(png_stream(png), media_type="image/png")
@@ -1,16 +1,49 @@
 # src/services/ai_meal_generator_gemini.py
 import os
-import json
-import requests
 from fastapi import HTTPException
+from src.services.gemini_client import GeminiError
+from src.services.llm_json import LLMParseError, generate_json
 
 # ✅ Gemini API 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise RuntimeError("Gemini API key not set in .env")
 
-# ✅ 안정적으로 작동하는 v1beta REST 엔드포인트 (chat_coach.py와 동일)
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+
+# ----------------------------------------------------------
+# 📐 응답 스키마 (responseSchema + 파싱 검증 공용)
+# ----------------------------------------------------------
+FOOD_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "name": {"type": "STRING"},
+        "amount_g": {"type": "NUMBER"},
+        "calories": {"type": "NUMBER"},
+        "protein": {"type": "NUMBER"},
+        "fat": {"type": "NUMBER"},
+        "carb": {"type": "NUMBER"},
+    },
+    "required": ["name", "amount_g", "calories", "protein", "fat", "carb"],
+}
+
+MEAL_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "meal_type": {"type": "STRING"},
+        "foods": {"type": "ARRAY", "items": FOOD_SCHEMA},
+    },
+    "required": ["meal_type", "foods"],
+}
+
+DAILY_PLAN_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "goal": {"type": "STRING"},
+        "total_kcal": {"type": "NUMBER"},
+        "meals": {"type": "ARRAY", "items": MEAL_SCHEMA},
+    },
+    "required": ["meals"],
+}
 
 
 # ----------------------------------------------------------
@@ -26,7 +59,7 @@ def generate_realistic_meal_plan(
 ):
     """
     현실적인 식단을 Gemini 2.0 Flash 모델로 생성합니다.
-    기존 SDK 대신 REST API로 안정적으로 호출합니다.
+    기존 SDK 대신 REST API로 안정적으로 호출합니다. (gemini_client 캐시 경유)
     """
 
     # 선호 / 비선호 텍스트 구성
@@ -88,42 +121,141 @@ def generate_realistic_meal_plan(
     """
 
     # ----------------------------------------------------------
-    # 🛰️ Gemini API 호출
+    # 🛰️ Gemini API 호출 (JSON 스키마 고정) + 📦 결과 파싱
     # ----------------------------------------------------------
-    payload = {"contents": [{"parts": [{"text": prompt}]}]}
-    headers = {
-        "Content-Type": "application/json",
-        "X-goog-api-key": GEMINI_API_KEY,
-    }
-
-    response = requests.post(GEMINI_URL, headers=headers, json=payload)
-
-    if response.status_code != 200:
+    try:
+        meal_plan = generate_json(prompt, endpoint="meal_plan", schema=DAILY_PLAN_SCHEMA)
+    except GeminiError as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Gemini API 호출 실패: {response.text}",
+            detail=f"Gemini API 호출 실패: {e.text}",
         )
-
-    # ----------------------------------------------------------
-    # 📦 결과 파싱
-    # ----------------------------------------------------------
-    try:
-        raw_text = response.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
-
-        # Gemini가 종종 markdown 형태(````json ... ````)로 반환 → 정리
-        if raw_text.startswith("```"):
-            raw_text = raw_text.strip("```json").strip("```").strip()
-
-        # JSON 파싱 시도
-        start = raw_text.find("{")
-        end = raw_text.rfind("}") + 1
-        parsed_json = raw_text[start:end]
-        meal_plan = json.loads(parsed_json)
-
-    except Exception as e:
+    except LLMParseError as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Gemini 응답 파싱 실패: {str(e)}\n응답 원문: {raw_text[:400]}...",
+            detail=f"Gemini 응답 파싱 실패: {str(e)}",
         )
 
     return meal_plan
+
+
+# ----------------------------------------------------------
+# 📅 주간 식단 (7일을 한 번의 요청으로, JSON 스키마 고정)
+# ----------------------------------------------------------
+WEEKLY_PLAN_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "goal": {"type": "STRING"},
+        "days": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "day": {"type": "INTEGER"},
+                    "meals": {"type": "ARRAY", "items": MEAL_SCHEMA},
+                },
+                "required": ["day", "meals"],
+            },
+        },
+    },
+    "required": ["days"],
+}
+
+MACRO_TOLERANCE = float(os.getenv("MEAL_PLAN_MACRO_TOLERANCE", "0.20"))      # 일일 kcal 허용 오차
+NUTRIENT_TOLERANCE = float(os.getenv("MEAL_PLAN_NUTRIENT_TOLERANCE", "0.35"))  # 일일 단백질/지방/탄수 허용 오차
+
+
+def day_totals(meals: list) -> dict:
+    """끼니 목록 → 하루 kcal/단백질/지방/탄수화물 합계"""
+    totals = {"kcal": 0.0, "protein": 0.0, "fat": 0.0, "carb": 0.0}
+    for meal in meals:
+        for f in meal.get("foods", []):
+            totals["kcal"] += float(f.get("calories") or 0)
+            totals["protein"] += float(f.get("protein") or 0)
+            totals["fat"] += float(f.get("fat") or 0)
+            totals["carb"] += float(f.get("carb") or 0)
+    return {k: round(v, 1) for k, v in totals.items()}
+
+
+def check_macros(
+    meals: list,
+    tdee: float,
+    macros: dict,
+    tol: float = MACRO_TOLERANCE,
+    nutrient_tol: float = NUTRIENT_TOLERANCE,
+) -> dict:
+    """
+    하루 합계를 목표와 비교.
+    kcal 오차가 tol 이내이고 단백질/지방/탄수 오차가 모두 nutrient_tol 이내면 ok.
+    """
+    actual = day_totals(meals)
+    targets = {"kcal": tdee, "protein": macros["protein"], "fat": macros["fat"], "carb": macros["carb"]}
+    deviation = {k: round((actual[k] - t) / t, 3) if t else 0.0 for k, t in targets.items()}
+    ok = abs(deviation["kcal"]) <= tol and all(abs(deviation[k]) <= nutrient_tol for k in ("protein", "fat", "carb"))
+    return {"actual": actual, "deviation": deviation, "ok": ok}
+
+
+def generate_weekly_meal_plan(
+    user,
+    tdee: float,
+    macros: dict,
+    meals_per_day: int = 3,
+    preferred_foods: list[str] | None = None,
+    excluded_foods: list[str] | None = None,
+    days: int = 7,
+):
+    """
+    서로 다른 days일치 식단을 Gemini 1회 호출로 생성 (responseSchema로 구조 고정).
+    날짜 수가 부족하거나 kcal·매크로 오차가 허용치를 넘는 날이 있으면 ValueError
+    → 오케스트레이터가 로컬 플래너 결과로 대체.
+    """
+    prefer_text = ", ".join(preferred_foods or []) or "없음"
+    exclude_text = ", ".join(excluded_foods or []) or "없음"
+
+    prompt = f"""
+    당신은 피트니스 전문 영양사입니다.
+    아래의 사용자 정보를 참고하여 한국인이 실제 먹을 수 있는 {days}일치 식단을 JSON으로 작성하세요.
+
+    [사용자 정보]
+    - 성별: {user.sex}
+    - 나이: {user.age}세
+    - 키: {user.height}cm
+    - 몸무게: {user.weight}kg
+    - 목표: {user.goal}
+    - 하루 권장 섭취 칼로리: {tdee:.0f} kcal
+    - 목표 매크로(하루): 단백질 {macros['protein']:.1f}g, 지방 {macros['fat']:.1f}g, 탄수화물 {macros['carb']:.1f}g
+    - 하루 식사 횟수: {meals_per_day} 끼
+
+    [사용자 선호 음식]
+    {prefer_text}
+
+    [사용자 비선호 음식 및 제외할 재료]
+    {exclude_text}
+
+    [식단 구성 규칙]
+    1. day는 1부터 {days}까지, 각 날은 정확히 {meals_per_day}끼(meal_1 ...)로 구성하세요.
+    2. 요일마다 메인 탄수화물/단백질 소스를 바꿔 같은 메뉴가 반복되지 않게 하세요.
+    3. 매일 칼로리 합계가 하루 권장 섭취 칼로리의 ±10% 이내가 되게 하세요.
+    4. 현실적으로 구할 수 있는 식재료만 사용하고, 소스류·과자·음료·디저트·보충제는 제외하세요.
+    5. 각 끼니에는 3~4개의 음식(name, amount_g, calories, protein, fat, carb)을 포함하세요.
+    """
+
+    def check(plan: dict) -> dict:
+        week = sorted(plan.get("days", []), key=lambda d: d.get("day", 0))[:days]
+        if len(week) < days:
+            raise ValueError(f"Gemini 주간 식단 일수 부족: {len(week)}/{days}")
+
+        bad = []
+        for d in week:
+            d["macro_check"] = check_macros(d["meals"], tdee, macros)
+            if not d["macro_check"]["ok"]:
+                bad.append(d["day"])
+        if bad:
+            raise ValueError(f"Gemini 주간 식단 kcal/매크로 오차 초과: day {bad}")
+        return {"goal": plan.get("goal", user.goal), "days": week}
+
+    # 스키마 + 검증을 통과한 응답만 캐시됨
+    try:
+        return generate_json(prompt, endpoint="meal_plan", schema=WEEKLY_PLAN_SCHEMA, check=check)
+    except GeminiError as e:
+        raise HTTPException(status_code=500, detail=f"Gemini API 호출 실패: {e.text}")
@@ -7,12 +7,13 @@ import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_absolute_error
+from src.services.food_table import read_table, write_table, table_exists, stage_path
 
 # ============================================================
 # ⚙️ 설정
 # ============================================================
-INPUT_PATH  = os.path.join("src", "data", "extended_food_db_clustered_stage2.xlsx")
-OUTPUT_PATH = os.path.join("src", "data", "extended_food_db_scored.xlsx")
+INPUT_PATH  = stage_path("clustered_stage2")
+OUTPUT_PATH = stage_path("scored")
 MODEL_PATH  = os.path.join("src", "data", "health_score_model.pkl")
 
 # ------------------------------------------------------------
@@ -62,13 +63,13 @@ def _get_model():
 # ============================================================
 # 🧠 모델 학습
 # ============================================================
-def train_model(excel_path: str = INPUT_PATH, save_path: str = MODEL_PATH):
+def train_model(table_path: str = INPUT_PATH, save_path: str = MODEL_PATH):
     """LightGBM을 이용한 health_score 예측 모델 학습"""
-    if not os.path.exists(excel_path):
-        raise FileNotFoundError(f"Input file not found: {excel_path}")
+    if not table_exists(table_path):
+        raise FileNotFoundError(f"Input file not found: {table_path}")
 
-    df = pd.read_excel(excel_path)
-    print(f"📘 Loaded data: {excel_path} (rows={len(df)})")
+    df = read_table(table_path)
+    print(f"📘 Loaded data: {table_path} (rows={len(df)})")
 
     # 필수 컬럼 확인 및 결측 보정
     for col in FEATURE_COLS:
@@ -113,10 +114,13 @@ def load_model(path: str = MODEL_PATH):
     return joblib.load(path)
 
 
-def predict_scores(excel_path: str, model_path: str = MODEL_PATH, out_path: str | None = None):
-    """학습된 모델로 새로운 음식 DB에 ml_health_score 추가"""
+def predict_scores(table: str | pd.DataFrame, model_path: str = MODEL_PATH, out_path: str | None = None):
+    """
+    학습된 모델로 새로운 음식 DB에 ml_health_score 추가.
+    table: 단계 산출물 경로 또는 이미 읽은 DataFrame. out_path를 주면 Parquet + 런타임용 Arrow로 저장.
+    """
     model = load_model(model_path)
-    df = pd.read_excel(excel_path)
+    df = read_table(table) if isinstance(table, str) else table
 
     # 결측/누락 피처 처리
     for c in FEATURE_COLS:
@@ -127,24 +131,29 @@ def predict_scores(excel_path: str, model_path: str = MODEL_PATH, out_path: str
     df_pred["ml_health_score"] = model.predict(df_pred[FEATURE_COLS])
 
     if out_path:
-        df_pred.to_excel(out_path, index=False)
+        out_path = write_table(df_pred, out_path, arrow=True)
         print(f"✅ Predictions saved → {out_path}")
 
     return df_pred
 
 
-# ============================================================
-# 🧩 실행 엔트리포인트
-# ============================================================
-if __name__ == "__main__":
+def train_and_score(in_path: str = INPUT_PATH, out_path: str = OUTPUT_PATH, model_path: str = MODEL_PATH) -> str:
+    """2차 군집 산출물로 학습 → 같은 표에 ml_health_score 예측 → 점수 산출물 저장"""
     # 1️⃣ 학습
-    trained_path = train_model(INPUT_PATH, MODEL_PATH)
+    trained_path = train_model(in_path, model_path)
 
     # 2️⃣ 예측 (동일 파일에 예측 컬럼 추가)
     predict_scores(
-        excel_path=INPUT_PATH,
+        table=in_path,
         model_path=trained_path,
-        out_path=OUTPUT_PATH
+        out_path=out_path
     )
+    return out_path
+
 
+# ============================================================
+# 🧩 실행 엔트리포인트
+# ============================================================
+if __name__ == "__main__":
+    train_and_score(INPUT_PATH, OUTPUT_PATH, MODEL_PATH)
     print("🎯 All done → model trained & predictions generated!")
@@ -0,0 +1,173 @@
+# src/services/chart_renderer.py
+import os
+import io
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from matplotlib import font_manager, rc_context
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "256"))        # 캐시할 PNG 개수 (LRU)
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))  # 렌더링 프로세스 수
+CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", "20"))
+
+_FONT_PATH = "C:/Windows/Fonts/malgun.ttf"  # Windows: 맑은 고딕
+
+
+class ChartTimeout(Exception):
+    """렌더링이 CHART_RENDER_TIMEOUT 안에 끝나지 않음. 라우터가 504로 변환."""
+
+
+def _font_rc() -> dict:
+    """한글 폰트 설정 (pyplot 전역 rc 대신 렌더링 시점에만 적용)"""
+    path = _FONT_PATH if os.path.exists(_FONT_PATH) else font_manager.findfont("DejaVu Sans")
+    if path not in {f.fname for f in font_manager.fontManager.ttflist}:
+        font_manager.fontManager.addfont(path)
+    name = font_manager.FontProperties(fname=path).get_name()
+    return {"font.family": name, "axes.unicode_minus": False}
+
+
+# ----------------------------------------------------------
+# 1️⃣ 렌더러 (워커 프로세스에서 실행, pyplot 미사용)
+# ----------------------------------------------------------
+def render_line_chart(spec: dict) -> bytes:
+    """
+    선 그래프 spec(dict)을 PNG 바이트로 렌더링.
+    spec 예시:
+    {
+        "figsize": [9, 5],
+        "title": "...", "xlabel": "...", "ylabel": "...",
+        "series": [{"x": [...], "y": [...], "label": "...", "color": "...", "marker": "o"}],
+        "fill_between": [0, 1],      # (선택) 두 시리즈 사이 음영
+        "xticks_rotation": 45,        # (선택)
+        "grid": {"alpha": 0.3},       # (선택) ax.grid(**grid)
+        "legend": True,               # (선택)
+        "tight": True,                # tight_layout 여부
+        "savefig": {"dpi": 100},      # (선택) savefig 옵션
+    }
+    """
+    with rc_context(_font_rc()):
+        fig = Figure(figsize=tuple(spec.get("figsize", (9, 5))))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+
+        series = spec.get("series", [])
+        for s in series:
+            ax.plot(
+                s["x"], s["y"],
+                marker=s.get("marker", "o"),
+                color=s.get("color"),
+                linewidth=s.get("linewidth", 1.5),
+                label=s.get("label"),
+            )
+
+        if spec.get("fill_between") and len(series) >= 2:
+            a, b = spec["fill_between"]
+            ax.fill_between(series[a]["x"], series[a]["y"], series[b]["y"], color="lightgray", alpha=0.3)
+
+        ax.set_title(spec.get("title", ""))
+        ax.set_xlabel(spec.get("xlabel", ""))
+        ax.set_ylabel(spec.get("ylabel", ""))
+        if spec.get("xticks_rotation"):
+            ax.tick_params(axis="x", labelrotation=spec["xticks_rotation"])
+        if spec.get("grid") is not None:
+            ax.grid(**spec["grid"])
+        if spec.get("legend"):
+            ax.legend()
+        if spec.get("tight", True):
+            fig.tight_layout()
+
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", **spec.get("savefig", {}))
+    return buf.getvalue()
+
+
+# ----------------------------------------------------------
+# 2️⃣ 프로세스 풀 (지연 생성)
+# ----------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None and CHART_RENDER_WORKERS > 0:
+            _pool = ProcessPoolExecutor(max_workers=CHART_RENDER_WORKERS)
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _render(spec: dict) -> bytes:
+    pool = _get_pool()
+    if pool is None:
+        return render_line_chart(spec)
+    future = pool.submit(render_line_chart, spec)
+    try:
+        return future.result(timeout=CHART_RENDER_TIMEOUT)
+    except FutureTimeout:
+        # 대기 중이면 취소, 실행 중인 작업은 워커에서 마저 끝남
+        future.cancel()
+        raise ChartTimeout("차트 렌더링 시간 초과")
+    except BrokenProcessPool:
+        # 워커가 죽은 경우 풀 재생성 후 현재 요청은 인라인 렌더링
+        _reset_pool()
+        return render_line_chart(spec)
+
+
+# ----------------------------------------------------------
+# 3️⃣ PNG 캐시 (chart_type, user_id, data fingerprint) → bytes
+# ----------------------------------------------------------
+_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def fingerprint(spec: dict) -> str:
+    """차트 spec(데이터 + 스타일)의 안정적인 해시"""
+    raw = json.dumps(spec, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_chart_png(chart_type: str, user_id: str, spec: dict) -> bytes:
+    """캐시에 있으면 그대로, 없으면 프로세스 풀에서 렌더링 후 캐시에 저장 (시간 초과 시 ChartTimeout)"""
+    key = (chart_type, user_id, fingerprint(spec))
+    with _cache_lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+            return png
+
+    png = _render(spec)
+
+    with _cache_lock:
+        _cache[key] = png
+        _cache.move_to_end(key)
+        while len(_cache) > CHART_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return png
+
+
+def png_stream(png: bytes) -> io.BytesIO:
+    """요청마다 독립된 in-memory 버퍼 생성"""
+    return io.BytesIO(png)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -1,82 +1,151 @@
 # src/services/cluster_nutrition_stage2.py
 import os
+import time
+import argparse
 import pandas as pd
 import numpy as np
+from joblib import Parallel, delayed
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.metrics import silhouette_score
+from src.services.food_table import read_table, write_table, table_exists, stage_path
+from src.services.food_scorer import SCORER_PATH, save_scorer_artifacts
 
 # --------------------------------
 # 설정
 # --------------------------------
-INPUT_PATH  = os.path.join("src", "data", "extended_food_db.xlsx")
-OUTPUT_PATH = os.path.join("src", "data", "extended_food_db_clustered_stage2.xlsx")
+INPUT_PATH  = stage_path("extended")
+OUTPUT_PATH = stage_path("clustered_stage2")
 
-# --------------------------------
-# 1️⃣ 데이터 로드
-# --------------------------------
-if not os.path.exists(INPUT_PATH):
-    raise FileNotFoundError(f"[ERROR] Input file not found: {INPUT_PATH}")
+# K 탐색 방식: exact(전체 KMeans + 전체 실루엣) | fast(MiniBatch + 표본 실루엣 + k 병렬)
+K_SEARCH_MODE = os.getenv("FOOD_K_SEARCH", "exact")
+SIL_SAMPLE_SIZE = int(os.getenv("FOOD_K_SIL_SAMPLE", "5000"))   # fast 모드 실루엣 표본 크기
+K_SEARCH_JOBS = int(os.getenv("FOOD_K_SEARCH_JOBS", "-1"))       # fast 모드 병렬 프로세스 수 (-1: 전체 코어)
 
-df = pd.read_excel(INPUT_PATH)
-
-# 필수 컬럼 체크
+# 필수 컬럼
 nutr_cols = [
     "energy_kcal", "protein_g", "fat_g", "carb_g",
     "fiber_g", "sugar_g", "sodium_mg", "glycemic_index",
     "processing_level", "hybrid_health_score"
 ]
 
-missing = [c for c in nutr_cols if c not in df.columns]
-if missing:
-    raise ValueError(f"[ERROR] Missing columns in input file: {missing}")
-
-# --------------------------------
-# 2️⃣ 전처리
-# --------------------------------
-# 결측값 → 평균으로 보정
-df[nutr_cols] = df[nutr_cols].apply(pd.to_numeric, errors="coerce")
-df[nutr_cols] = df[nutr_cols].fillna(df[nutr_cols].mean())
-
-# Standard Scaling
-scaler = StandardScaler()
-scaled = scaler.fit_transform(df[nutr_cols])
-
 # --------------------------------
-# 3️⃣ 최적 클러스터 개수 탐색
+# 1️⃣ 최적 클러스터 개수 탐색
 # --------------------------------
-def find_optimal_k(data, k_min=5, k_max=25):
-    """Silhouette score 기반 최적 K 탐색"""
-    inertias, silhouettes = [], []
-    for k in range(k_min, k_max + 1):
+def _score_k(data, k, mode="exact", sample_size=SIL_SAMPLE_SIZE):
+    """k 하나 평가 → (k, inertia, silhouette)"""
+    if mode == "fast":
+        kmeans = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=2048)
+        labels = kmeans.fit_predict(data)
+        sil = silhouette_score(data, labels, sample_size=min(sample_size, len(data)), random_state=42)
+    else:
         kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
         labels = kmeans.fit_predict(data)
-        inertias.append(kmeans.inertia_)
         sil = silhouette_score(data, labels)
-        silhouettes.append(sil)
-        print(f"  k={k:2d} → inertia={inertias[-1]:.0f}, silhouette={sil:.3f}")
-    
+    return k, kmeans.inertia_, sil
+
+
+def find_optimal_k(data, k_min=5, k_max=25, mode=K_SEARCH_MODE, n_jobs=K_SEARCH_JOBS):
+    """
+    Silhouette score 기반 최적 K 탐색.
+    mode="fast": MiniBatchKMeans + 표본 실루엣을 k별로 병렬 평가 (후보 비교용 근사).
+    어느 모드든 최종 모델은 호출자가 선택된 k로 전체 KMeans를 한 번만 학습.
+    """
+    t0 = time.perf_counter()
+    ks = range(k_min, k_max + 1)
+    if mode == "fast":
+        results = Parallel(n_jobs=n_jobs)(delayed(_score_k)(data, k, "fast") for k in ks)
+    else:
+        results = [_score_k(data, k, "exact") for k in ks]
+
+    for k, inertia, sil in results:
+        print(f"  k={k:2d} → inertia={inertia:.0f}, silhouette={sil:.3f}")
+
+    silhouettes = [sil for _, _, sil in results]
     best_idx = int(np.argmax(silhouettes))
     final_k = k_min + best_idx
-    print(f"\n📊 Optimal K = {final_k} (Silhouette = {silhouettes[best_idx]:.3f})")
+    print(f"\n📊 Optimal K = {final_k} (Silhouette = {silhouettes[best_idx]:.3f}, {mode}, {time.perf_counter() - t0:.2f}s)")
     return final_k
 
-opt_k = find_optimal_k(scaled, 5, 25)
 
 # --------------------------------
-# 4️⃣ 최종 K-Means 모델 적용
+# 2️⃣ 영양 기반 2차 군집화
 # --------------------------------
-kmeans = KMeans(n_clusters=opt_k, random_state=42, n_init=10)
-df["nutrition_cluster"] = kmeans.fit_predict(scaled)
+def load_scaled(input_path: str = INPUT_PATH):
+    """입력 표 + 결측 평균 보정 후 표준화한 영양 행렬 → (df, scaled, scaler, 보정값)"""
+    if not table_exists(input_path):
+        raise FileNotFoundError(f"[ERROR] Input file not found: {input_path}")
 
-# 각 클러스터별 통계 요약
-summary = df.groupby("nutrition_cluster")[nutr_cols].mean().round(2)
-print("\n📈 Cluster Summary (avg per group):")
-print(summary)
+    df = read_table(input_path)
 
-# --------------------------------
-# 5️⃣ 결과 저장
-# --------------------------------
-os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-df.to_excel(OUTPUT_PATH, index=False)
-print(f"\n✅ Stage 2 nutrition-based clustering saved → {OUTPUT_PATH}")
+    missing = [c for c in nutr_cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"[ERROR] Missing columns in input file: {missing}")
+
+    # 결측값 → 평균으로 보정
+    df[nutr_cols] = df[nutr_cols].apply(pd.to_numeric, errors="coerce")
+    fill = df[nutr_cols].mean()
+    df[nutr_cols] = df[nutr_cols].fillna(fill)
+
+    # Standard Scaling
+    scaler = StandardScaler()
+    scaled = scaler.fit_transform(df[nutr_cols])
+    return df, scaled, scaler, fill
+
+
+def cluster_nutrition(
+    input_path: str = INPUT_PATH,
+    output_path: str = OUTPUT_PATH,
+    k_mode: str = K_SEARCH_MODE,
+    scorer_path: str = SCORER_PATH,
+) -> str:
+    """
+    확장 DB(하이브리드 점수 포함) → nutrition_cluster 추가.
+    스케일러/중심점은 scorer_path에 저장해 런타임에 새로 추가되는 음식도 같은 군집에 배정.
+    """
+    df, scaled, scaler, fill = load_scaled(input_path)
+
+    opt_k = find_optimal_k(scaled, 5, 25, mode=k_mode)
+
+    # 최종 K-Means 모델 적용 (한 번만 학습)
+    kmeans = KMeans(n_clusters=opt_k, random_state=42, n_init=10)
+    df["nutrition_cluster"] = kmeans.fit_predict(scaled)
+    save_scorer_artifacts(df, nutr_cols, fill, scaler, kmeans, scorer_path)
+
+    # 각 클러스터별 통계 요약
+    summary = df.groupby("nutrition_cluster")[nutr_cols].mean().round(2)
+    print("\n📈 Cluster Summary (avg per group):")
+    print(summary)
+
+    # 결과 저장
+    output_path = write_table(df, output_path)
+    print(f"\n✅ Stage 2 nutrition-based clustering saved → {output_path}")
+    return output_path
+
+
+def compare_k_modes(input_path: str = INPUT_PATH, k_min: int = 5, k_max: int = 25):
+    """exact / fast K 탐색의 선택 k와 소요 시간 비교"""
+    scaled = load_scaled(input_path)[1]
+    report = {}
+    for mode in ("exact", "fast"):
+        t0 = time.perf_counter()
+        k = find_optimal_k(scaled, k_min, k_max, mode=mode)
+        report[mode] = (k, time.perf_counter() - t0)
+
+    print(f"\n⏱️ K search on {len(scaled):,} rows (k={k_min}–{k_max})")
+    for mode, (k, sec) in report.items():
+        print(f"  {mode:<5} → k={k:2d}, {sec:8.2f}s")
+    print(f"  speedup x{report['exact'][1] / max(report['fast'][1], 1e-9):.1f}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="영양 기반 2차 군집화")
+    parser.add_argument("--k-mode", choices=["exact", "fast"], default=K_SEARCH_MODE, help="최적 K 탐색 방식")
+    parser.add_argument("--compare", action="store_true", help="exact/fast K 탐색의 선택 k와 시간만 비교 (저장 안 함)")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_k_modes()
+    else:
+        cluster_nutrition(k_mode=args.k_mode)
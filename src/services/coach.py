@@ -1,68 +1,100 @@
 # src/services/coach.py
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
-from src import db
-import statistics
+from src.services.user_context import UserContextSnapshot, get_user_context
+
+WINDOW_DAYS = 7
+
+
+# ----------------------------------------------------------
+# 1️⃣ 단일 패스 집계
+# ----------------------------------------------------------
+def aggregate_window(rows, start: date) -> dict:
+    """
+    UserContextSnapshot의 14일치 Row를 한 번 순회하며 이번 주 평균/합계와 지난주 점수 평균을 함께 계산.
+    각 평균은 해당 테이블 기록이 있는 날만 분모로 사용.
+    """
+    nut_n = ex_n = score_n = prev_score_n = ex_days = 0
+    kcal = prot = fat = carb = sodium = proc = 0.0
+    ex_dur = ex_int = burned = 0.0
+    score = prev_score = 0.0
+
+    for r in rows:
+        if r.date < start:
+            if r.has_score:
+                prev_score_n += 1
+                prev_score += r.total_score
+            continue
+        if r.has_nut:
+            nut_n += 1
+            kcal += r.kcal
+            prot += r.protein_g
+            fat += r.fat_g
+            carb += r.carb_g
+            sodium += r.sodium_mg
+            proc += r.processed_ratio
+        if r.has_ex:
+            ex_n += 1
+            ex_dur += r.duration_min
+            ex_int += r.avg_intensity
+            burned += r.calories_burned
+            if r.duration_min > 0:
+                ex_days += 1
+        if r.has_score:
+            score_n += 1
+            score += r.total_score
+
+    def avg(total, n):
+        return total / n if n else 0
 
-def build_weekly_coach_report(user_id: str, session: Session):
+    return {
+        "nut_days": nut_n,
+        "ex_logged_days": ex_n,
+        "score_days": score_n,
+        "kcal_avg": avg(kcal, nut_n),
+        "prot_avg": avg(prot, nut_n),
+        "fat_avg": avg(fat, nut_n),
+        "carb_avg": avg(carb, nut_n),
+        "sodium_avg": avg(sodium, nut_n),
+        "proc_ratio": avg(proc, nut_n),
+        "ex_days": ex_days,
+        "avg_ex_dur": avg(ex_dur, ex_n),
+        "avg_ex_int": avg(ex_int, ex_n),
+        "avg_burned": avg(burned, ex_n),
+        "avg_score": round(score / score_n, 1) if score_n else None,
+        "prev_avg_score": round(avg(prev_score, prev_score_n), 1),
+    }
+
+
+# ----------------------------------------------------------
+# 2️⃣ 주간 코치 리포트
+# ----------------------------------------------------------
+def build_weekly_coach_report(user_id: str, session: Session, ctx: UserContextSnapshot | None = None):
     """최근 7일간 요약 데이터를 기반으로 코치 피드백을 생성."""
-    
-    today = date.today()
-    start = today - timedelta(days=6)
-
-    # ✅ 건강 점수 가져오기 (DailyHealthScore 기반)
-    all_scores = (
-        session.query(db.DailyHealthScore)
-        .filter(db.DailyHealthScore.user_id == user_id)
-        .order_by(db.DailyHealthScore.date)
-        .all()
-    )
-
-    weekly_scores = [s for s in all_scores if s.date >= start]
-    if weekly_scores:
-        avg_score = round(sum(s.total_score for s in weekly_scores) / len(weekly_scores), 1)
-        prev_scores = all_scores[:-len(weekly_scores)]
-        prev_avg = round(sum(s.total_score for s in prev_scores[-7:]) / max(1, len(prev_scores[-7:])), 1)
-        delta = avg_score - prev_avg
+
+    ctx = ctx or get_user_context(user_id, session)
+    if ctx is None:
+        today, rows = date.today(), []
+    else:
+        today, rows = ctx.today, ctx.rows
+    m = aggregate_window(rows, today - timedelta(days=WINDOW_DAYS - 1))
+
+    # ✅ 건강 점수 (이번 주 vs 지난주)
+    avg_score = m["avg_score"]
+    if avg_score is not None:
+        delta = avg_score - m["prev_avg_score"]
         trend = "상승 " if delta > 0 else ("하락 " if delta < 0 else "유지 ➖")
         summary_prefix = f"이번 주 전체 건강 점수는 **{avg_score}점**입니다 ({trend}, 지난주 대비 {delta:+.1f})."
     else:
         summary_prefix = "이번 주 점수 데이터를 불러올 수 없습니다."
-        avg_score, delta = None, 0
-
-    # 최근 7일 데이터 로드
-    nuts = (
-        session.query(db.DailyNutritionSummary)
-        .filter(db.DailyNutritionSummary.user_id == user_id)
-        .filter(db.DailyNutritionSummary.date >= start)
-        .order_by(db.DailyNutritionSummary.date)
-        .all()
-    )
-    exes = (
-        session.query(db.DailyExerciseSummary)
-        .filter(db.DailyExerciseSummary.user_id == user_id)
-        .filter(db.DailyExerciseSummary.date >= start)
-        .order_by(db.DailyExerciseSummary.date)
-        .all()
-    )
-
-    if not nuts and not exes:
+        delta = 0
+
+    if not m["nut_days"] and not m["ex_logged_days"]:
         return {"summary": "최근 7일 간 데이터가 부족합니다.", "action_items": [], "motivation": "꾸준한 기록이 첫 걸음이에요!"}
 
-    # -------------------------------
-    # 기본 통계 계산
-    # -------------------------------
-    kcal_avg = statistics.mean([n.kcal for n in nuts]) if nuts else 0
-    prot_avg = statistics.mean([n.protein_g for n in nuts]) if nuts else 0
-    fat_avg  = statistics.mean([n.fat_g for n in nuts]) if nuts else 0
-    carb_avg = statistics.mean([n.carb_g for n in nuts]) if nuts else 0
-    sodium_avg = statistics.mean([n.sodium_mg for n in nuts]) if nuts else 0
-    proc_ratio = statistics.mean([n.processed_ratio for n in nuts]) if nuts else 0
-
-    ex_days = len([e for e in exes if e.duration_min > 0])
-    avg_ex_dur = statistics.mean([e.duration_min for e in exes]) if exes else 0
-    avg_ex_int = statistics.mean([e.avg_intensity for e in exes]) if exes else 0
-    avg_burned = statistics.mean([e.calories_burned for e in exes]) if exes else 0
+    kcal_avg, prot_avg, fat_avg, carb_avg = m["kcal_avg"], m["prot_avg"], m["fat_avg"], m["carb_avg"]
+    sodium_avg, proc_ratio = m["sodium_avg"], m["proc_ratio"]
+    ex_days, avg_ex_dur, avg_ex_int, avg_burned = m["ex_days"], m["avg_ex_dur"], m["avg_ex_int"], m["avg_burned"]
 
     # -------------------------------
     # 규칙 기반 피드백 생성
@@ -11,26 +11,44 @@ from typing import Dict
 from src.services.food_quality import add_or_recalculate_health_scores
 from src.services.ai_meal_quality import predict_scores
 from src.services.health_score_hybrid import hybrid_health_score
+from src.services.food_table import read_table, write_table, table_exists, stage_path
 
 # 경로 설정
-INPUT_PATH  = os.path.join("src", "data", "extended_food_db_clustered_stage1.xlsx")
-OUTPUT_PATH = os.path.join("src", "data", "extended_food_db.xlsx")
+INPUT_PATH  = stage_path("clustered_stage1")
+OUTPUT_PATH = stage_path("extended")
+
+CATEGORY_COLS = ["category_main", "category_function", "category_cluster"]
 
 # --------------------------------
 # 1️⃣ 하이브리드 결합 함수
 # --------------------------------
+def attach_category_columns(df: pd.DataFrame, category_path: str) -> pd.DataFrame:
+    """1차 군집 산출물의 카테고리 컬럼을 food_code 기준으로 붙임 (이미 있으면 그대로)"""
+    missing = [c for c in CATEGORY_COLS if c not in df.columns]
+    if not missing:
+        return df
+    cats = read_table(category_path, columns=["food_code"] + missing).drop_duplicates("food_code")
+    return df.merge(cats, on="food_code", how="left")
+
+
 def build_extended_food_db_with_hybrid(
     in_path: str,
     out_path: str,
     user_goal: str | None = None,
-    alpha: float | None = 0.6
+    alpha: float | None = 0.6,
+    category_path: str | None = None,
 ) -> str:
-    """규칙 + ML + 하이브리드 점수를 포함한 확장 DB 생성"""
-    df = pd.read_excel(in_path)
+    """
+    규칙 + ML + 하이브리드 점수를 포함한 확장 DB 생성.
+    category_path: 입력에 1차 군집 컬럼이 없을 때 붙일 산출물 (파이프라인에서 1차 군집과 병렬 실행 시)
+    """
+    df = read_table(in_path)
+    if category_path:
+        df = attach_category_columns(df, category_path)
     df = add_or_recalculate_health_scores(df)  # health_score 계산
 
-    # ML 점수 예측
-    df_ml = predict_scores(in_path)            # ml_health_score 생성
+    # ML 점수 예측 (이미 읽은 표 재사용)
+    df_ml = predict_scores(df)                 # ml_health_score 생성
 
     # food_name 기준 병합
     df_all = df.merge(
@@ -41,7 +59,7 @@ def build_extended_food_db_with_hybrid(
     # 하이브리드 스코어 결합
     df_all = hybrid_health_score(df_all, alpha=alpha, user_goal=user_goal)
 
-    df_all.to_excel(out_path, index=False)
+    out_path = write_table(df_all, out_path)
     print(f"✅ Saved hybrid DB → {out_path}")
     return out_path
 # -----------------------------
@@ -152,12 +170,21 @@ def clamp_numeric(df: pd.DataFrame, col: str, minv: float, maxv: float) -> None:
 # ---------------------------
 # 5️⃣ 메인 파이프라인
 # ---------------------------
-def extend_food_db(input_path: str = INPUT_PATH, output_path: str = OUTPUT_PATH, goal_for_score: str | None = None) -> str:
-    if not os.path.exists(input_path):
+def extend_food_db(
+    input_path: str = INPUT_PATH,
+    output_path: str = OUTPUT_PATH,
+    goal_for_score: str | None = None,
+    hybrid: bool = True,
+) -> str:
+    """
+    food_group 분류 + 결측 영양소 그룹 대표값 보정 + 규칙 health_score.
+    hybrid=False면 규칙 점수까지만 저장 (하이브리드 점수는 파이프라인의 score 단계에서)
+    """
+    if not table_exists(input_path):
         print(f"[ERROR] Input file not found: {input_path}", file=sys.stderr)
         raise FileNotFoundError(input_path)
 
-    df = pd.read_excel(input_path)
+    df = read_table(input_path)
     df = ensure_cols(df)
 
     # 1️⃣ food_group 분류
@@ -195,8 +222,8 @@ def extend_food_db(input_path: str = INPUT_PATH, output_path: str = OUTPUT_PATH,
     clamp_numeric(df, "sugar_g", 0, 100)
     clamp_numeric(df, "processing_level", 1, 5)
 
-    # 6️⃣ Health Score 계산
-    df = add_or_recalculate_health_scores(df, goal=goal_for_score)
+    # 6️⃣ Health Score 계산 (목표별 점수 컬럼도 한 번에)
+    df = add_or_recalculate_health_scores(df, goal=goal_for_score, all_goals=True)
 
     # ✅ 기존 컬럼 유지 + 신규만 추가
     new_cols = [
@@ -208,8 +235,7 @@ def extend_food_db(input_path: str = INPUT_PATH, output_path: str = OUTPUT_PATH,
             df[c] = np.nan
 
     # 저장 (덮어쓰기 X)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_excel(output_path, index=False)
+    output_path = write_table(df, output_path)
     print(f"✅ Extended food DB saved with {len(df.columns)} columns → {output_path}")
 
     # 7️⃣ 경고 출력
@@ -218,6 +244,9 @@ def extend_food_db(input_path: str = INPUT_PATH, output_path: str = OUTPUT_PATH,
         n = int(warn_mask.sum())
         print(f"⚠️  {n} ultra-processed/high-penalty items detected (health_score<30).")
 
+    if not hybrid:
+        return output_path
+
     # 8️⃣ 하이브리드 버전 생성
     build_extended_food_db_with_hybrid(
         in_path=output_path,
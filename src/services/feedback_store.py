@@ -0,0 +1,116 @@
+# src/services/feedback_store.py
+import os, json, datetime, threading
+from typing import Dict, Optional
+
+from src import db
+
+DATA_DIR = os.path.join("src", "data")
+LEGACY_PATH = os.path.join(DATA_DIR, "user_feedback.json")  # 이전 저장 형식 (최초 1회 user_feedback으로 이관)
+
+# SQLite가 쓰기 잠금을 잡으므로 여러 워커가 동시에 추가해도 안전 (파일 전체 재작성 없음)
+INSERT_SQL = (
+    "INSERT INTO user_feedback (user_id, food_name, rating, payload, created_at) VALUES (?, ?, ?, ?, ?)"
+)
+# 사용자·음식별 집계를 같은 트랜잭션에서 증분 갱신
+AGG_SQL = (
+    "INSERT INTO user_food_feedback (user_id, food_name, rating_count, rating_sum, last_rating, last_feedback_id) "
+    "VALUES (?, ?, 1, ?, ?, ?) "
+    "ON CONFLICT(user_id, food_name) DO UPDATE SET "
+    "rating_count = rating_count + 1, rating_sum = rating_sum + excluded.rating_sum, "
+    "last_rating = excluded.last_rating, last_feedback_id = excluded.last_feedback_id"
+)
+
+_ready = False
+_ready_lock = threading.Lock()
+
+
+def _rating(value) -> Optional[float]:
+    try:
+        return float(value if value is not None else 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _append(conn, feedback: Dict) -> int:
+    user_id = feedback.get("user_id")
+    food = feedback.get("food_name")
+    rating = _rating(feedback.get("rating"))
+    feedback_id = conn.exec_driver_sql(INSERT_SQL, (
+        None if user_id is None else str(user_id),
+        food or None,
+        rating,
+        json.dumps(feedback, ensure_ascii=False, default=str),
+        str(feedback.get("timestamp") or datetime.datetime.now().isoformat()),
+    )).lastrowid
+    if food and rating is not None:
+        conn.exec_driver_sql(AGG_SQL, (str(user_id or ""), str(food), rating, rating, feedback_id))
+    return feedback_id
+
+
+def _ensure_store():
+    """테이블 생성 + 기존 user_feedback.json 이관 (프로세스당 1회)"""
+    global _ready
+    if _ready:
+        return
+    with _ready_lock:
+        if _ready:
+            return
+        with db.engine.begin() as conn:
+            # 쓰기 잠금을 먼저 잡고 생성/이관 → 여러 프로세스가 동시에 시작해도 1번만 실행
+            # (지연 트랜잭션이면 확인 후 쓰기 사이에 다른 프로세스가 끼어들어 "already exists" / "database is locked")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            for table in [db.UserFeedback, db.UserFoodFeedback]:
+                table.__table__.create(bind=conn, checkfirst=True)
+            empty = conn.exec_driver_sql("SELECT 1 FROM user_feedback LIMIT 1").fetchone() is None
+            if empty and os.path.exists(LEGACY_PATH):
+                with open(LEGACY_PATH, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+                for fb in legacy:
+                    _append(conn, fb)
+                print(f"[feedback] {LEGACY_PATH} → user_feedback 이관 ({len(legacy)} rows)")
+        _ready = True
+
+
+# ----------------------------------------------------------
+# 쓰기
+# ----------------------------------------------------------
+def append_feedback(payload: Dict) -> Dict:
+    """피드백 1건 추가 (로그 + 집계, 단일 트랜잭션) → 저장된 피드백(timestamp 포함)"""
+    _ensure_store()
+    feedback = {"timestamp": datetime.datetime.now().isoformat(), **payload}
+    with db.engine.begin() as conn:
+        _append(conn, feedback)
+    return feedback
+
+
+# ----------------------------------------------------------
+# 읽기 (집계 테이블만 조회)
+# ----------------------------------------------------------
+def get_user_food_ratings(user_id: str) -> Dict[str, Dict]:
+    """사용자별 음식 평가 요약 {food_name: {count, avg, last}}"""
+    _ensure_store()
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT food_name, rating_count, rating_sum, last_rating FROM user_food_feedback WHERE user_id = ?",
+            (str(user_id),),
+        ).fetchall()
+    return {
+        food: {"count": int(cnt), "avg": float(total) / max(1, int(cnt)), "last": float(last)}
+        for food, cnt, total, last in rows
+    }
+
+
+def food_feedback_scores(user_id: Optional[str] = None) -> Dict[str, float]:
+    """
+    음식별 최신 평가 → 0~100 점수 (1~5 × 20). MealPlanner 선호 보너스용.
+    user_id가 없으면 전체 사용자 중 가장 최근 평가 기준.
+    """
+    _ensure_store()
+    sql = "SELECT food_name, last_rating FROM user_food_feedback"
+    params = ()
+    if user_id is not None:
+        sql += " WHERE user_id = ?"
+        params = (str(user_id),)
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(sql + " ORDER BY last_feedback_id", params).fetchall()
+    return {food: max(0.0, min(100.0, float(last) * 20)) for food, last in rows}
@@ -1,13 +1,29 @@
 # src/services/food_pair_trainer.py
-import os, json, math, itertools, time
-from collections import Counter, defaultdict
+import os, json, itertools, time, argparse
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
+from sqlalchemy import inspect
+from src import db
+from src.services.food_table import read_table, table_exists
 
 DATA_DIR = os.path.join("src", "data")
 LOG_PATH = os.path.join(DATA_DIR, "meal_logs.jsonl")  # 하루별 추천 결과 로그
 PAIR_OUT_PARQUET = os.path.join(DATA_DIR, "food_pair_scores.parquet")
 PAIR_OUT_JSON = os.path.join(DATA_DIR, "food_pair_scores.json")
-FOOD_DB_PATH = os.path.join(DATA_DIR, "cleaned_food_db_final.xlsx")  # ✅ 정제된 DB 기반 필터링
+FOOD_DB_PATH = os.path.join(DATA_DIR, "cleaned_food_db_final.parquet")  # ✅ 정제된 DB 기반 필터링 (.xlsx도 인식)
+
+# ---- 노이즈 제거 / 스무딩 ----
+MIN_SINGLE = 2   # 2회 이상 등장한 음식만
+MIN_PAIR = 2     # 2회 이상 등장한 페어만
+SMOOTH_K = 1.0
+
+# 증분 학습은 새 로그에 등장한 페어만 PMI 재계산.
+# 나머지 페어의 N/단일 카운트 변화는 누적 끼니 수(N)가 마지막 전체 재계산 대비 이 비율 이상 늘 때 전체 재계산으로 반영
+FULL_REFRESH_RATIO = float(os.getenv("FOOD_PAIR_REFRESH_RATIO", "0.25"))
+
+PAIR_TABLES = [db.FoodSingleCount, db.FoodPairCount, db.FoodPairTrainerState]
 
 
 def _norm_pair(a: str, b: str):
@@ -16,26 +32,7 @@ def _norm_pair(a: str, b: str):
 
 
 # ---------------------------------------------------------
-# 1️⃣ 로그 로드
-# ---------------------------------------------------------
-def load_logs(path=LOG_PATH):
-    """meal_logs.jsonl 로드 (1줄 = 1일치 식단 로그)"""
-    if not os.path.exists(path):
-        print(f"⚠️ No logs found at {path}")
-        return []
-    rows = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            try:
-                rows.append(json.loads(line))
-            except:
-                pass
-    print(f"📘 Loaded {len(rows)} daily logs")
-    return rows
-
-
-# ---------------------------------------------------------
-# 2️⃣ 하루 식단에서 음식쌍 추출
+# 1️⃣ 하루 식단에서 음식쌍 추출
 # ---------------------------------------------------------
 def extract_pairs_from_daily_plan(daily_plan: dict):
     """한 일(day)의 각 끼니에서 아이템 food_name을 뽑아 페어/단일 출현 카운트."""
@@ -60,99 +57,340 @@ def extract_pairs_from_daily_plan(daily_plan: dict):
     return single, pair
 
 
-# ---------------------------------------------------------
-# 3️⃣ 메인 학습 함수
-# ---------------------------------------------------------
-def train_from_logs():
-    logs = load_logs()
-    # ⚙️ 로그 없을 때 샘플 생성 (테스트용)
-    if not logs:
-        print("⚠️ No logs found. Generating small synthetic sample for testing...")
-        sample_daily = {
-            "meals": [
-                {"items": [{"food_name": "현미밥"}, {"food_name": "닭가슴살"}, {"food_name": "샐러드"}]},
-                {"items": [{"food_name": "잡곡밥"}, {"food_name": "두부"}, {"food_name": "나물"}]},
-                {"items": [{"food_name": "고구마"}, {"food_name": "계란"}, {"food_name": "브로콜리"}]},
-            ]
-        }
-        logs = [{"daily_plan": sample_daily} for _ in range(10)]
-
-    # ✅ 유효 음식 목록 로드 (정제된 DB 기반 필터링)
-    valid_foods = set()
-    if os.path.exists(FOOD_DB_PATH):
-        db = pd.read_excel(FOOD_DB_PATH)
-        valid_foods = set(db["food_name"].astype(str).tolist())
-        print(f"✅ Loaded {len(valid_foods)} valid food names from DB")
-
-    single = Counter()
-    pair = Counter()
-    N_meals = 0
-
-    # ---- 모든 로그 순회 ----
-    for row in logs:
+def count_logs(rows: Iterable[dict]) -> Tuple[Counter, Counter, int]:
+    """로그 행들 → (단일 카운트, 페어 카운트, 끼니 수)"""
+    single, pair, n_meals = Counter(), Counter(), 0
+    for row in rows:
         daily = row.get("daily_plan") or row.get("plan") or {}
         s, p = extract_pairs_from_daily_plan(daily)
         single.update(s)
         pair.update(p)
-        N_meals += len(daily.get("meals", []))
-
-    # ---- 노이즈 제거 ----
-    min_single = 2  # 2회 이상 등장한 음식만
-    min_pair = 2    # 2회 이상 등장한 페어만
-    single = Counter({k: v for k, v in single.items() if v >= min_single})
-    pair = Counter({k: v for k, v in pair.items() if v >= min_pair and k[0] in single and k[1] in single})
-
-    # ---- 유효 음식만 남기기 ----
-    if valid_foods:
-        pair = Counter({(a, b): c for (a, b), c in pair.items() if a in valid_foods and b in valid_foods})
-        single = Counter({k: v for k, v in single.items() if k in valid_foods})
-
-    print(f"📊 Training pairs: {len(pair)}, singles: {len(single)}, meals logged: {N_meals}")
-
-    # ---- PMI / Lift 계산 ----
-    k = 1.0
-    vocab = set(single.keys())
-    N = max(1, N_meals)
-    records = []
-
-    for (a, b), c_ab in pair.items():
-        c_a = single.get(a, 0)
-        c_b = single.get(b, 0)
-        p_a = (c_a + k) / (N + k * len(vocab))
-        p_b = (c_b + k) / (N + k * len(vocab))
-        p_ab = (c_ab + k) / (N + k * len(vocab))
-
-        pmi = math.log(max(1e-12, p_ab / (p_a * p_b)))
-        lift = p_ab / (p_a * p_b)
-        pmi_sig = 1 / (1 + math.exp(-pmi))
-        support = c_ab
-        score = pmi_sig * (1 - math.exp(-support / 5))
-        records.append({
-            "food_a": a, "food_b": b,
-            "count_ab": c_ab, "count_a": c_a, "count_b": c_b,
-            "pmi": pmi, "lift": lift, "score": score
-        })
-
-    # ---- 저장 ----
-    df = pd.DataFrame(records).sort_values("score", ascending=False)
-    os.makedirs(DATA_DIR, exist_ok=True)
-    df.to_parquet(PAIR_OUT_PARQUET, index=False)
-
-    # ---- JSON (양방향 매핑, 안전 필터 포함) ----
-    top = df[df["score"] > 0].copy()
-    pair_map = defaultdict(list)
-    for _, r in top.iterrows():
-        if not isinstance(r["food_a"], str) or not isinstance(r["food_b"], str):
-            continue
-        pair_map[r["food_a"]].append([r["food_b"], float(r["score"])])
-        pair_map[r["food_b"]].append([r["food_a"], float(r["score"])])
-
-    with open(PAIR_OUT_JSON, "w", encoding="utf-8") as f:
-        json.dump({"updated": int(time.time()), "pairs": pair_map}, f, ensure_ascii=False)
-
-    print(f"✅ Pair training done. meals={N_meals:,}, pairs={len(df):,}, saved → {PAIR_OUT_JSON}")
+        n_meals += len(daily.get("meals", []))
+    return single, pair, n_meals
+
+
+# ---------------------------------------------------------
+# 2️⃣ 로그 스트리밍 (저장된 바이트 위치부터)
+# ---------------------------------------------------------
+def iter_logs(path: str = LOG_PATH, offset: int = 0, progress: Optional[Dict] = None, end: Optional[int] = None):
+    """
+    meal_logs.jsonl을 offset 바이트부터 한 줄씩 읽음 (1줄 = 1일치 식단 로그).
+    개행으로 끝난 줄만 처리하고 progress["offset"]에 다음 시작 위치를 기록
+    (쓰는 중인 마지막 줄은 다음 실행에서 처리). end가 있으면 그 바이트 위치까지만 읽음.
+    """
+    progress = progress if progress is not None else {}
+    progress["offset"], progress["days"] = offset, 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if end is not None and progress["offset"] + len(line) > end:
+                break
+            if not line.endswith(b"\n"):
+                break
+            progress["offset"] += len(line)
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            progress["days"] += 1
+            yield row
+
+
+def load_logs(path=LOG_PATH):
+    """meal_logs.jsonl 전체 로드 (검증/일괄 학습용)"""
+    if not os.path.exists(path):
+        print(f"⚠️ No logs found at {path}")
+        return []
+    rows = list(iter_logs(path))
+    print(f"📘 Loaded {len(rows)} daily logs")
+    return rows
+
+
+def _sample_logs():
+    # ⚙️ 로그 없을 때 샘플 (테스트용)
+    sample_daily = {
+        "meals": [
+            {"items": [{"food_name": "현미밥"}, {"food_name": "닭가슴살"}, {"food_name": "샐러드"}]},
+            {"items": [{"food_name": "잡곡밥"}, {"food_name": "두부"}, {"food_name": "나물"}]},
+            {"items": [{"food_name": "고구마"}, {"food_name": "계란"}, {"food_name": "브로콜리"}]},
+        ]
+    }
+    return [{"daily_plan": sample_daily} for _ in range(10)]
+
+
+def load_valid_foods() -> Set[str]:
+    """✅ 유효 음식 목록 (정제된 DB 기반 필터링, 없으면 빈 집합 = 필터 없음)"""
+    if not table_exists(FOOD_DB_PATH):
+        return set()
+    names = read_table(FOOD_DB_PATH, columns=["food_name"])
+    valid = set(names["food_name"].astype(str).tolist())
+    print(f"✅ Loaded {len(valid)} valid food names from DB")
+    return valid
+
+
+# ---------------------------------------------------------
+# 3️⃣ PMI / Lift 계산 (벡터화)
+# ---------------------------------------------------------
+def eligible_singles(single: Dict[str, int], valid_foods: Set[str]) -> Dict[str, int]:
+    return {k: v for k, v in single.items() if v >= MIN_SINGLE and (not valid_foods or k in valid_foods)}
+
+
+def score_pairs(pairs: pd.DataFrame, single: Dict[str, int], n_meals: int, vocab_size: int) -> pd.DataFrame:
+    """
+    pairs(food_a, food_b, count_ab) + 노이즈 필터 통과 단일 카운트 → count_a/count_b/pmi/lift/score.
+    필터(MIN_PAIR, 두 음식 모두 single에 있음) 미통과 행은 pmi/lift/score 결측.
+    """
+    out = pairs.copy()
+    out["count_a"] = out["food_a"].map(single)
+    out["count_b"] = out["food_b"].map(single)
+    ok = (out["count_ab"] >= MIN_PAIR) & out["count_a"].notna() & out["count_b"].notna()
+
+    denom = max(1, n_meals) + SMOOTH_K * vocab_size
+    c_ab = out["count_ab"].to_numpy(dtype=float)
+    p_a = (out["count_a"].to_numpy(dtype=float) + SMOOTH_K) / denom
+    p_b = (out["count_b"].to_numpy(dtype=float) + SMOOTH_K) / denom
+    p_ab = (c_ab + SMOOTH_K) / denom
+
+    lift = p_ab / (p_a * p_b)
+    pmi = np.log(np.maximum(1e-12, lift))
+    pmi_sig = 1 / (1 + np.exp(-pmi))
+    score = pmi_sig * (1 - np.exp(-c_ab / 5))
+
+    for col, values in (("pmi", pmi), ("lift", lift), ("score", score)):
+        out[col] = np.where(ok, values, np.nan)
+    return out
+
+
+# ---------------------------------------------------------
+# 4️⃣ 저장 (parquet + 양방향 JSON, 임시 파일 → 교체)
+# ---------------------------------------------------------
+def build_pair_map(df: pd.DataFrame) -> Dict[str, list]:
+    """점수 내림차순 df → {음식: [[상대 음식, 점수], ...]} (행 순서대로 양방향 추가)"""
+    top = df[(df["score"] > 0) & df["food_a"].map(lambda x: isinstance(x, str)) & df["food_b"].map(lambda x: isinstance(x, str))]
+    if top.empty:
+        return {}
+    a, b = top["food_a"].to_numpy(), top["food_b"].to_numpy()
+    score = top["score"].to_numpy(dtype=float)
+    edges = pd.DataFrame({
+        "food": np.column_stack([a, b]).ravel(),
+        "other": np.column_stack([b, a]).ravel(),
+        "score": np.repeat(score, 2),
+    })
+    return {
+        food: [[o, float(s)] for o, s in zip(g["other"], g["score"])]
+        for food, g in edges.groupby("food", sort=False)
+    }
+
+
+def write_outputs(df: pd.DataFrame, parquet_path: str = PAIR_OUT_PARQUET, json_path: str = PAIR_OUT_JSON):
+    os.makedirs(os.path.dirname(parquet_path) or ".", exist_ok=True)
+    df = df.sort_values("score", ascending=False, kind="stable")
+
+    tmp = parquet_path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, parquet_path)
+
+    tmp = json_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"updated": int(time.time()), "pairs": build_pair_map(df)}, f, ensure_ascii=False)
+    os.replace(tmp, json_path)
+
+
+# ---------------------------------------------------------
+# 5️⃣ 누적 카운트 (SQLite) 갱신
+# ---------------------------------------------------------
+def _upsert_counts(conn, single: Counter, pair: Counter):
+    if not single:
+        return
+    conn.exec_driver_sql(
+        "INSERT INTO food_single_counts (food_name, count) VALUES (?, ?) "
+        "ON CONFLICT(food_name) DO UPDATE SET count = count + excluded.count",
+        [(str(k), int(v)) for k, v in single.items()],
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO food_pair_counts (food_a, food_b, count_ab) VALUES (?, ?, ?) "
+        "ON CONFLICT(food_a, food_b) DO UPDATE SET count_ab = count_ab + excluded.count_ab",
+        [(*_norm_pair(a, b), int(c)) for (a, b), c in pair.items()],
+    )
+
+
+def _select_pairs(conn, keys: Optional[Iterable[Tuple[str, str]]]) -> pd.DataFrame:
+    """keys=None: 전체 페어 / 그 외: 해당 (food_a, food_b) 페어만 (임시 테이블 + PK 조인)"""
+    if keys is None:
+        rows = conn.exec_driver_sql("SELECT food_a, food_b, count_ab FROM food_pair_counts").fetchall()
+    else:
+        conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS touched_pairs (food_a TEXT, food_b TEXT)")
+        conn.exec_driver_sql("DELETE FROM touched_pairs")
+        conn.exec_driver_sql("INSERT INTO touched_pairs (food_a, food_b) VALUES (?, ?)", list(keys))
+        rows = conn.exec_driver_sql(
+            "SELECT p.food_a, p.food_b, p.count_ab FROM touched_pairs t "
+            "JOIN food_pair_counts p ON p.food_a = t.food_a AND p.food_b = t.food_b"
+        ).fetchall()
+        conn.exec_driver_sql("DROP TABLE touched_pairs")
+    return pd.DataFrame(rows, columns=["food_a", "food_b", "count_ab"])
+
+
+def _read_state(conn, log_path: str) -> Tuple[int, int, int]:
+    state = conn.exec_driver_sql(
+        "SELECT offset, n_meals, refresh_meals FROM food_pair_trainer_state WHERE log_path = ?", (log_path,)
+    ).fetchone()
+    return tuple(state) if state else (0, 0, 0)
+
+
+def _score_all(conn, n_meals: int) -> pd.DataFrame:
+    """누적 카운트 전체로 PMI 계산 (DB에는 쓰지 않음)"""
+    all_single = dict(conn.exec_driver_sql("SELECT food_name, count FROM food_single_counts").fetchall())
+    kept = eligible_singles(all_single, load_valid_foods())
+    return score_pairs(_select_pairs(conn, None), kept, n_meals, len(kept))
+
+
+def _read_scored(conn) -> pd.DataFrame:
+    rows = conn.exec_driver_sql(
+        "SELECT p.food_a, p.food_b, p.count_ab, a.count, b.count, p.pmi, p.lift, p.score "
+        "FROM food_pair_counts p "
+        "JOIN food_single_counts a ON a.food_name = p.food_a "
+        "JOIN food_single_counts b ON b.food_name = p.food_b "
+        "WHERE p.score IS NOT NULL"
+    ).fetchall()
+    return pd.DataFrame(rows, columns=["food_a", "food_b", "count_ab", "count_a", "count_b", "pmi", "lift", "score"])
+
+
+# ---------------------------------------------------------
+# 6️⃣ 메인 학습 함수 (증분)
+# ---------------------------------------------------------
+def train_from_logs(log_path: str = LOG_PATH, full: bool = False, rebuild: bool = False) -> pd.DataFrame:
+    """
+    저장된 바이트 위치 이후의 로그만 읽어 누적 카운트에 더하고, 새 로그에 등장한 페어만 PMI 재계산.
+    full=True: 누적 카운트로 전체 PMI 재계산 (로그 재독 없음, 유효 음식 DB가 바뀌었을 때 등)
+    rebuild=True: 누적 카운트를 비우고 로그 처음부터 다시 학습
+    로그 파일이 offset보다 작아졌으면(교체/절단) 자동으로 rebuild.
+    로그 파일이 없으면(로테이션 중 등) 누적 카운트는 그대로 두고 새 로그 없음으로 처리.
+    """
+    t0 = time.perf_counter()
+    for table in PAIR_TABLES:
+        table.__table__.create(bind=db.engine, checkfirst=True)
+
+    with db.engine.begin() as conn:
+        offset, n_meals, refresh_meals = _read_state(conn, log_path)
+        exists = os.path.exists(log_path)
+
+        # ⚙️ 로그/학습 이력이 모두 없으면 샘플로 출력만 생성 (누적 카운트에는 넣지 않음)
+        if not exists and n_meals == 0:
+            print("⚠️ No logs found. Generating small synthetic sample for testing...")
+            return _train_in_memory(_sample_logs())
+        if not exists:
+            if rebuild:
+                raise FileNotFoundError(f"rebuild requires the log file: {log_path}")
+            print(f"⚠️ Log file missing ({log_path}) → keeping counters, no new logs")
+
+        size = os.path.getsize(log_path) if exists else offset
+        if rebuild or size < offset:
+            if not rebuild:
+                print(f"⚠️ Log file shrank ({size} < offset {offset}) → rebuilding counters")
+            conn.exec_driver_sql("DELETE FROM food_single_counts")
+            conn.exec_driver_sql("DELETE FROM food_pair_counts")
+            offset, n_meals, refresh_meals = 0, 0, 0
+
+        # ---- 새 로그만 스트리밍 ----
+        progress: Dict = {}
+        if size > offset:
+            single, pair, new_meals = count_logs(iter_logs(log_path, offset, progress))
+        else:
+            single, pair, new_meals = Counter(), Counter(), 0
+        new_offset = progress.get("offset", offset)
+        n_meals += new_meals
+        _upsert_counts(conn, single, pair)
+
+        # ---- PMI 재계산 범위 ----
+        refresh_all = full or rebuild or refresh_meals == 0 or n_meals >= refresh_meals * (1 + FULL_REFRESH_RATIO)
+        touched = None if refresh_all else {_norm_pair(a, b) for a, b in pair}
+
+        if refresh_all:
+            pairs = _score_all(conn, n_meals)
+        elif touched:
+            all_single = dict(conn.exec_driver_sql("SELECT food_name, count FROM food_single_counts").fetchall())
+            kept = eligible_singles(all_single, load_valid_foods())
+            pairs = score_pairs(_select_pairs(conn, touched), kept, n_meals, len(kept))
+        else:
+            pairs = None
+        if pairs is not None and len(pairs):
+            values = pairs[["pmi", "lift", "score"]].astype(object).where(pairs[["pmi", "lift", "score"]].notna(), None)
+            conn.exec_driver_sql(
+                "UPDATE food_pair_counts SET pmi = ?, lift = ?, score = ? WHERE food_a = ? AND food_b = ?",
+                list(zip(values["pmi"], values["lift"], values["score"], pairs["food_a"], pairs["food_b"])),
+            )
+            n_rescored = len(pairs)
+        else:
+            n_rescored = 0
+        if refresh_all:
+            refresh_meals = n_meals
+
+        conn.exec_driver_sql(
+            "INSERT INTO food_pair_trainer_state (log_path, offset, n_meals, refresh_meals, updated_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(log_path) DO UPDATE SET "
+            "offset = excluded.offset, n_meals = excluded.n_meals, "
+            "refresh_meals = excluded.refresh_meals, updated_at = excluded.updated_at",
+            (log_path, new_offset, n_meals, refresh_meals, time.time()),
+        )
+        df = _read_scored(conn)
+
+    # 점수가 바뀐 페어가 없으면 기존 출력 유지
+    if n_rescored or not os.path.exists(PAIR_OUT_JSON):
+        write_outputs(df)
+    print(
+        f"✅ Pair training done. new days={progress.get('days', 0):,} ({new_offset - offset:,} bytes), "
+        f"meals={n_meals:,}, rescored={n_rescored:,}{' (full)' if refresh_all else ''}, "
+        f"pairs={len(df):,}, {time.perf_counter() - t0:.2f}s → {PAIR_OUT_JSON}"
+    )
+    return df
+
+
+def _train_in_memory(logs, write: bool = True) -> pd.DataFrame:
+    """로그 전체를 한 번에 세어 학습 (샘플/검증용, 누적 카운트 미사용)"""
+    single, pair, n_meals = count_logs(logs)
+    kept = eligible_singles(single, load_valid_foods())
+    pairs = pd.DataFrame([(a, b, c) for (a, b), c in pair.items()], columns=["food_a", "food_b", "count_ab"])
+    df = score_pairs(pairs, kept, n_meals, len(kept)).dropna(subset=["score"])
+    df = df.astype({"count_a": int, "count_b": int})
+    if write:
+        write_outputs(df)
+        print(f"✅ Pair training done. meals={n_meals:,}, pairs={len(df):,}, saved → {PAIR_OUT_JSON}")
     return df
 
 
+# ---------------------------------------------------------
+# 7️⃣ 검증: 증분 결과 vs 전체 일괄 학습
+# ---------------------------------------------------------
+def check_parity(log_path: str = LOG_PATH, tol: float = 1e-9) -> float:
+    """
+    누적 카운트로 전체 재계산한 점수가 (저장된 offset까지의) 로그 일괄 학습 결과와 같은지 (최대 점수 차 반환).
+    읽기 전용: 누적 카운트/학습 상태/출력 파일을 바꾸지 않음.
+    """
+    tables = inspect(db.engine).get_table_names()
+    if all(t.__tablename__ in tables for t in PAIR_TABLES):
+        with db.engine.connect() as conn:
+            offset, n_meals, _ = _read_state(conn, log_path)
+            incremental = _score_all(conn, n_meals).dropna(subset=["score"])
+    else:
+        offset, incremental = 0, pd.DataFrame(columns=["food_a", "food_b", "score"])
+    incremental = incremental.set_index(["food_a", "food_b"])["score"]
+    logs = iter_logs(log_path, end=offset) if offset else []
+    batch = _train_in_memory(logs, write=False).set_index(["food_a", "food_b"])["score"]
+    diff = float((incremental - batch).abs().max()) if len(batch) else 0.0
+    same_keys = set(incremental.index) == set(batch.index)
+    print(f"🔍 parity: pairs {len(incremental):,} vs {len(batch):,}, same keys={same_keys}, max score diff={diff:.2e}")
+    assert same_keys and diff <= tol
+    return diff
+
+
 if __name__ == "__main__":
-    train_from_logs()
+    parser = argparse.ArgumentParser(description="음식 궁합(PMI) 증분 학습")
+    parser.add_argument("--full", action="store_true", help="누적 카운트로 전체 PMI 재계산")
+    parser.add_argument("--rebuild", action="store_true", help="누적 카운트 초기화 후 로그 처음부터 학습")
+    parser.add_argument("--check", action="store_true", help="증분 결과와 일괄 학습 결과 비교 (읽기 전용)")
+    args = parser.parse_args()
+
+    if args.check:
+        check_parity()
+    else:
+        train_from_logs(full=args.full, rebuild=args.rebuild)
@@ -0,0 +1,324 @@
+# src/services/food_pipeline.py
+from __future__ import annotations
+import os, sys, ast, json, time, hashlib, argparse, importlib
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.append(PROJECT_ROOT)
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+import pyarrow.parquet as pq
+
+from src.services.food_table import DATA_DIR, stage_path, resolve
+
+# ============================================================
+# ⚙️ 설정
+# ============================================================
+MANIFEST_PATH = os.path.join(DATA_DIR, "food_pipeline_manifest.json")
+PIPELINE_WORKERS = int(os.getenv("FOOD_PIPELINE_WORKERS", "2"))
+
+RAW_FOOD_PATH = os.path.join(DATA_DIR, "food_db.xlsx")                 # 식약처 식품 DB 원본
+RAW_PROCESSED_PATH = os.path.join(DATA_DIR, "processed_food_db.xlsx")  # 식약처 가공식품 DB 원본
+MODEL_PATH = os.path.join(DATA_DIR, "health_score_model.pkl")
+
+# ------------------------------------------------------------
+# ✳️ 단계 정의
+#   run: "모듈:함수", inputs/outputs: 함수 인자명 → 파일 경로, params: 그 외 인자
+#   의존 관계는 inputs 경로를 outputs로 가진 단계로부터 자동 계산
+#
+#   캐시 키에는 단계 함수 모듈과 그 모듈이 (간접적으로) import하는 프로젝트 내부 모듈 소스가 모두 포함됨
+#   code: import로 드러나지 않지만 결과에 영향을 주는 모듈 (동적 import 등)
+#   extra_inputs: 인자로 넘기지 않고 의존 관계도 만들지 않지만 내용이 바뀌면 다시 실행할 파일
+#
+#   combine → clean ─┬→ cluster_stage1 ─────────┐
+#                    └→ extend ─────────────→ score → cluster_stage2 → ml_score → load_db
+#   (1차 군집과 영양 보정은 서로 독립이라 병렬 실행, score에서 카테고리 컬럼을 합침)
+#   score는 직전 ml_score가 저장한 모델을 씀 (extra_inputs: 모델이 바뀌면 다음 실행에서 score부터 다시,
+#   재학습 결과가 같으면 score 산출물도 같아 후속 단계는 건너뜀)
+#   load_db는 파일 산출물 없이 foods DB(planner_foods)에 적재 → DB를 새로 만들었으면 --force load_db
+# ------------------------------------------------------------
+STAGES: Dict[str, Dict] = {
+    "combine": {
+        "run": "src.processed_food:combine_food_db",
+        "inputs": {"food_path": RAW_FOOD_PATH, "processed_path": RAW_PROCESSED_PATH},
+        "outputs": {"out_path": stage_path("combined")},
+    },
+    "clean": {
+        "run": "clean_food_db:clean_food_db",
+        "inputs": {"input_path": stage_path("combined")},
+        "outputs": {"output_path": stage_path("cleaned")},
+    },
+    "cluster_stage1": {
+        "run": "src.extend_dood_db:cluster_categories",
+        "inputs": {"input_path": stage_path("cleaned")},
+        "outputs": {"output_path": stage_path("clustered_stage1")},
+    },
+    "extend": {
+        "run": "src.services.extend_food_db:extend_food_db",
+        "inputs": {"input_path": stage_path("cleaned")},
+        "outputs": {"output_path": stage_path("extended_base")},
+        "params": {"hybrid": False},
+    },
+    "score": {
+        "run": "src.services.extend_food_db:build_extended_food_db_with_hybrid",
+        "inputs": {"in_path": stage_path("extended_base"), "category_path": stage_path("clustered_stage1")},
+        "outputs": {"out_path": stage_path("extended")},
+        "params": {"alpha": 0.6},
+        "extra_inputs": [MODEL_PATH],
+    },
+    "cluster_stage2": {
+        "run": "src.services.cluster_nutrition_stage2:cluster_nutrition",
+        "inputs": {"input_path": stage_path("extended")},
+        "outputs": {"output_path": stage_path("clustered_stage2")},
+        "params": {"k_mode": os.getenv("FOOD_K_SEARCH", "exact")},
+        "extra_outputs": [os.path.join(DATA_DIR, "food_scorer.npz")],
+    },
+    "ml_score": {
+        "run": "src.services.ai_meal_quality:train_and_score",
+        "inputs": {"in_path": stage_path("clustered_stage2")},
+        "outputs": {"out_path": stage_path("scored"), "model_path": MODEL_PATH},
+        "extra_outputs": [stage_path("scored", ".arrow")],
+    },
+    "load_db": {
+        "run": "src.services.planner_store:load_planner_foods",
+        "inputs": {"in_path": stage_path("scored")},
+        "outputs": {},
+    },
+}
+
+
+def stage_deps(name: str) -> Set[str]:
+    produced = {p: s for s, spec in STAGES.items() for p in spec["outputs"].values()}
+    return {produced[p] for p in STAGES[name]["inputs"].values() if p in produced}
+
+
+def ancestors(targets: List[str]) -> List[str]:
+    """targets와 그 선행 단계들 (선언 순서 유지)"""
+    needed, stack = set(), list(targets)
+    while stack:
+        s = stack.pop()
+        if s not in needed:
+            needed.add(s)
+            stack.extend(stage_deps(s))
+    return [s for s in STAGES if s in needed]
+
+
+# ============================================================
+# 🔑 콘텐츠 해시
+# ============================================================
+_hash_memo: Dict[tuple, str] = {}
+
+
+def file_hash(path: str) -> Optional[str]:
+    found = resolve(path)
+    if found is None:
+        return None
+    st = os.stat(found)
+    memo_key = (found, st.st_mtime_ns, st.st_size)
+    if memo_key not in _hash_memo:
+        h = hashlib.sha256()
+        with open(found, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _hash_memo[memo_key] = h.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def _module_file(module: str) -> Optional[str]:
+    """프로젝트 내부 모듈 → 소스 경로 (외부/표준 라이브러리는 None, 모듈을 import하지 않음)"""
+    base = os.path.join(PROJECT_ROOT, *module.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _imported_modules(source: bytes) -> Set[str]:
+    """소스의 절대 import 대상 (from a.b import c → a.b, a.b.c; 함수 안 import 포함)"""
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module)
+            names.update(f"{node.module}.{a.name}" for a in node.names)
+    return names
+
+
+def code_deps(module: str) -> Dict[str, str]:
+    """module + 그 모듈이 (간접적으로) import하는 프로젝트 내부 모듈 → 소스 해시"""
+    hashes: Dict[str, str] = {}
+    seen, stack = set(), [module]
+    while stack:
+        m = stack.pop()
+        if m in seen:
+            continue
+        seen.add(m)
+        path = _module_file(m)
+        if path is None:
+            continue
+        with open(path, "rb") as f:
+            source = f.read()
+        hashes[m] = hashlib.sha256(source).hexdigest()
+        stack.extend(_imported_modules(source))
+    return hashes
+
+
+def stage_key(name: str) -> str:
+    """단계 코드(+ import하는 내부 모듈) + 파라미터 + 입력 파일 내용으로 만든 캐시 키"""
+    spec = STAGES[name]
+    code: Dict[str, str] = {}
+    for m in [spec["run"].split(":")[0], *spec.get("code", [])]:
+        code.update(code_deps(m))
+    payload = {
+        "stage": name,
+        "code": code,
+        "params": spec.get("params", {}),
+        "inputs": {arg: file_hash(p) for arg, p in sorted(spec["inputs"].items())},
+    }
+    if spec.get("extra_inputs"):
+        payload["extra_inputs"] = {p: file_hash(p) for p in spec["extra_inputs"]}
+    raw = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _outputs(name: str) -> List[str]:
+    spec = STAGES[name]
+    return list(spec["outputs"].values()) + spec.get("extra_outputs", [])
+
+
+def _row_count(name: str) -> Optional[int]:
+    for p in STAGES[name]["outputs"].values():
+        if p.endswith(".parquet") and os.path.exists(p):
+            return pq.read_metadata(p).num_rows
+    return None
+
+
+# ============================================================
+# 📒 실행 기록 (manifest)
+# ============================================================
+def load_manifest(path: str = MANIFEST_PATH) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict, path: str = MANIFEST_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def is_fresh(name: str, key: str, manifest: Dict) -> bool:
+    """같은 키로 실행한 기록이 있고 산출물이 그대로 남아 있으면 건너뜀"""
+    rec = manifest.get(name)
+    if not rec or rec.get("key") != key:
+        return False
+    return all(file_hash(p) == h for p, h in rec.get("outputs", {}).items())
+
+
+# ============================================================
+# 🚀 실행
+# ============================================================
+def _run_stage(name: str) -> float:
+    """워커 프로세스에서 단계 함수 실행 → 소요 시간(초)"""
+    spec = STAGES[name]
+    module, func = spec["run"].split(":")
+    fn = getattr(importlib.import_module(module), func)
+    t0 = time.perf_counter()
+    fn(**spec["inputs"], **spec["outputs"], **spec.get("params", {}))
+    return time.perf_counter() - t0
+
+
+def run_pipeline(
+    targets: Optional[List[str]] = None,
+    force: Optional[List[str]] = None,
+    workers: int = PIPELINE_WORKERS,
+) -> Dict[str, Dict]:
+    """
+    targets(기본: 전체)와 선행 단계를 의존 순서대로 실행. 의존이 모두 끝난 단계는 병렬 실행.
+    입력 해시가 기록과 같으면 건너뛰고, 강제 실행한 단계라도 산출물 내용이 그대로면 후속 단계는 건너뜀.
+    반환: 단계별 {status: ran|skipped|failed|blocked, seconds, rows}
+    """
+    order = ancestors(targets or list(STAGES))
+    force = set(STAGES) if force and "all" in force else set(force or [])
+    manifest = load_manifest()
+    deps = {s: stage_deps(s) & set(order) for s in order}
+
+    results: Dict[str, Dict] = {}
+    running = {}        # Future → 단계
+    running_keys = {}   # 단계 → 실행 시점 캐시 키
+    t_start = time.perf_counter()
+
+    def finished(s):
+        return s in results
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        while len(results) < len(order):
+            for s in order:
+                if finished(s) or s in running.values() or not all(finished(d) for d in deps[s]):
+                    continue
+                if any(results[d]["status"] in ("failed", "blocked") for d in deps[s]):
+                    results[s] = {"status": "blocked", "seconds": 0.0, "rows": None}
+                    print(f"[pipeline] ⛔ {s}: 선행 단계 실패로 건너뜀")
+                    continue
+                key = stage_key(s)
+                if s not in force and is_fresh(s, key, manifest):
+                    results[s] = {"status": "skipped", "seconds": 0.0, "rows": manifest[s].get("rows")}
+                    print(f"[pipeline] ⏭️  {s}: 입력 변경 없음 (rows={results[s]['rows']})")
+                    continue
+                print(f"[pipeline] ▶️  {s} 시작")
+                running[pool.submit(_run_stage, s)] = s
+                running_keys[s] = key
+
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                try:
+                    seconds = fut.result()
+                except Exception as e:
+                    results[s] = {"status": "failed", "seconds": 0.0, "rows": None, "error": str(e)}
+                    print(f"[pipeline] ❌ {s}: {e}")
+                    continue
+                rows = _row_count(s)
+                results[s] = {"status": "ran", "seconds": round(seconds, 2), "rows": rows}
+                manifest[s] = {
+                    "key": running_keys.pop(s),
+                    "outputs": {p: file_hash(p) for p in _outputs(s)},
+                    "rows": rows,
+                    "seconds": round(seconds, 2),
+                    "finished_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                save_manifest(manifest)
+                print(f"[pipeline] ✅ {s}: {rows if rows is not None else '-'} rows, {seconds:.2f}s")
+
+    total = time.perf_counter() - t_start
+    print("\n📊 Pipeline summary")
+    for s in order:
+        r = results[s]
+        rows = f"{r['rows']:,}" if r["rows"] is not None else "-"
+        print(f"  {s:<15} {r['status']:<8} {r['seconds']:>8.2f}s  rows={rows}")
+    print(f"  {'total':<15} {'':<8} {total:>8.2f}s")
+    return results
+
+
+# ============================================================
+# 🧩 실행 엔트리포인트
+# ============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="음식 DB 오프라인 파이프라인")
+    parser.add_argument("targets", nargs="*", help=f"실행할 단계 (기본: 전체, 선행 단계 포함): {', '.join(STAGES)}")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="캐시 무시하고 다시 실행할 단계 (all 가능)")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS, help="병렬 실행 프로세스 수")
+    args = parser.parse_args()
+    unknown = [s for s in args.targets + args.force if s not in STAGES and s != "all"]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    results = run_pipeline(args.targets or None, force=args.force, workers=args.workers)
+    sys.exit(1 if any(r["status"] in ("failed", "blocked") for r in results.values()) else 0)
@@ -75,13 +75,113 @@ def calculate_health_score_row(row: pd.Series, goal: str | None = None) -> float
 
     return float(np.clip(score, 0.0, 100.0))
 
-def add_or_recalculate_health_scores(df: pd.DataFrame, goal: str | None = None) -> pd.DataFrame:
+# ---------------------------
+# 벡터화 계산 (calculate_health_score_row와 동일한 식, 컬럼 단위)
+# ---------------------------
+GOALS = [None, "diet", "bulk", "lean"]
+
+# (항, 가중치 키, 부호) — 점수 = 100 + Σ 부호 × 항 × 가중치
+_TERMS = [
+    ("sugar", "sugar_per_g", -1.0),
+    ("sodium_100mg", "sodium_per_100mg", -1.0),
+    ("proc", "processing_per_lvl", -1.0),
+    ("gi_over55", "gi_over55_per_pt", -1.0),
+    ("fiber", "fiber_per_g", 1.0),
+    ("protein", "protein_per_g", 1.0),
+]
+
+
+def _num(df: pd.DataFrame, col: str, default: float) -> np.ndarray:
+    """_safe의 컬럼 버전: 숫자로 못 바꾸는 값/결측은 default"""
+    if col not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    return pd.to_numeric(df[col], errors="coerce").fillna(default).to_numpy(dtype=float)
+
+
+def _term_matrix(df: pd.DataFrame) -> np.ndarray:
+    """행 × 항(_TERMS 순서) 행렬"""
+    return np.column_stack([
+        _num(df, "sugar_g", 0.0),
+        _num(df, "sodium_mg", 0.0) / 100.0,
+        _num(df, "processing_level", 3.0),
+        np.maximum(0.0, _num(df, "glycemic_index", 55.0) - 55.0),
+        _num(df, "fiber_g", 0.0),
+        _num(df, "protein_g", 0.0),
+    ])
+
+
+def _weight_matrix(goals) -> np.ndarray:
+    """항 × 목표 가중치 행렬 (부호 포함)"""
+    return np.array([
+        [sign * get_weights_for_goal(g)[key] for g in goals]
+        for _, key, sign in _TERMS
+    ])
+
+
+def calculate_health_scores(df: pd.DataFrame, goals=GOALS) -> pd.DataFrame:
+    """
+    모든 행 × 여러 목표 점수를 행렬곱 한 번으로 계산.
+    반환 컬럼: health_score(기본) / health_score_<goal>
+    """
+    goals = list(goals)
+    scores = np.clip(100.0 + _term_matrix(df) @ _weight_matrix(goals), 0.0, 100.0)
+    cols = ["health_score" if g is None else f"health_score_{g}" for g in goals]
+    return pd.DataFrame(scores, index=df.index, columns=cols)
+
+
+def add_or_recalculate_health_scores(df: pd.DataFrame, goal: str | None = None, all_goals: bool = False) -> pd.DataFrame:
     """
     df에 health_score 컬럼을 추가하거나 재계산하여 반환.
+    all_goals=True면 health_score_diet / _bulk / _lean 컬럼도 함께 채움.
     """
     # 필요한 컬럼이 없으면 기본값 채우기
     for col in SAFE_COLS:
         if col not in df.columns:
             df[col] = 0.0
-    df["health_score"] = df.apply(lambda r: calculate_health_score_row(r, goal=goal), axis=1)
+    goal = str(goal).lower() if goal and str(goal).lower() in GOAL_ADJUST else None
+    scores = calculate_health_scores(df, GOALS if all_goals else [goal])
+    df["health_score"] = scores["health_score" if goal is None else f"health_score_{goal}"]
+    if all_goals:
+        for g in GOALS[1:]:
+            df[f"health_score_{g}"] = scores[f"health_score_{g}"]
     return df
+
+
+def check_parity(df: pd.DataFrame, tol: float = 1e-9) -> float:
+    """벡터화 점수와 calculate_health_score_row(기준 구현)의 최대 차이. tol을 넘으면 AssertionError."""
+    vec = calculate_health_scores(df)
+    worst = 0.0
+    for g in GOALS:
+        ref = df.apply(lambda r: calculate_health_score_row(r, goal=g), axis=1).to_numpy(dtype=float)
+        col = "health_score" if g is None else f"health_score_{g}"
+        worst = max(worst, float(np.max(np.abs(vec[col].to_numpy() - ref), initial=0.0)))
+    assert worst <= tol, f"vectorized/row health score mismatch: {worst}"
+    return worst
+
+
+if __name__ == "__main__":
+    # 기준 구현과 결과 비교 (결측/문자/범위 밖 값 포함) + 속도
+    import time
+    rng = np.random.default_rng(0)
+    n = 20000
+    sample = pd.DataFrame({
+        "sugar_g": rng.uniform(0, 60, n),
+        "sodium_mg": rng.uniform(0, 3000, n),
+        "fiber_g": rng.uniform(0, 15, n),
+        "protein_g": rng.uniform(0, 60, n),
+        "glycemic_index": rng.uniform(20, 100, n),
+        "processing_level": rng.integers(1, 6, n).astype(float),
+    })
+    for col in sample.columns:
+        sample.loc[sample.sample(frac=0.05, random_state=1).index, col] = np.nan
+    sample = sample.astype(object)
+    sample.loc[:9, "sugar_g"] = "n/a"
+    print(f"max |vectorized - row| = {check_parity(sample):.2e}")
+
+    t0 = time.perf_counter()
+    sample.apply(lambda r: calculate_health_score_row(r), axis=1)
+    t_row = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    calculate_health_scores(sample)
+    t_vec = time.perf_counter() - t0
+    print(f"{n} rows: row-wise {t_row:.3f}s (1 goal) / vectorized {t_vec:.4f}s (4 goals)")
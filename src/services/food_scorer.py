@@ -0,0 +1,263 @@
+# src/services/food_scorer.py
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event, inspect
+
+from src import db
+from src.services.food_table import DATA_DIR
+from src.services.food_quality import calculate_health_score_row, calculate_health_scores
+from src.services.extend_food_db import classify_group
+from src.services.ai_meal_quality import FEATURE_COLS, MODEL_PATH, load_model
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+SCORER_PATH = os.path.join(DATA_DIR, "food_scorer.npz")   # 2차 군집 단계가 저장 (스케일러 + 중심점 + 그룹별 1차 군집)
+HYBRID_ALPHA = 0.6                                        # extend_food_db 하이브리드 기본값과 동일
+
+# Food 컬럼 → 파이프라인 피처 이름
+FOOD_FEATURES = {
+    "calories": "energy_kcal",
+    "protein": "protein_g",
+    "fat": "fat_g",
+    "carbs": "carb_g",
+    "fiber": "fiber_g",
+    "sugar": "sugar_g",
+    "sodium": "sodium_mg",
+    "glycemic_index": "glycemic_index",
+    "processing_level": "processing_level",
+}
+SCORE_COLS = ["category_cluster", "nutrition_cluster", "health_score", "ml_health_score", "hybrid_health_score"]
+
+
+# ----------------------------------------------------------
+# 1️⃣ 아티팩트 저장 (오프라인: cluster_nutrition에서 호출)
+# ----------------------------------------------------------
+def save_scorer_artifacts(df: pd.DataFrame, cols, fill: pd.Series, scaler, kmeans, path: str = SCORER_PATH) -> str:
+    """
+    온라인 배정에 필요한 최소 정보만 numpy로 저장 (sklearn 객체 불필요).
+    - 결측 보정값, StandardScaler mean/scale, KMeans 중심점
+    - food_group별 최빈 category_cluster (런타임 음식은 카테고리 정보가 없어 이름 기반 그룹으로 대체)
+    - 중심점별 평균 ml_health_score (런타임 1건 배정은 모델 대신 이 값 사용, 없으면 NaN)
+    """
+    groups, group_clusters = np.array([], dtype=str), np.array([], dtype=np.int64)
+    default_cat = -1
+    if {"food_group", "category_cluster"} <= set(df.columns):
+        cat = df[["food_group", "category_cluster"]].dropna()
+        if len(cat):
+            modes = cat.groupby("food_group")["category_cluster"].agg(lambda s: s.mode().iloc[0])
+            groups = np.array([str(g) for g in modes.index], dtype=str)
+            group_clusters = modes.to_numpy(dtype=np.int64)
+            default_cat = int(cat["category_cluster"].mode().iloc[0])
+
+    centroid_ml = np.full(len(kmeans.cluster_centers_), np.nan)
+    if {"nutrition_cluster", "ml_health_score"} <= set(df.columns):
+        means = pd.to_numeric(df["ml_health_score"], errors="coerce").groupby(df["nutrition_cluster"]).mean()
+        centroid_ml[means.index.to_numpy(dtype=int)] = means.to_numpy(dtype=float)
+
+    tmp = path + ".tmp.npz"
+    np.savez(
+        tmp,
+        cols=np.array(cols, dtype=str),
+        fill=fill[list(cols)].to_numpy(dtype=float),
+        mean=scaler.mean_,
+        scale=scaler.scale_,
+        centroids=kmeans.cluster_centers_,
+        groups=groups,
+        group_clusters=group_clusters,
+        default_category_cluster=np.array(default_cat),
+        centroid_ml=centroid_ml,
+    )
+    os.replace(tmp, path)
+    print(f"💾 Saved online scorer artifacts → {path}")
+    return path
+
+
+# ----------------------------------------------------------
+# 2️⃣ 로드 (파일이 바뀌면 다시 읽음)
+# ----------------------------------------------------------
+_lock = threading.Lock()
+_state: Dict = {"mtime": None, "art": None, "model": None, "model_mtime": None}
+
+
+def _artifacts() -> Optional[Dict]:
+    try:
+        mtime = os.path.getmtime(SCORER_PATH)
+    except OSError:
+        return None
+    with _lock:
+        if _state["mtime"] != mtime:
+            with np.load(SCORER_PATH) as z:
+                art = {k: z[k] for k in z.files}
+            art["cols"] = [str(c) for c in art["cols"]]
+            art["group_map"] = dict(zip((str(g) for g in art["groups"]), art["group_clusters"].tolist()))
+            art["default_category_cluster"] = int(art["default_category_cluster"])
+            _state.update(mtime=mtime, art=art)
+        return _state["art"]
+
+
+def _model():
+    """ML 점수 모델 (없거나 로드 실패 시 None → 규칙 점수로 대체)"""
+    try:
+        mtime = os.path.getmtime(MODEL_PATH)
+    except OSError:
+        return None
+    with _lock:
+        if _state["model_mtime"] != mtime:
+            try:
+                _state["model"] = load_model(MODEL_PATH)
+            except Exception as e:
+                print(f"[food_scorer] 건강 점수 모델 로드 실패 → 규칙 점수 사용: {e}")
+                _state["model"] = None
+            _state["model_mtime"] = mtime
+        return _state["model"]
+
+
+# ----------------------------------------------------------
+# 3️⃣ 점수/군집 계산 (벡터화: 1행이든 대량이든 같은 경로)
+# ----------------------------------------------------------
+def nearest_centroid(X: np.ndarray, art: Dict, dims: Optional[np.ndarray] = None) -> np.ndarray:
+    """dims: 거리 계산에 쓸 컬럼 마스크 (None이면 전체)"""
+    X = np.where(np.isnan(X), art["fill"], X)
+    Z = (X - art["mean"]) / art["scale"]
+    C = art["centroids"]
+    if dims is not None:
+        Z, C = Z[:, dims], C[:, dims]
+    d = ((Z[:, None, :] - C[None, :, :]) ** 2).sum(axis=2)
+    return d.argmin(axis=1)
+
+
+def _centroid_ml(art: Dict, cluster: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+    ml = art.get("centroid_ml")
+    if ml is None or not len(ml):
+        return fallback
+    est = ml[cluster]
+    return np.where(np.isnan(est), fallback, est)
+
+
+def centroid_scores(X: np.ndarray, rule: np.ndarray, art: Dict):
+    """
+    모델 없이 (군집, ML, 하이브리드) 추정. 오프라인과 같은 순서에서 모델 예측만 중심점 평균으로 대체:
+    영양 성분만으로 최근접 중심점 → 그 ML 평균으로 하이브리드 → 하이브리드 포함 최근접 중심점 → ML 평균.
+    """
+    hybrid_col = [c == "hybrid_health_score" for c in art["cols"]]
+    ml_first = _centroid_ml(art, nearest_centroid(X, art, ~np.array(hybrid_col)), rule)
+    hybrid = np.clip(HYBRID_ALPHA * rule + (1.0 - HYBRID_ALPHA) * ml_first, 0.0, 100.0)
+    X = np.where(hybrid_col, hybrid[:, None], X)
+    cluster = nearest_centroid(X, art)
+    return cluster, _centroid_ml(art, cluster, rule), hybrid
+
+
+def _predict(model, feats: pd.DataFrame, fallback: np.ndarray) -> np.ndarray:
+    if model is None:
+        return fallback
+    return np.clip(model.predict(feats[FEATURE_COLS]), 0.0, 100.0)
+
+
+def score_frame(frame: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    파이프라인 피처 이름(energy_kcal 등) + food_name 표 → SCORE_COLS (대량 적재용, 모델 사용).
+    오프라인 순서를 그대로 따름: 규칙 점수 → ML(영양 군집 없이) → 하이브리드 → 최근접 중심점 → ML 재예측.
+    아티팩트가 없으면 None.
+    """
+    art = _artifacts()
+    if art is None:
+        return None
+
+    feats = pd.DataFrame(index=frame.index)
+    for col in FOOD_FEATURES.values():
+        feats[col] = pd.to_numeric(frame[col], errors="coerce") if col in frame.columns else np.nan
+
+    rule = calculate_health_scores(feats, goals=[None])["health_score"].to_numpy()
+
+    names = frame["food_name"].astype(str) if "food_name" in frame.columns else pd.Series("", index=frame.index)
+    feats["category_cluster"] = [art["group_map"].get(classify_group(n), art["default_category_cluster"]) for n in names]
+    feats["nutrition_cluster"] = 0
+
+    model = _model()
+    ml_first = _predict(model, feats.fillna(0.0), rule)
+    hybrid = np.clip(HYBRID_ALPHA * rule + (1.0 - HYBRID_ALPHA) * ml_first, 0.0, 100.0)
+
+    feats["hybrid_health_score"] = hybrid
+    X = feats[art["cols"]].to_numpy(dtype=float)
+    feats["nutrition_cluster"] = nearest_centroid(X, art)
+    ml = _predict(model, feats.fillna(0.0), rule)
+
+    return pd.DataFrame({
+        "category_cluster": feats["category_cluster"].astype(int),
+        "nutrition_cluster": feats["nutrition_cluster"].astype(int),
+        "health_score": rule,
+        "ml_health_score": ml,
+        "hybrid_health_score": hybrid,
+    }, index=frame.index)
+
+
+def score_foods(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Food 컬럼 이름(calories / carbs ... / name) 표용 래퍼 (대량 적재용)"""
+    frame = df.rename(columns={**FOOD_FEATURES, "name": "food_name"})
+    return score_frame(frame)
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def apply_to_food(food: "db.Food") -> bool:
+    """
+    Food 객체 1개에 군집/점수 채움 (저장 요청 경로: 규칙 점수 + 최근접 중심점만, 모델/DataFrame 없음).
+    아티팩트가 없으면 False.
+    """
+    art = _artifacts()
+    if art is None:
+        return False
+    row = {feat: getattr(food, attr) for attr, feat in FOOD_FEATURES.items()}
+    rule = np.array([calculate_health_score_row(row)])
+    X = np.array([[_float(row.get(c)) for c in art["cols"]]])
+    cluster, ml, hybrid = centroid_scores(X, rule, art)
+
+    food.category_cluster = int(art["group_map"].get(classify_group(food.name or ""), art["default_category_cluster"]))
+    food.nutrition_cluster = int(cluster[0])
+    food.health_score = float(rule[0])
+    food.ml_health_score = float(ml[0])
+    food.hybrid_health_score = float(hybrid[0])
+    return True
+
+
+# ----------------------------------------------------------
+# 4️⃣ 저장 시 자동 배정 (ORM 이벤트)
+# ----------------------------------------------------------
+_registered = False
+SCORE_INPUTS = [*FOOD_FEATURES, "name"]   # 이 값들이 바뀔 때만 UPDATE에서 재계산
+
+
+def _on_food_write(mapper, connection, target):
+    # 모델 예측 없이 중심점 평균 사용 → 요청 지연 없음 (모델 점수는 파이프라인/대량 적재의 score_foods가 채움)
+    try:
+        apply_to_food(target)
+    except Exception as e:
+        # 점수 계산 실패가 음식 저장을 막지 않도록
+        print(f"[food_scorer] {target.name} 점수 계산 실패: {e}")
+
+
+def _on_food_update(mapper, connection, target):
+    # 영양 성분/이름이 그대로면 기존 점수(load_db 파이프라인 값 포함) 유지
+    attrs = inspect(target).attrs
+    if any(attrs[attr].history.has_changes() for attr in SCORE_INPUTS):
+        _on_food_write(mapper, connection, target)
+
+
+def register_food_scoring():
+    """Food INSERT 직전, 그리고 영양 성분이 바뀐 UPDATE 직전에 군집/점수 배정 (앱 시작 시 1회)"""
+    global _registered
+    if _registered:
+        return
+    event.listen(db.Food, "before_insert", _on_food_write)
+    event.listen(db.Food, "before_update", _on_food_update)
+    _registered = True
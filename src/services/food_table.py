@@ -0,0 +1,167 @@
+# src/services/food_table.py
+import os
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+DATA_DIR = os.path.join("src", "data")
+# 단계별 Excel 사본도 남길지 (검수용 부산물, 기본 꺼짐)
+EXPORT_EXCEL = os.getenv("FOOD_PIPELINE_EXCEL", "0") == "1"
+
+# 오프라인 파이프라인 단계 → 파일명(확장자 제외)
+STAGES = {
+    "combined": "combined_food_db",                          # processed_food.py
+    "cleaned": "cleaned_food_db",                            # clean_food_db.py
+    "clustered_stage1": "extended_food_db_clustered_stage1", # extend_dood_db.py
+    "extended_base": "extended_food_db_base",                # services/extend_food_db.py (규칙 점수까지)
+    "extended": "extended_food_db",                          # services/extend_food_db.py (하이브리드 점수)
+    "clustered_stage2": "extended_food_db_clustered_stage2", # services/cluster_nutrition_stage2.py
+    "scored": "extended_food_db_scored",                     # services/ai_meal_quality.py
+}
+
+# 읽기 우선순위: Arrow IPC(메모리 맵) → Parquet → Excel(기존 산출물 호환)
+READ_ORDER = [".arrow", ".parquet", ".xlsx"]
+
+
+def stage_path(stage: str, ext: str = ".parquet") -> str:
+    return os.path.join(DATA_DIR, STAGES[stage] + ext)
+
+
+# ----------------------------------------------------------
+# 1️⃣ 컬럼 타입 (단계 간 공통 스키마)
+# ----------------------------------------------------------
+STRING_COLS = [
+    "food_code", "food_name", "category_large", "category_medium", "category_small", "category_detail",
+    "category_main", "category_function", "food_group", "food_origin", "data_type", "source", "company",
+    "serving_size",
+]
+FLOAT_COLS = [
+    "energy_kcal", "protein_g", "fat_g", "carb_g", "fiber_g", "sugar_g", "sodium_mg",
+    "serving_size_g", "serving_min_g", "serving_max_g", "glycemic_index", "processing_level",
+    "health_score", "health_score_diet", "health_score_bulk", "health_score_lean",
+    "ml_health_score", "hybrid_health_score",
+]
+INT_COLS = ["category_cluster", "nutrition_cluster", "is_flexible"]
+BOOL_COLS = ["is_estimated"]
+
+_ARROW_TYPES = {
+    **{c: pa.string() for c in STRING_COLS},
+    **{c: pa.float64() for c in FLOAT_COLS},
+    **{c: pa.int64() for c in INT_COLS},
+    **{c: pa.bool_() for c in BOOL_COLS},
+}
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """알려진 컬럼을 고정 타입으로 변환 (변환 불가 값은 결측). 모르는 컬럼은 그대로."""
+    df = df.copy()
+    for c in df.columns:
+        if c in FLOAT_COLS:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+        elif c in INT_COLS:
+            df[c] = pd.to_numeric(df[c], errors="coerce").round().astype("Int64")
+        elif c in BOOL_COLS:
+            df[c] = df[c].astype("boolean")
+        elif c in STRING_COLS:
+            # 숫자/문자 섞인 엑셀 컬럼(식품코드 등)도 문자열로, 결측은 유지
+            df[c] = df[c].where(df[c].isna(), df[c].astype(str)).astype(object)
+    return df
+
+
+def arrow_schema(df: pd.DataFrame) -> pa.Schema:
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    return pa.schema([
+        pa.field(f.name, _ARROW_TYPES.get(f.name, f.type)) for f in inferred
+    ])
+
+
+# ----------------------------------------------------------
+# 2️⃣ 쓰기 (Parquet 기본 + 선택적 Arrow IPC / Excel)
+# ----------------------------------------------------------
+def _base(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return root if ext in READ_ORDER else path
+
+
+def write_table(df: pd.DataFrame, path: str, excel: Optional[bool] = None, arrow: bool = False) -> str:
+    """
+    path(확장자 무관)의 .parquet으로 저장 후 경로 반환.
+    arrow=True: 런타임 메모리 맵용 비압축 .arrow(IPC)도 저장
+    excel=True (기본: FOOD_PIPELINE_EXCEL): 검수용 .xlsx 사본
+    """
+    base = _base(path)
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+
+    df = apply_schema(df)
+    table = pa.Table.from_pandas(df, schema=arrow_schema(df), preserve_index=False)
+
+    out = base + ".parquet"
+    tmp = out + ".tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, out)
+
+    if arrow:
+        tmp = base + ".arrow.tmp"
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, base + ".arrow")
+
+    if EXPORT_EXCEL if excel is None else excel:
+        df.to_excel(base + ".xlsx", index=False)
+    return out
+
+
+# ----------------------------------------------------------
+# 3️⃣ 읽기
+# ----------------------------------------------------------
+def resolve(path: str) -> Optional[str]:
+    """
+    같은 이름의 .arrow → .parquet → .xlsx 중 첫 번째.
+    path 자체가 있으면 그보다 오래된 변환본은 건너뜀 (원본을 다시 저장했는데 이전 .arrow를 읽지 않도록).
+    """
+    src_mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    base = _base(path)
+    for ext in READ_ORDER:
+        cand = base + ext
+        if not os.path.exists(cand):
+            continue
+        if cand == path or src_mtime is None or os.path.getmtime(cand) >= src_mtime:
+            return cand
+    return path if src_mtime is not None else None
+
+
+def table_exists(path: str) -> bool:
+    return resolve(path) is not None
+
+
+def read_table(path: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    단계 산출물 읽기. columns를 주면 있는 컬럼만 읽음 (없는 컬럼은 무시).
+    .arrow는 메모리 맵으로 열어 복사 없이 읽고, .xlsx는 기존 산출물 호환용.
+    """
+    found = resolve(path)
+    if found is None:
+        raise FileNotFoundError(path)
+
+    wanted: Optional[List[str]] = list(columns) if columns is not None else None
+    ext = os.path.splitext(found)[1]
+    if ext == ".arrow":
+        with pa.memory_map(found, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if wanted is not None:
+            table = table.select([c for c in wanted if c in table.column_names])
+        return table.to_pandas()
+    if ext == ".parquet":
+        if wanted is not None:
+            names = pq.read_schema(found).names
+            wanted = [c for c in wanted if c in names]
+        return pd.read_parquet(found, columns=wanted)
+
+    print(f"[food_table] Excel 산출물 사용 (Parquet 없음): {found}")
+    df = pd.read_excel(found)
+    return df[[c for c in wanted if c in df.columns]] if wanted is not None else df
@@ -0,0 +1,277 @@
+# src/services/gemini_client.py
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterator, Optional
+
+import requests
+from src import db
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/models")  # 로컬 스텁 테스트 시 변경
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+
+# 엔드포인트별 캐시 유지 시간(초). 환경변수 LLM_CACHE_TTL_<ENDPOINT>로 덮어쓰기 가능, 0이면 캐시 안 함
+LLM_CACHE_TTL = {
+    "home_one_liner": 24 * 3600,    # 이름/점수/패턴 → 하루 단위로만 바뀜
+    "meal_plan": 6 * 3600,
+    "chat_coach": 10 * 60,
+    "food_photo": 7 * 24 * 3600,    # Azure 분석 결과가 같으면 같은 추정
+}
+
+
+def gemini_url(method: str = "generateContent", model: str = GEMINI_MODEL) -> str:
+    return f"{GEMINI_BASE_URL}/{model}:{method}"
+
+
+def cache_ttl(endpoint: str) -> float:
+    env = os.getenv(f"LLM_CACHE_TTL_{endpoint.upper()}")
+    return float(env) if env is not None else float(LLM_CACHE_TTL.get(endpoint, 0))
+
+
+class GeminiError(Exception):
+    """Gemini 호출 실패 (HTTP 오류 / 네트워크 오류 / 빈 응답). 호출자가 HTTPException 등으로 변환."""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"Gemini API error {status_code}: {text[:200]}")
+        self.status_code = status_code
+        self.text = text
+
+    @classmethod
+    def from_request(cls, e: requests.RequestException) -> "GeminiError":
+        """타임아웃 → 504, 연결 실패 등 나머지 → 503"""
+        return cls(504 if isinstance(e, requests.Timeout) else 503, f"{type(e).__name__}: {e}")
+
+
+# ----------------------------------------------------------
+# 1️⃣ REST 호출 (캐시 없음)
+# ----------------------------------------------------------
+def build_payload(prompt: str, generation_config: Optional[Dict] = None) -> Dict:
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    if generation_config:
+        payload["generationConfig"] = generation_config
+    return payload
+
+
+def _headers() -> Dict:
+    return {"Content-Type": "application/json", "X-goog-api-key": os.getenv("GEMINI_API_KEY", "")}
+
+
+def _candidate_text(body: Dict) -> str:
+    parts = body["candidates"][0]["content"]["parts"]
+    return "".join(p.get("text", "") for p in parts)
+
+
+def call_gemini(prompt: str, generation_config: Optional[Dict] = None, model: str = GEMINI_MODEL) -> str:
+    """generateContent 1회 호출 → 첫 후보 텍스트"""
+    try:
+        response = requests.post(
+            gemini_url("generateContent", model),
+            headers=_headers(),
+            json=build_payload(prompt, generation_config),
+            timeout=GEMINI_TIMEOUT,
+        )
+    except requests.RequestException as e:
+        raise GeminiError.from_request(e) from e
+    if response.status_code != 200:
+        raise GeminiError(response.status_code, response.text)
+
+    try:
+        text = _candidate_text(response.json())
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise GeminiError(response.status_code, response.text)
+    if not text:
+        raise GeminiError(response.status_code, "empty response")
+    return text
+
+
+def stream_gemini(prompt: str, generation_config: Optional[Dict] = None, model: str = GEMINI_MODEL) -> Iterator[str]:
+    """
+    streamGenerateContent(alt=sse) 호출 → 도착하는 텍스트 조각을 순서대로 yield.
+    연결 실패·스트림 도중 끊김(타임아웃 포함)도 GeminiError로 변환.
+    """
+    try:
+        response = requests.post(
+            gemini_url("streamGenerateContent", model),
+            params={"alt": "sse"},
+            headers=_headers(),
+            json=build_payload(prompt, generation_config),
+            timeout=GEMINI_TIMEOUT,
+            stream=True,
+        )
+    except requests.RequestException as e:
+        raise GeminiError.from_request(e) from e
+
+    with response:
+        if response.status_code != 200:
+            raise GeminiError(response.status_code, response.text)
+
+        # text/event-stream에 charset이 없으면 requests가 ISO-8859-1로 디코딩 → 바이트로 받아 UTF-8로 직접 디코딩
+        lines = response.iter_lines()
+        while True:
+            try:
+                raw = next(lines, None)
+            except requests.RequestException as e:
+                raise GeminiError.from_request(e) from e
+            if raw is None:
+                break
+            line = raw.decode("utf-8", errors="replace")
+            if not line.startswith("data:"):
+                continue
+            try:
+                text = _candidate_text(json.loads(line[len("data:"):]))
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue  # 텍스트 없는 조각(finishReason / usageMetadata 등)
+            if text:
+                yield text
+
+
+# ----------------------------------------------------------
+# 2️⃣ 캐시 키 (정규화 프롬프트 + 모델 + 생성 옵션)
+# ----------------------------------------------------------
+def normalize_prompt(prompt: str) -> str:
+    """들여쓰기/줄바꿈/연속 공백 차이는 같은 프롬프트로 취급"""
+    return " ".join(prompt.split())
+
+
+def cache_key(prompt: str, model: str = GEMINI_MODEL, generation_config: Optional[Dict] = None) -> str:
+    raw = json.dumps(
+        [model, normalize_prompt(prompt), generation_config or {}],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[str]:
+    session = db.SessionLocal()
+    try:
+        row = session.get(db.LLMResponseCache, key)
+        if row is None:
+            return None
+        if row.expires_at <= time.time():
+            session.delete(row)
+            session.commit()
+            return None
+        return row.response
+    finally:
+        session.close()
+
+
+def _cache_put(key: str, endpoint: str, model: str, text: str, ttl: float):
+    now = time.time()
+    session = db.SessionLocal()
+    try:
+        session.merge(db.LLMResponseCache(
+            key=key, endpoint=endpoint, model=model, response=text,
+            created_at=now, expires_at=now + ttl,
+        ))
+        session.commit()
+    finally:
+        session.close()
+
+
+def purge_expired() -> int:
+    """만료된 캐시 행 삭제"""
+    session = db.SessionLocal()
+    try:
+        n = (
+            session.query(db.LLMResponseCache)
+            .filter(db.LLMResponseCache.expires_at <= time.time())
+            .delete(synchronize_session=False)
+        )
+        session.commit()
+        return n
+    finally:
+        session.close()
+
+
+# ----------------------------------------------------------
+# 3️⃣ 캐시 + single-flight 호출
+# ----------------------------------------------------------
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def generate_text(
+    prompt: str,
+    endpoint: str,
+    generation_config: Optional[Dict] = None,
+    model: str = GEMINI_MODEL,
+    validate: Optional[Callable[[str], object]] = None,
+) -> str:
+    """
+    캐시 → (동일 요청 진행 중이면 그 결과 대기) → Gemini 호출 → 캐시 저장.
+    성공한 응답만 저장하며, 실패는 같은 요청을 기다리던 호출자 모두에게 GeminiError로 전파.
+    validate: 저장 전 응답 검사 함수. 예외를 던지면 캐시하지 않고 그 예외를 전파.
+    """
+    ttl = cache_ttl(endpoint)
+    key = cache_key(prompt, model, generation_config)
+
+    if ttl > 0:
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+    with _inflight_lock:
+        fut = _inflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = _inflight[key] = Future()
+
+    if not owner:
+        return fut.result()
+
+    try:
+        # 대기 없이 방금 끝난 동일 요청이 저장해 둔 결과가 있을 수 있음
+        cached = _cache_get(key) if ttl > 0 else None
+        if cached is not None:
+            fut.set_result(cached)
+            return cached
+
+        text = call_gemini(prompt, generation_config, model)
+        if validate is not None:
+            validate(text)
+        if ttl > 0:
+            _cache_put(key, endpoint, model, text, ttl)
+        fut.set_result(text)
+        return text
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def stream_text(
+    prompt: str,
+    endpoint: str,
+    generation_config: Optional[Dict] = None,
+    model: str = GEMINI_MODEL,
+) -> Iterator[str]:
+    """
+    스트리밍 버전의 generate_text.
+    캐시에 있으면 전체 응답을 한 조각으로, 없으면 스트림을 그대로 전달하고 끝까지 받은 응답을 캐시에 저장.
+    """
+    ttl = cache_ttl(endpoint)
+    key = cache_key(prompt, model, generation_config)
+
+    cached = _cache_get(key) if ttl > 0 else None
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    for text in stream_gemini(prompt, generation_config, model):
+        chunks.append(text)
+        yield text
+
+    if ttl > 0 and chunks:
+        _cache_put(key, endpoint, model, "".join(chunks), ttl)
@@ -2,6 +2,8 @@
 from datetime import date
 from sqlalchemy.orm import Session
 from src import db
+from src.services import rollup_store
+from src.services.user_context import invalidate_user_context
 
 def compute_daily_score(user_id: str, target_date: date, session: Session):
     """해당 날짜의 DailyNutritionSummary / DailyExerciseSummary 기반 점수 계산"""
@@ -59,6 +61,7 @@ def compute_daily_score(user_id: str, target_date: date, session: Session):
         .filter_by(user_id=user_id, date=target_date)
         .first()
     )
+    old_hs = rollup_store.snapshot(hs, "score")
     if not hs:
         hs = db.DailyHealthScore(user_id=user_id, date=target_date)
         session.add(hs)
@@ -67,7 +70,9 @@ def compute_daily_score(user_id: str, target_date: date, session: Session):
     hs.exercise_score = round(exercise_score, 1)
     hs.balance_score = round(balance_score, 1)
     hs.total_score = total_score
+    rollup_store.apply_change(session, user_id, target_date, "score", old_hs, hs)
     session.commit()
+    invalidate_user_context(user_id)
 
     return {
         "date": str(target_date),
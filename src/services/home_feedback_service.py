@@ -2,39 +2,21 @@
 # src/services/home_feedback_service.py
 # ==========================================
 
-from datetime import date, timedelta
 from sqlalchemy.orm import Session
-from src.db import (
-    User,
-    DailyNutritionSummary,
-    DailyExerciseSummary,
-    DailyHealthScore,
-)
+from src.services.user_context import UserContextSnapshot, get_user_context
 import statistics
 import json
 import os
-import requests
+from src.services.gemini_client import generate_text
 
 
 # ==========================
 # 1) 오늘 데이터 기반 기본 한줄 헤드라인
 # ==========================
-def simple_headline_builder(user_id: str, session: Session):
-    today = date.today()
-
-    today_nut = (
-        session.query(DailyNutritionSummary)
-        .filter(DailyNutritionSummary.user_id == user_id)
-        .filter(DailyNutritionSummary.date == today)
-        .first()
-    )
-
-    today_ex = (
-        session.query(DailyExerciseSummary)
-        .filter(DailyExerciseSummary.user_id == user_id)
-        .filter(DailyExerciseSummary.date == today)
-        .first()
-    )
+def simple_headline_builder(ctx: UserContextSnapshot):
+    row = ctx.on(ctx.today)
+    today_nut = row if row is not None and row.has_nut else None
+    today_ex = row if row is not None and row.has_ex else None
 
     headline = None
     code = None
@@ -74,24 +56,10 @@ def simple_headline_builder(user_id: str, session: Session):
 # ==========================
 # 2) 최근 3일간 자동 패턴 감지
 # ==========================
-def detect_3day_patterns(user_id: str, session: Session):
-    today = date.today()
-    start = today - timedelta(days=2)
-
-    nuts = (
-        session.query(DailyNutritionSummary)
-        .filter(DailyNutritionSummary.user_id == user_id)
-        .filter(DailyNutritionSummary.date >= start)
-        .order_by(DailyNutritionSummary.date)
-        .all()
-    )
-    exes = (
-        session.query(DailyExerciseSummary)
-        .filter(DailyExerciseSummary.user_id == user_id)
-        .filter(DailyExerciseSummary.date >= start)
-        .order_by(DailyExerciseSummary.date)
-        .all()
-    )
+def detect_3day_patterns(ctx: UserContextSnapshot):
+    recent = ctx.since(3)
+    nuts = [r for r in recent if r.has_nut]
+    exes = [r for r in recent if r.has_ex]
 
     patterns = []
     actions = []
@@ -153,19 +121,9 @@ def ai_one_liner(user_name: str, health_score: float, patterns: list):
 - 밝고 긍정적인 톤
 - 한국어 존댓말
 """
-    url = (
-        "https://generativelanguage.googleapis.com/v1beta/models/"
-        "gemini-2.0-flash:generateContent"
-    )
-
-    body = {
-        "contents": [{"parts": [{"text": prompt}]}]
-    }
-
-    response = requests.post(url, params={"key": api_key}, json=body)
     try:
-        text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
-    except:
+        text = generate_text(prompt, endpoint="home_one_liner")
+    except Exception:
         text = "오늘도 작지만 의미 있는 변화가 이어지고 있어요 😊"
 
     return text.strip()
@@ -174,29 +132,23 @@ def ai_one_liner(user_name: str, health_score: float, patterns: list):
 # ==========================
 # 4) 전체 홈 피드백 통합 생성기
 # ==========================
-def generate_home_feedback(user_id: str, session: Session):
-    user = session.query(User).filter_by(id=user_id).first()
-    if not user:
+def generate_home_feedback(user_id: str, session: Session, ctx: UserContextSnapshot | None = None):
+    ctx = ctx or get_user_context(user_id, session)
+    if ctx is None:
         return {"error": "User not found"}
 
     # ① 기본 한 줄 헤드라인
-    base = simple_headline_builder(user_id, session)
+    base = simple_headline_builder(ctx)
 
     # ② 자동 패턴 감지
-    pat = detect_3day_patterns(user_id, session)
+    pat = detect_3day_patterns(ctx)
 
     # ③ 최근 건강 점수
-    recent_score = (
-        session.query(DailyHealthScore)
-        .filter(DailyHealthScore.user_id == user_id)
-        .order_by(DailyHealthScore.date.desc())
-        .first()
-    )
-    health_score = recent_score.total_score if recent_score else None
+    health_score = ctx.latest_score
 
     # ④ AI 감성 피드백
     ai_line = ai_one_liner(
-        user_name=user.name,
+        user_name=ctx.profile["name"],
         health_score=health_score,
         patterns=pat["patterns"],
     )
@@ -0,0 +1,208 @@
+# src/services/llm_json.py
+import json
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.services.gemini_client import generate_text
+
+
+class LLMParseError(ValueError):
+    """LLM 응답에서 스키마에 맞는 JSON을 찾지 못함"""
+
+
+# ----------------------------------------------------------
+# 1️⃣ 파싱 지표 (엔드포인트별 카운터)
+# ----------------------------------------------------------
+# direct: 응답 전체가 바로 JSON / extracted: 앞뒤 텍스트 제거 후 성공
+# schema_invalid: JSON은 있으나 스키마 불일치 / no_json: JSON 없음
+_metrics: Dict[str, Counter] = defaultdict(Counter)
+_metrics_lock = threading.Lock()
+
+
+def _record(endpoint: Optional[str], outcome: str, detail: str = ""):
+    if endpoint is None:
+        return
+    with _metrics_lock:
+        _metrics[endpoint][outcome] += 1
+    if outcome in ("schema_invalid", "no_json"):
+        print(f"[LLM JSON] {endpoint} 파싱 실패({outcome}): {detail[:200]}")
+
+
+def parse_metrics() -> Dict[str, Dict[str, int]]:
+    with _metrics_lock:
+        return {ep: dict(c) for ep, c in _metrics.items()}
+
+
+# ----------------------------------------------------------
+# 2️⃣ 스키마 검증 (Gemini responseSchema 부분집합)
+# ----------------------------------------------------------
+_TYPE_CHECKS = {
+    "OBJECT": lambda v: isinstance(v, dict),
+    "ARRAY": lambda v: isinstance(v, list),
+    "STRING": lambda v: isinstance(v, str),
+    "BOOLEAN": lambda v: isinstance(v, bool),
+    "NUMBER": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "INTEGER": lambda v: isinstance(v, int) and not isinstance(v, bool)
+    or (isinstance(v, float) and v.is_integer()),
+}
+
+
+def schema_errors(value: Any, schema: Dict, path: str = "$") -> List[str]:
+    """type / properties / required / items / nullable 만 검사. 오류 경로 목록 반환 (빈 리스트면 통과)."""
+    if value is None:
+        return [] if schema.get("nullable") else [f"{path}: null"]
+
+    t = schema.get("type", "").upper()
+    check = _TYPE_CHECKS.get(t)
+    if check and not check(value):
+        return [f"{path}: expected {t}, got {type(value).__name__}"]
+
+    errors = []
+    if t == "OBJECT":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: missing")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                errors += schema_errors(value[key], sub, f"{path}.{key}")
+    elif t == "ARRAY" and "items" in schema:
+        for i, item in enumerate(value):
+            errors += schema_errors(item, schema["items"], f"{path}[{i}]")
+    return errors
+
+
+# ----------------------------------------------------------
+# 3️⃣ 증분 괄호 매칭 추출기
+# ----------------------------------------------------------
+_CLOSE = {"{": "}", "[": "]"}
+
+
+def _scan(text: str, start: int, stop: int) -> Tuple[Optional[int], int, List[Tuple[int, int]]]:
+    """
+    text[start]의 { 또는 [ 부터 짝이 맞는 닫는 괄호를 찾음 (문자열/이스케이프 고려).
+    반환: (짝 위치 또는 None, 스캔을 멈춘 위치, 도중에 닫힌 가장 바깥 구간들)
+    """
+    stack: List[Tuple[str, int]] = []
+    closed: List[Tuple[int, int]] = []
+    in_str = escaped = False
+    for i in range(start, stop):
+        ch = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in _CLOSE:
+            stack.append((_CLOSE[ch], i))
+        elif ch in "}]":
+            if not stack or stack[-1][0] != ch:
+                return None, i, closed
+            _, open_at = stack.pop()
+            if not stack:
+                return i, i, closed
+            while closed and closed[-1][0] > open_at:   # 안쪽 구간은 바깥 구간으로 대체
+                closed.pop()
+            closed.append((open_at, i))
+    return None, stop, closed
+
+
+def _spans(text: str, lo: int, hi: int) -> Iterator[Tuple[int, int]]:
+    """
+    text[lo:hi]에서 괄호 짝이 맞는 가장 바깥 구간 (start, end)을 앞에서부터.
+    구간이 끝나면 그 다음 글자부터 이어서 스캔 → 각 글자를 한 번만 읽음.
+    짝이 없는 괄호는 멈춘 위치까지 그 안에서 닫힌 구간만 후보 (사이의 다른 여는 괄호도 같은 위치에서 실패).
+    """
+    i = lo
+    while i < hi:
+        if text[i] not in _CLOSE:
+            i += 1
+            continue
+        end, stopped, closed = _scan(text, i, hi)
+        if end is not None:
+            yield i, end
+            i = end + 1
+        else:
+            yield from closed
+            i = stopped + 1
+
+
+def iter_json_candidates(text: str) -> Iterator[str]:
+    """앞에서부터 괄호 짝이 맞는 가장 바깥 {...} / [...] 구간 (서로 겹치지 않음, 선형 시간)"""
+    for start, end in _spans(text, 0, len(text)):
+        yield text[start:end + 1]
+
+
+def parse_json(text: str, schema: Optional[Dict] = None, endpoint: Optional[str] = None) -> Any:
+    """
+    1) 응답 전체를 json.loads (responseMimeType=application/json 이면 대부분 여기서 끝)
+    2) 실패 시 괄호 매칭으로 후보 구간을 찾아 스키마를 통과하는 첫 JSON 반환.
+       JSON이 아닌 구간은 건너뛰고 그 다음부터, JSON이지만 스키마 불일치면 그 안쪽 구간도 후보 (바깥 먼저).
+    endpoint를 주면 결과를 parse_metrics에 기록.
+    """
+    try:
+        value = json.loads(text)
+        errors = schema_errors(value, schema) if schema else []
+        if not errors:
+            _record(endpoint, "direct")
+            return value
+    except ValueError:
+        errors = []
+
+    found_json = bool(errors)
+    todo = [_spans(text, 0, len(text))]
+    while todo:
+        span = next(todo[-1], None)
+        if span is None:
+            todo.pop()
+            continue
+        start, end = span
+        try:
+            value = json.loads(text[start:end + 1])
+        except ValueError:
+            continue
+        found_json = True
+        cand_errors = schema_errors(value, schema) if schema else []
+        if not cand_errors:
+            _record(endpoint, "extracted")
+            return value
+        errors = errors or cand_errors
+        todo.append(_spans(text, start + 1, end))
+
+    if found_json:
+        _record(endpoint, "schema_invalid", "; ".join(errors[:3]))
+        raise LLMParseError(f"스키마 불일치: {'; '.join(errors[:3])}")
+    _record(endpoint, "no_json", text)
+    raise LLMParseError("응답에서 JSON을 찾을 수 없음")
+
+
+# ----------------------------------------------------------
+# 4️⃣ 구조화 출력 호출 (스키마 요청 + 검증된 응답만 캐시)
+# ----------------------------------------------------------
+def generate_json(
+    prompt: str,
+    endpoint: str,
+    schema: Dict,
+    check: Optional[Callable[[Any], Any]] = None,
+) -> Any:
+    """
+    responseMimeType=application/json + responseSchema로 Gemini 호출 후 파싱.
+    check(value): 추가 의미 검사 (예: 일수/칼로리). 예외를 던지면 캐시하지 않고 전파.
+    파싱 실패는 LLMParseError, 호출 실패는 GeminiError.
+    """
+    def validate(text: str):
+        value = parse_json(text, schema, endpoint)
+        return check(value) if check else value
+
+    text = generate_text(
+        prompt,
+        endpoint=endpoint,
+        generation_config={"responseMimeType": "application/json", "responseSchema": schema},
+        validate=validate,
+    )
+    value = parse_json(text, schema)
+    return check(value) if check else value
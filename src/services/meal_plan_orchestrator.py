@@ -0,0 +1,218 @@
+# src/services/meal_plan_orchestrator.py
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+from src.services.ai_meal_generator_gemini import (
+    generate_realistic_meal_plan,
+    generate_weekly_meal_plan,
+    check_macros,
+)
+from src.services.meal_planner import MealPlanner
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+MEAL_PLAN_BUDGET_S = float(os.getenv("MEAL_PLAN_BUDGET_S", "8"))             # Gemini 응답 대기 한도(초)
+MEAL_PLAN_HARD_TIMEOUT_S = float(os.getenv("MEAL_PLAN_HARD_TIMEOUT_S", "20"))  # 로컬도 실패했을 때 Gemini 최대 대기(초)
+MEAL_PLAN_GEMINI_WORKERS = int(os.getenv("MEAL_PLAN_GEMINI_WORKERS", "4"))   # 동시 Gemini 호출 상한 (예산 초과 후 백그라운드 포함)
+
+# Gemini 전용 풀. 로컬 플래너는 요청 스레드에서 바로 실행하므로 느린 Gemini 작업 뒤에 줄 서지 않음
+_gemini_executor = ThreadPoolExecutor(max_workers=MEAL_PLAN_GEMINI_WORKERS, thread_name_prefix="meal-plan-gemini")
+# 대기열까지 포함한 Gemini 작업 수 상한 (가득 차면 이번 요청은 로컬 식단만 사용)
+_gemini_slots = threading.BoundedSemaphore(MEAL_PLAN_GEMINI_WORKERS)
+
+_planner = None
+_planner_lock = threading.Lock()
+
+
+def _get_planner() -> MealPlanner:
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = MealPlanner()
+        return _planner
+
+
+# ----------------------------------------------------------
+# 1️⃣ 로컬 엔진 (MealPlanner.plan_day → Gemini 식단과 같은 JSON 구조)
+# ----------------------------------------------------------
+def _plan_json(user, day: Dict) -> Dict:
+    meals = []
+    for m in day["meals"]:
+        foods = []
+        for it in m["items"]:
+            mult = float(it.get("multiplier") or 1.0)
+            # 유연 음식은 ps_* 영양소가 이미 adjusted_serving_g 기준으로 조정돼 있음
+            grams = float(it.get("adjusted_serving_g", it["serving_size_g"]))
+            foods.append({
+                "name": it["food_name"],
+                "amount_g": round(grams * mult),
+                "calories": round(it["ps_energy_kcal"] * mult),
+                "protein": round(it["ps_protein_g"] * mult, 1),
+                "fat": round(it["ps_fat_g"] * mult, 1),
+                "carb": round(it["ps_carb_g"] * mult, 1),
+            })
+        meals.append({"meal_type": f"meal_{m['meal_number']}", "foods": foods})
+
+    return {
+        "goal": getattr(user, "goal", None),
+        "total_kcal": round(day["actual_daily"]["kcal"]),
+        "meals": meals,
+    }
+
+
+def local_meal_plan(
+    user,
+    target_kcal: float,
+    macros: Dict,
+    meals_per_day: int = 3,
+    preferred_foods: List[str] | None = None,
+    excluded_foods: List[str] | None = None,
+) -> Dict:
+    targets = (target_kcal, macros["protein"], macros["fat"], macros["carb"])
+    day = _get_planner().plan_day(
+        user, meals_per_day, lambda _u: targets,
+        excluded_foods=excluded_foods, preferred_foods=preferred_foods,
+    )
+    return _plan_json(user, day)
+
+
+def local_weekly_plan(
+    user,
+    target_kcal: float,
+    macros: Dict,
+    meals_per_day: int = 3,
+    preferred_foods: List[str] | None = None,
+    excluded_foods: List[str] | None = None,
+    days: int = 7,
+) -> Dict:
+    """
+    MealPlanner.plan_week으로 하루씩 이어서 계획 (앞선 날 음식 제외 + 탄수/단백질 소스 회전 → 날마다 다른 식단).
+    날짜별 check_macros 결과(kcal·단백질·지방·탄수 오차)를 함께 반환.
+    """
+    targets = (target_kcal, macros["protein"], macros["fat"], macros["carb"])
+    plan = _get_planner().plan_week(
+        user, meals_per_day, lambda _u: targets, days=days,
+        excluded_foods=excluded_foods, preferred_foods=preferred_foods,
+    )
+    week = []
+    for d in plan["weekly_plan"]:
+        meals = _plan_json(user, d["daily_plan"])["meals"]
+        week.append({"day": d["day"], "meals": meals, "macro_check": check_macros(meals, target_kcal, macros)})
+    return {"goal": getattr(user, "goal", None), "days": week}
+
+
+# ----------------------------------------------------------
+# 2️⃣ 지연 예산 오케스트레이션 (Gemini vs 로컬)
+# ----------------------------------------------------------
+def _submit_gemini(fn, **kwargs):
+    """Gemini 작업 제출. 진행/대기 중인 작업이 상한이면 None (로컬 식단만 사용)"""
+    if not _gemini_slots.acquire(blocking=False):
+        print("[meal_plan] Gemini 작업 상한 도달 → 로컬 식단만 사용")
+        return None
+    try:
+        fut = _gemini_executor.submit(fn, **kwargs)
+    except BaseException:
+        _gemini_slots.release()
+        raise
+    fut.add_done_callback(lambda _f: _gemini_slots.release())
+    return fut
+
+
+def plan_with_budget(
+    user,
+    target_kcal: float,
+    macros: Dict,
+    meals_per_day: int = 3,
+    preferred_foods: List[str] | None = None,
+    excluded_foods: List[str] | None = None,
+    budget_s: float | None = None,
+) -> Tuple[Dict, str]:
+    """
+    Gemini를 백그라운드로 시작하고, 그동안 로컬 MealPlanner를 요청 스레드에서 계산.
+    - 예산(budget_s) 안에 Gemini가 성공하면 Gemini 식단
+    - 아니면 로컬 식단 (예산 직후 바로 반환)
+    - 로컬도 실패하면 Gemini를 MEAL_PLAN_HARD_TIMEOUT_S까지만 기다리고 504 / 502
+    늦게 끝난 Gemini 호출은 백그라운드에서 계속 진행되어 LLM 응답 캐시에 저장되므로,
+    같은 조건의 다음 요청은 캐시된 Gemini 식단을 바로 받는다.
+    반환: (식단 dict, "gemini" | "local")
+    """
+    gemini_fut = _submit_gemini(
+        generate_realistic_meal_plan,
+        user=user,
+        tdee=target_kcal,
+        macros=macros,
+        meals_per_day=meals_per_day,
+        preferred_foods=preferred_foods,
+        excluded_foods=excluded_foods,
+    )
+    return _race(
+        gemini_fut,
+        lambda: local_meal_plan(user, target_kcal, macros, meals_per_day, preferred_foods, excluded_foods),
+        budget_s,
+    )
+
+
+def weekly_plan_with_budget(
+    user,
+    target_kcal: float,
+    macros: Dict,
+    meals_per_day: int = 3,
+    preferred_foods: List[str] | None = None,
+    excluded_foods: List[str] | None = None,
+    budget_s: float | None = None,
+    days: int = 7,
+) -> Tuple[Dict, str]:
+    """
+    주간 버전: Gemini 1회 배치 요청(7일, 스키마 고정 + kcal·매크로 검증) vs 로컬 플래너 7일 연속 계획.
+    선택 규칙은 plan_with_budget과 동일.
+    """
+    gemini_fut = _submit_gemini(
+        generate_weekly_meal_plan,
+        user=user,
+        tdee=target_kcal,
+        macros=macros,
+        meals_per_day=meals_per_day,
+        preferred_foods=preferred_foods,
+        excluded_foods=excluded_foods,
+        days=days,
+    )
+    return _race(
+        gemini_fut,
+        lambda: local_weekly_plan(user, target_kcal, macros, meals_per_day, preferred_foods, excluded_foods, days),
+        budget_s,
+    )
+
+
+def _race(gemini_fut, local_fn, budget_s: float | None) -> Tuple[Dict, str]:
+    budget = MEAL_PLAN_BUDGET_S if budget_s is None else budget_s
+    started = time.monotonic()
+
+    # 로컬 식단은 Gemini가 도는 동안 요청 스레드에서 계산
+    local, errors = None, []
+    try:
+        local = local_fn()
+    except Exception as e:
+        print(f"[meal_plan] 로컬 플래너 실패: {e}")
+        errors.append(str(e))
+
+    if gemini_fut is not None:
+        # 로컬이 있으면 남은 예산까지만, 없으면 상한(hard timeout)까지 Gemini 대기
+        limit = budget if local is not None else max(budget, MEAL_PLAN_HARD_TIMEOUT_S)
+        try:
+            return gemini_fut.result(timeout=max(0.0, started + limit - time.monotonic())), "gemini"
+        except FutureTimeout:
+            if local is None:
+                raise HTTPException(status_code=504, detail="식단 생성 시간 초과")
+        except Exception as e:
+            print(f"[meal_plan] Gemini 실패 → 로컬 식단 사용: {e}")
+            errors.append(str(e))
+
+    if local is not None:
+        return local, "local"
+    raise HTTPException(status_code=502, detail=f"식단 생성 실패: {' / '.join(errors)}")
@@ -1,25 +1,30 @@
 import random
 import re
-import pandas as pd
 import os
+from collections import Counter
 from typing import List, Dict, Tuple
 from src.services.meal_optimizer import optimize_meal_macros
-import json
-FEEDBACK_PATH = os.path.join("src", "data", "user_feedback.json")
-
-def _load_user_feedback():
-    if not os.path.exists(FEEDBACK_PATH):
-        return {}
-    with open(FEEDBACK_PATH, "r", encoding="utf-8") as f:
-        feedback_list = json.load(f)
-    scores = {}
-    for fb in feedback_list:
-        food = fb.get("food_name")
-        rating = float(fb.get("rating", 0))
-        if food:
-            scores[food] = max(0.0, min(100.0, rating * 20))  # 1~5 → 20~100 변환
-    return scores
-
+from src.services.pair_index import PAIR_PARQUET, load_pair_index
+from src.services.preference_cache import get_user_prefs, pref_vector
+from src.services.food_table import read_table, table_exists, stage_path
+from src import db
+from sqlalchemy.exc import OperationalError
+# 음식 풀에 필요한 컬럼만 읽기
+POOL_COLS = [
+    "food_name", "energy_kcal", "protein_g", "fat_g", "carb_g", "serving_size_g",
+    "is_flexible", "serving_min_g", "serving_max_g", "ml_health_score", "health_score",
+]
+# 결측 기본값 (planner_foods 적재 시에도 동일하게 적용)
+POOL_DEFAULTS = {
+    "energy_kcal": 0, "protein_g": 0, "fat_g": 0, "carb_g": 0,
+    "serving_size_g": 100, "is_flexible": 0, "serving_min_g": 50, "serving_max_g": 300,
+    "ml_health_score": 60, "health_score": 60
+}
+# planner_foods 조회 (ix_planner_foods_pool 인덱스 사용, 분류 태그는 적재 시 계산됨)
+POOL_SQL = (
+    f"SELECT {', '.join(POOL_COLS)}, role, carb_source, protein_source "
+    "FROM planner_foods WHERE is_meal_candidate = 1 ORDER BY id"
+)
 
 class MealPlanner:
     """
@@ -28,13 +33,12 @@ class MealPlanner:
     - 현실식 우선: 간식/스낵/가공식 캡, 메인 대체 불가
     - 목표별 kcal 분할 + serving 유연 조정
     - kcal/단백질 오차 제어 + fallback 템플릿
+    인스턴스에는 설정과 읽기 전용 인덱스만 두고, 사용자 선호는 요청(plan_day 호출)마다 전달 → 여러 사용자가 공유해도 안전
     """
     def __init__(self):
         self.RETRY_LIMIT = 3
         self.TOL_RATIO = 0.08
         self.FORCE_TEMPLATE = True
-        self.user_pref_map = _load_user_feedback()
-
 
         # ---- 현실식 템플릿 (fallback) ----
         self.REALISTIC_TEMPLATES = [
@@ -64,6 +68,7 @@ class MealPlanner:
         self.DAILY_SNACK_DRINK_CAP = 1      # 간식/음료 하루 최대 1품목(메인 불가)
         self.MIN_DISTINCT_CARB_SOURCES = 2  # 탄수 소스 최소 2종 회전
         self.MIN_DISTINCT_PROT_SOURCES = 2  # 단백질 소스 최소 2종 회전
+        self.WEEK_SOURCE_PENALTY = 6.0      # 주간 계획: 앞선 날에 쓴 탄수/단백질 소스 1회당 감점
 
         # ---- kcal 밴드 & 단백질 상한 ----
         self.ROLE_KCAL_BAND = 0.40  # ±40%
@@ -87,14 +92,11 @@ class MealPlanner:
         }
          # ---- 데이터 경로 ----
         self.PAIR_JSON = os.path.join("src", "data", "food_pair_scores.json")
-        self.user_pref_map = {}
-        self.pair_map = {}
-        if os.path.exists(self.PAIR_JSON):
-            try:
-                with open(self.PAIR_JSON, "r", encoding="utf-8") as f:
-                    self.pair_map = json.load(f).get("pairs", {})
-            except:
-                self.pair_map = {}
+
+    @property
+    def pair_index(self):
+        """궁합 점수: 정수 ID + CSR 인덱스 (파일 mtime 캐시 → 재학습 결과가 오래 사는 인스턴스에도 반영, 인스턴스 간 공유)"""
+        return load_pair_index(PAIR_PARQUET, self.PAIR_JSON)
 
     # ========== 분류/태그 ==========
     def _is_match_any(self, name: str, keywords: List[str]) -> bool:
@@ -144,6 +146,16 @@ class MealPlanner:
                 return tag
         return "other"
 
+    def tag_food(self, name: str) -> Dict:
+        """이름 기반 분류 태그 (planner_foods 적재 / 파일 풀 공용)"""
+        role = self._classify_food_role(name)
+        return {
+            "is_meal_candidate": int(self._is_meal_candidate(name)),
+            "role": role,
+            "carb_source": self._carb_source_tag(name) if role == "main" else "none",
+            "protein_source": self._protein_source_tag(name) if role == "protein" else "none",
+        }
+
     # ========== 목표/서빙 ==========
     def _role_kcal_split(self, goal: str):
         g = (goal or "").lower()
@@ -176,13 +188,13 @@ class MealPlanner:
         return adj, ratio
 
         # ========== 스코어링 ==========
-    def _priority_score(self, food, goal, role, role_target_kcal, selected_names=None):
+    def _priority_score(self, food, goal, role, role_target_kcal, selected_names=None, pair_score=None, pref_score=None):
         """
         음식별 우선순위 점수 계산:
         - 건강도(Health Score)
         - 목표 매크로 적합도
-        - 궁합 점수 (food_pair_scores.json 기반)
-        - 사용자 선호 보너스 (self.user_pref_map)
+        - 궁합 점수 (food_pair_scores 기반, pair_score: 후보 배열에 대해 미리 계산한 궁합 합)
+        - 사용자 선호 보너스 (pref_score: 요청 사용자의 0~100 선호 점수)
         """
         quality = float(
         food.get("hybrid_health_score",
@@ -237,24 +249,14 @@ class MealPlanner:
         # -----------------------------
         # ④ 궁합 점수 보너스 (pair_map)
         # -----------------------------
-        pair_bonus = 0.0
-        if selected_names:
-            pairs = self.pair_map.get(name, [])
-            if pairs:
-                pair_dict = {n: s for n, s in pairs}
-                for sel in selected_names:
-                    if sel in pair_dict:
-                        pair_bonus += pair_dict[sel] * 30.0  # 가중치 30
-        else:
-            pair_bonus = 0.0
+        if pair_score is None:
+            pair_score = self.pair_index.bonus([name], selected_names)[0] if selected_names else 0.0
+        pair_bonus = pair_score * 30.0  # 가중치 30
 
         # -----------------------------
-        # ⑤ 사용자 선호도 반영 (향후 feedback_router)
+        # ⑤ 사용자 선호도 반영 (feedback_router 별점 + 선호 EMA)
         # -----------------------------
-        pref_bonus = 0.0
-        if self.user_pref_map:
-            pref = float(self.user_pref_map.get(name, 0.0))
-            pref_bonus = (pref / 100.0) * 15.0  # 최대 15점 가산
+        pref_bonus = (float(pref_score or 0.0) / 100.0) * 15.0  # 최대 15점 가산
 
         # -----------------------------
         # ⑥ 최종 종합 점수
@@ -272,7 +274,8 @@ class MealPlanner:
 
 
     # ========== 후보 필터 ==========
-    def _filter_candidates(self, foods, role, used_foods, daily_counters) -> List[Dict]:
+    def _filter_candidates(self, foods, role, used_foods, daily_counters, avoid=None) -> List[Dict]:
+        """avoid: 가능하면 피할 음식 (주간 계획의 앞선 날 음식). 이것만 남으면 그대로 허용"""
         cands = []
         for f in foods:
             if f["_role"] != role:
@@ -285,6 +288,9 @@ class MealPlanner:
                 if self._is_supplement(name) or self._is_drink_or_dessert(name) or self._is_highly_processed(name):
                     continue
             cands.append(f)
+        if avoid:
+            fresh = [f for f in cands if f["food_name"] not in avoid]
+            return fresh or cands
         return cands
 
     # ========== 다양성 검증 ==========
@@ -344,18 +350,41 @@ class MealPlanner:
         return ""
 
     # ========== 한 끼 구성 ==========
-    def _pick_meal(self, foods, targets, used_foods, goal, daily_counters):
+    def _pick_meal(self, foods, targets, used_foods, goal, daily_counters, pref_scores=None, week_state=None):
+        """
+        pref_scores: 풀 음식 ID(_pid) 순서의 사용자 선호 배열 (없으면 선호 보너스 없음)
+        week_state: 주간 계획 상태 (앞선 날 음식은 가능하면 제외, 많이 쓴 탄수/단백질 소스는 감점)
+        """
         role_split = self._role_kcal_split(goal)
+        avoid = week_state["used_foods"] if week_state else None
+
+        def rotation(cands, role):
+            if not week_state or role not in ("main", "protein"):
+                return [0.0] * len(cands)
+            key, counts = ("_carb_source", week_state["carb_sources"]) if role == "main" else ("_protein_source", week_state["prot_sources"])
+            return [self.WEEK_SOURCE_PENALTY * counts.get(c[key], 0) for c in cands]
+
+        def prefs_of(cands):
+            if pref_scores is None:
+                return [None] * len(cands)
+            return pref_scores[[c["_pid"] for c in cands]]
         role_targets = {r: targets["kcal"] * role_split.get(r, 0.3) for r in ["main", "protein", "side"]}
 
         selected = []
 
         # 필수: main, protein
         for role in ["main", "protein"]:
-            cands = self._filter_candidates(foods, role, used_foods, daily_counters)
+            cands = self._filter_candidates(foods, role, used_foods, daily_counters, avoid)
             if not cands:
                 return None
-            cands.sort(key=lambda x: self._priority_score(x, goal, role, role_targets[role], selected_names=[f["food_name"] for f in selected]), reverse=True)
+            # 후보 전체의 궁합 합을 한 번에 (CSR 행 gather)
+            pair_scores = self.pair_index.bonus([c["food_name"] for c in cands], [f["food_name"] for f in selected])
+            scores = [
+                self._priority_score(c, goal, role, role_targets[role], pair_score=ps, pref_score=pf) - rp
+                for c, ps, pf, rp in zip(cands, pair_scores, prefs_of(cands), rotation(cands, role))
+            ]
+            order = sorted(range(len(cands)), key=lambda i: scores[i], reverse=True)
+            cands = [cands[i] for i in order]
             # 다양성 고려하며 상위 몇 개에서 고르기
             top = cands[:10]
             pick = None
@@ -369,9 +398,14 @@ class MealPlanner:
             selected.append(pick)
 
         # 옵션: side
-        cands_side = self._filter_candidates(foods, "side", used_foods, daily_counters)
+        cands_side = self._filter_candidates(foods, "side", used_foods, daily_counters, avoid)
         if cands_side:
-            cands_side.sort(key=lambda x: self._priority_score(x, goal, "side", role_targets["side"]), reverse=True)
+            scores = [
+                self._priority_score(c, goal, "side", role_targets["side"], pref_score=pf)
+                for c, pf in zip(cands_side, prefs_of(cands_side))
+            ]
+            order = sorted(range(len(cands_side)), key=lambda i: scores[i], reverse=True)
+            cands_side = [cands_side[i] for i in order]
             top_s = cands_side[:10]
             side_pick = None
             for cand in top_s:
@@ -445,12 +479,43 @@ class MealPlanner:
         return None
 
     # ========== 하루/주간 ==========
-    def plan_day(self, user, meals_per_day, calc_fn):
+    def _keywords(self, items) -> List[str]:
+        return [str(k).strip() for k in (items or []) if k and str(k).strip()]
+
+    def new_week_state(self) -> Dict:
+        """주간 계획에서 날짜 사이에 이어지는 상태 (사용한 음식, 탄수/단백질 소스 사용 횟수)"""
+        return {"used_foods": set(), "carb_sources": Counter(), "prot_sources": Counter()}
+
+    def _update_week_state(self, meals: List[Dict], week_state: Dict):
+        for m in meals:
+            for it in m["items"]:
+                week_state["used_foods"].add(it["food_name"])
+                if it.get("_role") == "main" and it.get("_carb_source") not in (None, "none", "other"):
+                    week_state["carb_sources"][it["_carb_source"]] += 1
+                if it.get("_role") == "protein" and it.get("_protein_source") not in (None, "none", "other"):
+                    week_state["prot_sources"][it["_protein_source"]] += 1
+
+    def plan_day(self, user, meals_per_day, calc_fn, prefs=None, excluded_foods=None, preferred_foods=None, week_state=None):
+        """
+        prefs: {음식명: 0~100} (기본: 캐시된 user.id 선호)
+        excluded_foods: 이름에 포함된 음식은 풀에서 제외 (알레르기/비선호 재료, fallback 포함)
+        preferred_foods: 이름에 포함된 음식은 선호 점수 100으로 취급
+        week_state: new_week_state() 결과. 주면 앞선 날과 겹치지 않게 고르고 이 날의 선택을 누적
+        """
         goal_cal, p, f, c = calc_fn(user)
         targets = {"kcal": goal_cal, "protein_g": p, "fat_g": f, "carb_g": c}
         per_meal = {k: targets[k] / meals_per_day for k in targets}
 
-        foods = self._get_food_pool()
+        pool = self._get_food_pool()
+        if prefs is None:
+            prefs = get_user_prefs(getattr(user, "id", None))
+        preferred = self._keywords(preferred_foods)
+        if preferred:
+            prefs = {**prefs, **{it["food_name"]: 100.0 for it in pool if self._is_match_any(it["food_name"], preferred)}}
+        # 풀 음식 ID(_pid) 순서로 정렬한 이번 요청 전용 선호 배열 (제외 필터 전 전체 풀 기준)
+        pref_scores = pref_vector(prefs, [it["food_name"] for it in pool]) if prefs else None
+        excluded = self._keywords(excluded_foods)
+        foods = [it for it in pool if not self._is_match_any(it["food_name"], excluded)] if excluded else pool
         used_foods = set()
         daily_counters = {
             "bread_mains": 0,
@@ -465,7 +530,7 @@ class MealPlanner:
         meals = []
         for i in range(meals_per_day):
             for _ in range(self.RETRY_LIMIT):
-                meal = self._pick_meal(foods, per_meal, used_foods, user.goal, daily_counters)
+                meal = self._pick_meal(foods, per_meal, used_foods, user.goal, daily_counters, pref_scores, week_state)
                 if meal:
                     meal["meal_number"] = i + 1
                     meals.append(meal)
@@ -488,13 +553,21 @@ class MealPlanner:
         # 다양성 최종 검사: 탄수/단백질 소스 최소치
         # (부족하면 다음날 로테이션이 더 강하게 걸리도록 이 버전은 soft하게 통과)
         daily_actual = {k: sum(m["actuals"][k] for m in meals) for k in targets}
+        if week_state is not None:
+            self._update_week_state(meals, week_state)
         return {"target_daily": targets, "actual_daily": daily_actual, "meals": meals}
 
-    def plan_week(self, user, meals_per_day, calc_fn, days=7):
+    def plan_week(self, user, meals_per_day, calc_fn, days=7, excluded_foods=None, preferred_foods=None):
+        """하루씩 이어서 계획: 앞선 날 음식은 가능하면 제외하고 탄수/단백질 소스를 돌려 씀 (날마다 다른 식단)"""
         week = []
         totals = {"kcal": 0, "protein_g": 0, "fat_g": 0, "carb_g": 0}
+        prefs = get_user_prefs(getattr(user, "id", None))
+        week_state = self.new_week_state()
         for d in range(days):
-            day = self.plan_day(user, meals_per_day, calc_fn)
+            day = self.plan_day(
+                user, meals_per_day, calc_fn, prefs=prefs,
+                excluded_foods=excluded_foods, preferred_foods=preferred_foods, week_state=week_state,
+            )
             week.append({"day": d + 1, "daily_plan": day})
             for k in totals:
                 totals[k] += day["actual_daily"][k]
@@ -503,44 +576,57 @@ class MealPlanner:
 
     # ========== DB 로드 ==========
     def _get_food_pool(self) -> List[Dict]:
-        excel_path = os.path.join("src", "data", "extended_food_db_scored.xlsx")
-        if not os.path.exists(excel_path):
-            excel_path = os.path.join("src", "data", "extended_food_db.xlsx")
+        # foods DB의 planner_foods 우선, 비어 있으면(파이프라인 load_db 미실행) 산출물 파일에서 읽음
+        try:
+            with db.engine.connect() as conn:
+                rows = conn.exec_driver_sql(POOL_SQL).mappings().all()
+        except OperationalError:
+            rows = []
+        if rows:
+            pool = [self._pool_item(r, r) for r in rows]
+        else:
+            print("[MealPlanner] planner_foods 비어 있음 → 산출물 파일에서 음식 풀 로드")
+            pool = self._get_food_pool_from_table()
+
+        # 음식 ID = 풀 내 위치 (요청별 선호 배열의 인덱스)
+        for pid, item in enumerate(pool):
+            item["_pid"] = pid
+        return pool
 
-        df = pd.read_excel(excel_path)
-        df = df.fillna({
-            "energy_kcal": 0, "protein_g": 0, "fat_g": 0, "carb_g": 0,
-            "serving_size_g": 100, "is_flexible": 0, "serving_min_g": 50, "serving_max_g": 300,
-            "ml_health_score": 60, "health_score": 60
-        })
+    def _get_food_pool_from_table(self) -> List[Dict]:
+        # 점수 산출물(Arrow 메모리 맵 → Parquet → Excel) 우선, 없으면 확장 DB
+        table_path = stage_path("scored", ".arrow")
+        if not table_exists(table_path):
+            table_path = stage_path("extended", ".arrow")
+
+        df = read_table(table_path, columns=POOL_COLS).fillna(POOL_DEFAULTS)
 
         pool = []
-        for _, r in df.iterrows():
-            name = str(r["food_name"])
-            if not self._is_meal_candidate(name):
+        for r in df.to_dict("records"):
+            tags = self.tag_food(str(r["food_name"]))
+            if not tags["is_meal_candidate"]:
                 # 식사로 부적합한 품목은 전체에서 제외
                 continue
-
-            serving = float(max(30.0, min(400.0, r["serving_size_g"])))
-            mult = serving / 100.0
-
-            item = {
-                "food_name": name,
-                "serving_size_g": serving,
-                "ps_energy_kcal": float(r["energy_kcal"]) * mult,
-                "ps_protein_g": float(r["protein_g"]) * mult,
-                "ps_fat_g": float(r["fat_g"]) * mult,
-                "ps_carb_g": float(r["carb_g"]) * mult,
-                "ml_health_score": float(r.get("ml_health_score", 60.0)),
-                "health_score": float(r.get("health_score", 60.0)),
-                "is_flexible": int(r.get("is_flexible", 0)),
-                "serving_min_g": float(r.get("serving_min_g", 50.0)),
-                "serving_max_g": float(r.get("serving_max_g", 300.0)),
-            }
-            role = self._classify_food_role(name)
-            item["_role"] = role
-            item["_carb_source"] = self._carb_source_tag(name) if role == "main" else "none"
-            item["_protein_source"] = self._protein_source_tag(name) if role == "protein" else "none"
-            pool.append(item)
-
+            pool.append(self._pool_item(r, tags))
         return pool
+
+    def _pool_item(self, r, tags) -> Dict:
+        """100g 기준 행 → 1회 제공량 기준 풀 항목"""
+        serving = float(max(30.0, min(400.0, r["serving_size_g"])))
+        mult = serving / 100.0
+        return {
+            "food_name": str(r["food_name"]),
+            "serving_size_g": serving,
+            "ps_energy_kcal": float(r["energy_kcal"]) * mult,
+            "ps_protein_g": float(r["protein_g"]) * mult,
+            "ps_fat_g": float(r["fat_g"]) * mult,
+            "ps_carb_g": float(r["carb_g"]) * mult,
+            "ml_health_score": float(r.get("ml_health_score", 60.0)),
+            "health_score": float(r.get("health_score", 60.0)),
+            "is_flexible": int(r.get("is_flexible", 0)),
+            "serving_min_g": float(r.get("serving_min_g", 50.0)),
+            "serving_max_g": float(r.get("serving_max_g", 300.0)),
+            "_role": tags["role"],
+            "_carb_source": tags["carb_source"],
+            "_protein_source": tags["protein_source"],
+        }
@@ -1,7 +1,10 @@
 # src/services/nutrition.py
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
+import numpy as np
+from sqlalchemy.orm import object_session
 from src.services.ml_predictor import predict_next_week_activity, predict_goal_calories_ml
+from src.services.rollup_store import get_rollups
 
 def calculate_bmr_katch_mcardle(weight: float, body_fat: float) -> float:
     """
@@ -228,38 +231,33 @@ def weekly_goal_nutrition(user):
 
     return week_data
 
+def _bmr(user) -> float:
+    if user.body_fat is not None:
+        return calculate_bmr_katch_mcardle(user.weight, user.body_fat)
+    return calculate_bmr_harris_benedict(user.weight, user.height, user.age, user.sex)
+
+
 def get_weekly_trend(user):
     """
-    최근 4주 동안의 주별 평균 목표 칼로리 및 매크로 변화 (ML 기반 예측 반영)
+    최근 4주(ISO 주, 이번 주 포함) 동안의 주별 평균 목표 칼로리 및 매크로 변화 (ML 기반 예측 반영)
+    주별 운동량은 weekly_user_rollups 누적합에서 읽는다 (운동 로그 재집계 없음).
     """
-    today = date.today()
-    trends = []
+    session = object_session(user)
+    rollups = get_rollups(session, user.id, "weekly", date.today() - timedelta(weeks=3))
 
-    for i in range(4):
-        week_end = today - timedelta(days=today.weekday() + i * 7)
-        week_start = week_end - timedelta(days=6)
+    # ML 기반 다음 주 예측 / BMR — 주마다 같은 값이므로 한 번만 계산
+    ml_pred_goal = predict_goal_calories_ml(user)
+    ml_pred_activity = predict_next_week_activity(user)
+    bmr = _bmr(user)
 
-        # 해당 주 운동 로그 필터
-        logs = [
-            log for log in user.exercise_logs
-            if week_start <= log.date <= week_end
-        ]
-        if not logs:
+    trends = []
+    for r in rollups:
+        # 운동한 날이 없는 주는 건너뜀
+        if not r.active_ex_days:
             continue
 
-        # ML 기반 다음 주 예측
-        ml_pred_goal = predict_goal_calories_ml(user)
-        ml_pred_activity = predict_next_week_activity(user)
-
-        # 해당 주 평균 계산
-        total_cal_burned = sum(log.calories_burned for log in logs)
-        avg_intensity = np.mean([log.intensity or 0 for log in logs])
-
-        # BMR 계산
-        if user.body_fat is not None:
-            bmr = calculate_bmr_katch_mcardle(user.weight, user.body_fat)
-        else:
-            bmr = calculate_bmr_harris_benedict(user.weight, user.height, user.age, user.sex)
+        total_cal_burned = r.calories_burned_sum or 0.0
+        avg_intensity = (r.avg_intensity_sum or 0.0) / r.active_ex_days
 
         # ML 기반 보정
         if ml_pred_goal:
@@ -271,8 +269,8 @@ def get_weekly_trend(user):
         protein_g, fat_g, carbs_g = calculate_macros(user.weight, avg_goal_cal, user.goal, user.skeletal_muscle)
 
         trends.append({
-            "week_start": week_start.isoformat(),
-            "week_end": week_end.isoformat(),
+            "week_start": r.period_start.isoformat(),
+            "week_end": (r.period_start + timedelta(days=6)).isoformat(),
             "avg_goal_calories": round(avg_goal_cal, 1),
             "avg_protein_g": round(protein_g, 1),
             "avg_fat_g": round(fat_g, 1),
@@ -280,51 +278,42 @@ def get_weekly_trend(user):
             "avg_intensity": round(avg_intensity, 1),
         })
 
-    return list(reversed(trends))  # 오래된 주 → 최신 주
+    return trends  # 오래된 주 → 최신 주
 
 
 def get_monthly_trend(user):
     """
-    최근 3개월 동안의 월별 운동량 및 목표 칼로리 변화 (ML 기반)
+    최근 3개월(이번 달 포함) 동안의 월별 운동량 및 목표 칼로리 변화 (ML 기반)
+    월별 운동량은 monthly_user_rollups 누적합에서 읽는다.
     """
-    today = date.today()
-    trends = []
+    session = object_session(user)
+    start = date.today().replace(day=1) - relativedelta(months=2)
+    rollups = get_rollups(session, user.id, "monthly", start)
 
-    for i in range(3):
-        month_start = (today.replace(day=1) - relativedelta(months=i))
-        next_month_start = (month_start + relativedelta(months=1))
+    # ML 기반 다음달 예측 / BMR
+    ml_pred_goal = predict_goal_calories_ml(user)
+    ml_pred_activity = predict_next_week_activity(user)
+    bmr = _bmr(user)
 
-        logs = [
-            log for log in user.exercise_logs
-            if month_start <= log.date < next_month_start
-        ]
-        if not logs:
+    trends = []
+    for r in rollups:
+        if not r.active_ex_days:
             continue
 
-        total_burned = sum(log.calories_burned for log in logs)
-        avg_intensity = np.mean([log.intensity or 0 for log in logs])
-
-        # BMR 계산
-        if user.body_fat is not None:
-            bmr = calculate_bmr_katch_mcardle(user.weight, user.body_fat)
-        else:
-            bmr = calculate_bmr_harris_benedict(user.weight, user.height, user.age, user.sex)
-
-        # ML 기반 다음달 예측
-        ml_pred_goal = predict_goal_calories_ml(user)
-        ml_pred_activity = predict_next_week_activity(user)
+        total_burned = r.calories_burned_sum or 0.0
+        avg_intensity = (r.avg_intensity_sum or 0.0) / r.active_ex_days
 
         if ml_pred_goal:
             avg_goal_cal = ml_pred_goal + np.mean(ml_pred_activity)
         else:
-            tdee = bmr + (total_burned / max(1, len(logs)))
+            tdee = bmr + (total_burned / r.active_ex_days)
             avg_goal_cal = calculate_goal_calories(tdee, user.goal)
 
         trends.append({
-            "month": month_start.strftime("%Y-%m"),
+            "month": r.period,
             "total_exercise_cal": round(total_burned, 1),
             "avg_goal_calories": round(avg_goal_cal, 1),
             "avg_intensity": round(avg_intensity, 1),
         })
 
-    return list(reversed(trends))
\ No newline at end of file
+    return trends  # 오래된 달 → 최신 달
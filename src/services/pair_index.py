@@ -0,0 +1,126 @@
+# src/services/pair_index.py
+import os
+import json
+import threading
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+DATA_DIR = os.path.join("src", "data")
+PAIR_PARQUET = os.path.join(DATA_DIR, "food_pair_scores.parquet")   # food_pair_trainer 출력 (컬럼형, 우선)
+PAIR_JSON = os.path.join(DATA_DIR, "food_pair_scores.json")         # 양방향 맵 (parquet 없을 때)
+
+
+class PairIndex:
+    """
+    음식 궁합 점수 인덱스: 음식명 → 정수 ID, 점수는 대칭 CSR 행렬.
+    로드 후 읽기 전용이라 여러 플래너 인스턴스/요청이 공유.
+    """
+
+    def __init__(self, names: Sequence[str], matrix: sparse.csr_matrix):
+        self.names = list(names)
+        self.ids: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_edges(cls, food_a, food_b, score) -> "PairIndex":
+        a = pd.Series(food_a, dtype=object).astype(str).to_numpy()
+        b = pd.Series(food_b, dtype=object).astype(str).to_numpy()
+        s = np.asarray(score, dtype=float)
+        keep = s > 0
+        a, b, s = a[keep], b[keep], s[keep]
+
+        codes, names = pd.factorize(np.concatenate([a, b]))
+        ia, ib = codes[:len(a)], codes[len(a):]
+        n = len(names)
+        # (a, b)와 (b, a) 모두 저장. 중복 페어는 마지막 값 (기존 dict 변환과 동일)
+        rows = np.concatenate([ia, ib])
+        cols = np.concatenate([ib, ia])
+        vals = np.concatenate([s, s])
+        order = np.lexsort((np.arange(len(rows)), cols, rows))
+        rows, cols, vals = rows[order], cols[order], vals[order]
+        last = np.r_[(rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1]), True] if len(rows) else np.array([], dtype=bool)
+        matrix = sparse.csr_matrix((vals[last], (rows[last], cols[last])), shape=(n, n))
+        return cls(names, matrix)
+
+    @classmethod
+    def from_pair_map(cls, pair_map: Dict[str, List]) -> "PairIndex":
+        """{음식: [[상대, 점수], ...]} (food_pair_scores.json의 pairs)"""
+        a, b, s = [], [], []
+        for name, pairs in pair_map.items():
+            for other, score in pairs:
+                a.append(name)
+                b.append(other)
+                s.append(score)
+        return cls.from_edges(a, b, s)
+
+    def lookup(self, names: Sequence[str]) -> np.ndarray:
+        """음식명 → ID 배열 (인덱스에 없으면 -1)"""
+        get = self.ids.get
+        return np.fromiter((get(n, -1) for n in names), dtype=np.int64, count=len(names))
+
+    def bonus(self, candidates: Sequence[str], selected: Sequence[str]) -> np.ndarray:
+        """
+        후보 전체 × 현재 선택 음식의 궁합 점수 합 (후보별 1개 값).
+        CSR 행 gather → 선택 열만 잘라 합산. selected에 같은 음식이 여러 번 있으면 그만큼 더함.
+        """
+        out = np.zeros(len(candidates), dtype=float)
+        if not len(candidates) or not len(selected) or not len(self):
+            return out
+        sel = self.lookup(selected)
+        sel = sel[sel >= 0]
+        cand = self.lookup(candidates)
+        hit = cand >= 0
+        if not len(sel) or not hit.any():
+            return out
+        out[hit] = np.asarray(self.matrix[cand[hit]][:, sel].sum(axis=1)).ravel()
+        return out
+
+    def score(self, a: str, b: str) -> float:
+        ia, ib = self.ids.get(a), self.ids.get(b)
+        if ia is None or ib is None:
+            return 0.0
+        return float(self.matrix[ia, ib])
+
+
+EMPTY_INDEX = PairIndex([], sparse.csr_matrix((0, 0)))
+
+
+# ----------------------------------------------------------
+# 로드 (파일이 바뀌면 다시 만듦)
+# ----------------------------------------------------------
+_lock = threading.Lock()
+_cache: Dict = {"key": None, "index": EMPTY_INDEX}
+
+
+def _build(path: str) -> PairIndex:
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=["food_a", "food_b", "score"])
+        return PairIndex.from_edges(df["food_a"], df["food_b"], df["score"])
+    with open(path, "r", encoding="utf-8") as f:
+        return PairIndex.from_pair_map(json.load(f).get("pairs", {}))
+
+
+def load_pair_index(parquet_path: str = PAIR_PARQUET, json_path: str = PAIR_JSON) -> PairIndex:
+    """궁합 인덱스 (parquet → json 순, 없거나 읽기 실패 시 빈 인덱스)"""
+    path = next((p for p in (parquet_path, json_path) if os.path.exists(p)), None)
+    if path is None:
+        return EMPTY_INDEX
+    key = (path, os.path.getmtime(path))
+    with _lock:
+        if _cache["key"] != key:
+            try:
+                index = _build(path)
+            except Exception as e:
+                print(f"[pair_index] 궁합 점수 로드 실패 → 보너스 없음: {e}")
+                index = EMPTY_INDEX
+            _cache.update(key=key, index=index)
+        return _cache["index"]
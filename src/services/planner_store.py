@@ -0,0 +1,95 @@
+# src/services/planner_store.py
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import db
+from src.services.food_table import read_table, stage_path
+from src.services.meal_planner import MealPlanner, POOL_DEFAULTS
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+INPUT_PATH = stage_path("scored")
+
+# 산출물 → planner_foods 컬럼 (없으면 NULL / 모델 기본값)
+TABLE_COLS = [
+    "food_name", "company", "energy_kcal", "protein_g", "fat_g", "carb_g", "fiber_g", "sugar_g", "sodium_mg",
+    "serving_size_g", "serving_min_g", "serving_max_g", "is_flexible", "glycemic_index", "processing_level",
+    "category_cluster", "nutrition_cluster", "health_score", "ml_health_score", "hybrid_health_score",
+]
+TAG_COLS = ["is_meal_candidate", "role", "carb_source", "protein_source"]
+LOAD_DEFAULTS = {**POOL_DEFAULTS, "company": "해당없음", "glycemic_index": 50, "processing_level": 1}
+
+# foods에 되돌려 쓰는 값 (요약/로그 경로가 플래너와 같은 지수·점수를 쓰도록)
+SYNC_COLS = ["glycemic_index", "processing_level", "category_cluster", "nutrition_cluster",
+             "health_score", "ml_health_score", "hybrid_health_score"]
+
+
+# ----------------------------------------------------------
+# 1️⃣ 적재용 표 만들기
+# ----------------------------------------------------------
+def prepare_planner_frame(df: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame(index=df.index)
+    for col in TABLE_COLS:
+        out[col] = df[col] if col in df.columns else np.nan
+    out = out.fillna(LOAD_DEFAULTS)
+    out["food_name"] = out["food_name"].astype(str)
+    out["company"] = out["company"].astype(str)
+    out["is_flexible"] = out["is_flexible"].astype(int)
+    out["processing_level"] = out["processing_level"].round().astype(int)
+
+    planner = MealPlanner()
+    tags = pd.DataFrame([planner.tag_food(n) for n in out["food_name"]], index=out.index)
+    out = pd.concat([out, tags[TAG_COLS]], axis=1)
+    # sqlite3는 numpy NaN/정수형을 그대로 받지 못하므로 파이썬 값 + None으로
+    return out.astype(object).where(out.notna(), None)
+
+
+# ----------------------------------------------------------
+# 2️⃣ planner_foods 교체 + foods 연결/동기화 (단일 트랜잭션)
+# ----------------------------------------------------------
+def load_planner_foods(in_path: str = INPUT_PATH) -> int:
+    """
+    점수 산출물 → planner_foods 전체 교체.
+    foods와는 (이름, 업체) → 이름 순으로 연결하고, (이름, 업체)가 정확히 같은 foods 행에만 GI/가공도/군집/점수를 반영
+    (이름만 같은 다른 업체 행은 food_id 연결만 하고 값은 덮어쓰지 않음).
+    """
+    t0 = time.perf_counter()
+    frame = prepare_planner_frame(read_table(in_path))
+    cols = TABLE_COLS + TAG_COLS
+    sql = f"INSERT INTO planner_foods ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+
+    db.PlannerFood.__table__.create(bind=db.engine, checkfirst=True)
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM planner_foods")
+        conn.exec_driver_sql(sql, list(frame[cols].itertuples(index=False, name=None)))
+
+        # foods 연결: _name_company_uc / ix_foods_name 인덱스 사용
+        conn.exec_driver_sql(
+            "UPDATE planner_foods SET food_id = ("
+            "  SELECT f.id FROM foods f WHERE f.name = planner_foods.food_name AND f.company = planner_foods.company)"
+        )
+        conn.exec_driver_sql(
+            "UPDATE planner_foods SET food_id = ("
+            "  SELECT MIN(f.id) FROM foods f WHERE f.name = planner_foods.food_name) "
+            "WHERE food_id IS NULL"
+        )
+        linked = conn.exec_driver_sql("SELECT COUNT(*) FROM planner_foods WHERE food_id IS NOT NULL").scalar()
+
+        assign = ", ".join(f"{c} = p.{c}" for c in SYNC_COLS)
+        synced = conn.exec_driver_sql(
+            f"UPDATE foods SET {assign} FROM planner_foods p "
+            "WHERE p.food_id = foods.id AND p.food_name = foods.name AND p.company = foods.company"
+        ).rowcount
+
+    print(
+        f"✅ planner_foods 적재: {len(frame):,} rows (foods 연결 {linked:,}, 동기화 {synced:,}), "
+        f"후보 {int(sum(frame['is_meal_candidate'])):,}, {time.perf_counter() - t0:.2f}s"
+    )
+    return len(frame)
+
+
+if __name__ == "__main__":
+    load_planner_foods()
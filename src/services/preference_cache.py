@@ -0,0 +1,78 @@
+# src/services/preference_cache.py
+import os
+import time
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.services.feedback_store import food_feedback_scores
+from src.services.user_preference_updater import get_user_pref_map
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+PREF_CACHE_TTL = float(os.getenv("MEAL_PREF_CACHE_TTL", "60"))     # 사용자 선호 캐시 유지 시간(초)
+PREF_CACHE_SIZE = int(os.getenv("MEAL_PREF_CACHE_SIZE", "1024"))   # 최대 사용자 수 (LRU)
+
+EMPTY_PREFS: Mapping[str, float] = MappingProxyType({})
+
+
+# ----------------------------------------------------------
+# 1️⃣ 사용자별 선호 점수 (0~100) 캐시
+# ----------------------------------------------------------
+_cache: "OrderedDict[str, tuple]" = OrderedDict()   # user_id → (만료 시각, 읽기 전용 맵)
+_cache_lock = threading.Lock()
+
+
+def _fetch(user_id: str) -> Mapping[str, float]:
+    # 별점 피드백(최신 평가) 위에 EMA 선호 저장소 값을 덮어씀
+    prefs = dict(food_feedback_scores(user_id))
+    prefs.update(get_user_pref_map(user_id))
+    return MappingProxyType(prefs)
+
+
+def get_user_prefs(user_id: Optional[str]) -> Mapping[str, float]:
+    """{음식명: 0~100} (읽기 전용, 요청 간 공유해도 안전)"""
+    if not user_id:
+        return EMPTY_PREFS
+    user_id = str(user_id)
+    now = time.time()
+    with _cache_lock:
+        hit = _cache.get(user_id)
+        if hit is not None and hit[0] > now:
+            _cache.move_to_end(user_id)
+            return hit[1]
+
+    prefs = _fetch(user_id)
+
+    with _cache_lock:
+        _cache[user_id] = (now + PREF_CACHE_TTL, prefs)
+        _cache.move_to_end(user_id)
+        while len(_cache) > PREF_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return prefs
+
+
+def invalidate_user(user_id: str):
+    """평가 저장 직후 호출 → 다음 요청에서 바로 반영"""
+    with _cache_lock:
+        _cache.pop(str(user_id), None)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+# ----------------------------------------------------------
+# 2️⃣ 음식 풀 ID에 맞춘 선호 벡터
+# ----------------------------------------------------------
+def pref_vector(prefs: Mapping[str, float], names: Sequence[str]) -> np.ndarray:
+    """풀 순서(음식 ID = 위치)대로 정렬한 선호 점수 배열, 평가 없는 음식은 0"""
+    if not prefs or not len(names):
+        return np.zeros(len(names), dtype=float)
+    return pd.Series(names, dtype=object).map(prefs).fillna(0.0).to_numpy(dtype=float)
@@ -0,0 +1,141 @@
+# src/services/rollup_query.py
+from datetime import date
+from typing import List, Sequence
+from sqlalchemy import func, literal, union_all, select, Integer
+from sqlalchemy.orm import Session
+from src import db
+
+
+# ----------------------------------------------------------
+# 1️⃣ 기간 버킷 (SQLite 표현식)
+# ----------------------------------------------------------
+def iso_week_label(date_col):
+    """
+    ISO 주차 라벨 'YYYY-Www' (예: 2025-W07).
+    해당 주의 목요일 기준으로 ISO 연도/주차를 계산 (SQLite %V 미지원 버전 호환).
+    """
+    thursday = func.date(date_col, "-3 days", "weekday 4")
+    year = func.strftime("%Y", thursday)
+    day_of_year = func.cast(func.strftime("%j", thursday), Integer)
+    week = func.cast((day_of_year - 1) / 7, Integer) + 1
+    return func.printf("%s-W%02d", year, week)
+
+
+def month_label(date_col):
+    """월 라벨 'YYYY-MM'"""
+    return func.strftime("%Y-%m", date_col)
+
+
+def period_label(date_col, period: str):
+    if period == "weekly":
+        return iso_week_label(date_col)
+    if period == "monthly":
+        return month_label(date_col)
+    return date_col
+
+
+# ----------------------------------------------------------
+# 2️⃣ 기간별 AVG / SUM / COUNT 롤업
+# ----------------------------------------------------------
+def rollup(
+    session: Session,
+    model,
+    user_id: str,
+    start: date,
+    period: str | None = None,
+    avg: Sequence[str] = (),
+    sums: Sequence[str] = (),
+    end: date | None = None,
+) -> List:
+    """
+    일일 테이블(DailyHealthScore / DailyNutritionSummary / DailyExerciseSummary)을
+    SQL에서 기간별로 집계해 가벼운 Row 튜플로 반환.
+
+    - period: 'daily' | 'weekly' | 'monthly' | None(전체 1행)
+    - 각 Row 필드: label, start, days, avg_<col>..., sum_<col>...
+      (period=None이면 label 없음)
+    """
+    cols = []
+    label = None
+    if period:
+        label = period_label(model.date, period).label("label")
+        cols.append(label)
+    cols.append(func.min(model.date).label("start"))
+    cols.append(func.count(model.id).label("days"))
+    cols += [func.avg(getattr(model, c)).label(f"avg_{c}") for c in avg]
+    cols += [func.sum(getattr(model, c)).label(f"sum_{c}") for c in sums]
+
+    q = (
+        session.query(*cols)
+        .filter(model.user_id == user_id)
+        .filter(model.date >= start)
+    )
+    if end is not None:
+        q = q.filter(model.date <= end)
+    if label is None:
+        return q.all()
+    return q.group_by(label).order_by(func.min(model.date)).all()
+
+
+# ----------------------------------------------------------
+# 3️⃣ 날짜별 섭취 + 운동 (+ 점수) 조인 (한 번의 쿼리)
+# ----------------------------------------------------------
+NUTRITION_COLS = ["kcal", "protein_g", "fat_g", "carb_g", "sodium_mg", "processed_ratio"]
+EXERCISE_COLS = ["duration_min", "calories_burned", "avg_intensity"]
+SCORE_COLS = ["total_score", "nutrition_score", "exercise_score", "balance_score"]
+
+
+def _daily_union(session: Session, user_id: str, start: date, end: date | None, parts: List[tuple]) -> List:
+    """
+    parts: [(model, flag 이름, 컬럼 목록), ...]
+    각 테이블을 같은 컬럼 구성으로 맞춰 UNION ALL 후 GROUP BY date.
+    해당 테이블 기록이 없는 날은 그 컬럼이 0, flag로 구분.
+    """
+    zero = literal(0.0)
+    all_cols = [c for _, _, cols in parts for c in cols]
+    selects = []
+    for model, flag, cols in parts:
+        q = select(
+            model.date.label("date"),
+            *[literal(1 if f == flag else 0).label(f) for _, f, _ in parts],
+            *[(getattr(model, c) if c in cols else zero).label(c) for c in all_cols],
+        ).where(model.user_id == user_id, model.date >= start)
+        if end is not None:
+            q = q.where(model.date <= end)
+        selects.append(q)
+
+    both = union_all(*selects).subquery()
+    stmt = (
+        select(
+            both.c.date,
+            *[func.max(both.c[f]).label(f) for _, f, _ in parts],
+            *[func.coalesce(func.sum(both.c[c]), 0.0).label(c) for c in all_cols],
+        )
+        .group_by(both.c.date)
+        .order_by(both.c.date)
+    )
+    return session.execute(stmt).all()
+
+
+def daily_nutrition_exercise(session: Session, user_id: str, start: date, end: date | None = None) -> List:
+    """
+    DailyNutritionSummary와 DailyExerciseSummary를 UNION ALL + GROUP BY date로 합쳐
+    날짜별 1행(Row: date, has_nut, has_ex, NUTRITION_COLS..., EXERCISE_COLS...)을 반환.
+    한쪽 기록만 있는 날은 다른 쪽 값이 0, has_* 플래그로 구분.
+    """
+    return _daily_union(session, user_id, start, end, [
+        (db.DailyNutritionSummary, "has_nut", NUTRITION_COLS),
+        (db.DailyExerciseSummary, "has_ex", EXERCISE_COLS),
+    ])
+
+
+def daily_window(session: Session, user_id: str, start: date, end: date | None = None) -> List:
+    """
+    daily_nutrition_exercise + DailyHealthScore.
+    Row: date, has_nut, has_ex, has_score, NUTRITION_COLS..., EXERCISE_COLS..., SCORE_COLS...
+    """
+    return _daily_union(session, user_id, start, end, [
+        (db.DailyNutritionSummary, "has_nut", NUTRITION_COLS),
+        (db.DailyExerciseSummary, "has_ex", EXERCISE_COLS),
+        (db.DailyHealthScore, "has_score", SCORE_COLS),
+    ])
@@ -0,0 +1,191 @@
+# src/services/rollup_store.py
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from src import db
+from src.services.rollup_query import period_label
+
+# ----------------------------------------------------------
+# 일일 테이블 필드 → 롤업 컬럼 매핑
+# ----------------------------------------------------------
+KIND_FIELDS = {
+    "nutrition": ["kcal", "protein_g", "fat_g", "carb_g", "sodium_mg", "processed_ratio"],
+    "exercise": ["duration_min", "calories_burned", "avg_intensity"],
+    "score": ["total_score", "nutrition_score", "exercise_score", "balance_score"],
+}
+KIND_DAYS = {"nutrition": "nut_days", "exercise": "ex_days", "score": "score_days"}
+KIND_MODEL = {
+    "nutrition": db.DailyNutritionSummary,
+    "exercise": db.DailyExerciseSummary,
+    "score": db.DailyHealthScore,
+}
+ROLLUP_MODELS = {"weekly": db.WeeklyUserRollup, "monthly": db.MonthlyUserRollup}
+
+
+# ----------------------------------------------------------
+# 1️⃣ 기간 키
+# ----------------------------------------------------------
+def period_key(d: date, period: str):
+    """(period 라벨, period 시작일) — rollup_query.period_label과 같은 형식"""
+    if period == "weekly":
+        year, week, _ = d.isocalendar()
+        return f"{year}-W{week:02d}", d - timedelta(days=d.weekday())
+    return f"{d.year}-{d.month:02d}", d.replace(day=1)
+
+
+# ----------------------------------------------------------
+# 2️⃣ 증분 갱신 (일일 요약/점수 upsert 시 호출)
+# ----------------------------------------------------------
+def snapshot(row, kind: str) -> Optional[Dict[str, float]]:
+    """
+    일일 행의 현재 값 스냅샷. 아직 DB에 없는(새로 만든) 행이면 None.
+    값 변경 전/후로 한 번씩 찍어 apply_change에 넘긴다.
+    """
+    if row is None or row.id is None:
+        return None
+    return _values(row, kind)
+
+
+def _values(row, kind: str) -> Dict[str, float]:
+    return {f: float(getattr(row, f) or 0.0) for f in KIND_FIELDS[kind]}
+
+
+def _new_rollup(model, user_id: str, key: str, start: date):
+    r = model(user_id=user_id, period=key, period_start=start)
+    for col in model.__table__.columns:
+        if col.name.endswith("_sum") or col.name.endswith("_days"):
+            setattr(r, col.name, 0)
+    return r
+
+
+def _deltas(kind: str, old: Optional[Dict[str, float]], new: Dict[str, float]) -> Dict[str, float]:
+    """old → new 변화량 (롤업 컬럼 기준)"""
+    out = {f"{f}_sum": v - (old[f] if old else 0.0) for f, v in new.items()}
+    if old is None:
+        out[KIND_DAYS[kind]] = 1
+    if kind == "exercise":
+        was_active = 1 if old and old["duration_min"] > 0 else 0
+        is_active = 1 if new["duration_min"] > 0 else 0
+        out["active_ex_days"] = is_active - was_active
+    return out
+
+
+def apply_change(session: Session, user_id: str, d: date, kind: str, old: Optional[Dict[str, float]], new_row):
+    """
+    일일 행의 old → new 변화량만큼 주간/월간 롤업의 누적합/카운트를 갱신.
+    기간별 롤업 행마다 INSERT … ON CONFLICT DO UPDATE SET col = col + 변화량 한 문장
+    (읽고-쓰기 없음 → 같은 주/월을 동시에 갱신해도 변화량 유실·유니크 충돌 없음).
+    commit은 호출자(요약/점수 upsert)의 트랜잭션에 맡긴다.
+    """
+    deltas = _deltas(kind, old, _values(new_row, kind))
+    for period, model in ROLLUP_MODELS.items():
+        key, start = period_key(d, period)
+        table = model.__table__
+        zeros = {c.name: 0 for c in table.columns if c.name.endswith(("_sum", "_days"))}
+        stmt = sqlite_insert(table).values(user_id=user_id, period=key, period_start=start, **{**zeros, **deltas})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "period"],
+            set_={c: func.coalesce(table.c[c], 0) + stmt.excluded[c] for c in deltas},
+        )
+        session.execute(stmt)
+
+
+# ----------------------------------------------------------
+# 3️⃣ 조회 (단일 행 lookup)
+# ----------------------------------------------------------
+def get_rollup(session: Session, user_id: str, period: str, d: date | None = None):
+    """d(기본: 오늘)가 속한 주/월의 롤업 1행"""
+    key, _ = period_key(d or date.today(), period)
+    return session.query(ROLLUP_MODELS[period]).filter_by(user_id=user_id, period=key).first()
+
+
+def get_rollups(session: Session, user_id: str, period: str, start: date) -> List:
+    """start가 속한 주/월부터 최신까지의 롤업 행 (기간순)"""
+    model = ROLLUP_MODELS[period]
+    _, start_key = period_key(start, period)
+    return (
+        session.query(model)
+        .filter(model.user_id == user_id)
+        .filter(model.period_start >= start_key)
+        .order_by(model.period_start)
+        .all()
+    )
+
+
+def _avg(total, days):
+    return round(total / days, 2) if days else None
+
+
+def rollup_averages(r) -> Dict:
+    """롤업 행 → 기간 평균 dict"""
+    return {
+        "period": r.period,
+        "period_start": r.period_start.isoformat(),
+        "nutrition_days": r.nut_days,
+        "avg_kcal": _avg(r.kcal_sum, r.nut_days),
+        "avg_protein_g": _avg(r.protein_g_sum, r.nut_days),
+        "avg_fat_g": _avg(r.fat_g_sum, r.nut_days),
+        "avg_carb_g": _avg(r.carb_g_sum, r.nut_days),
+        "avg_sodium_mg": _avg(r.sodium_mg_sum, r.nut_days),
+        "avg_processed_ratio": _avg(r.processed_ratio_sum, r.nut_days),
+        "exercise_days": r.ex_days,
+        "active_exercise_days": r.active_ex_days,
+        "total_exercise_min": round(r.duration_min_sum or 0.0, 1),
+        "avg_ex_duration": _avg(r.duration_min_sum, r.ex_days),
+        "avg_burned": _avg(r.calories_burned_sum, r.ex_days),
+        "avg_ex_intensity": _avg(r.avg_intensity_sum, r.ex_days),
+        "score_days": r.score_days,
+        "avg_total_score": _avg(r.total_score_sum, r.score_days),
+        "avg_nutrition_score": _avg(r.nutrition_score_sum, r.score_days),
+        "avg_exercise_score": _avg(r.exercise_score_sum, r.score_days),
+        "avg_balance_score": _avg(r.balance_score_sum, r.score_days),
+    }
+
+
+# ----------------------------------------------------------
+# 4️⃣ 재구축 / 백필 (일일 테이블 기준 GROUP BY)
+# ----------------------------------------------------------
+def rebuild_rollups(session: Session, user_id: str | None = None):
+    """
+    일일 테이블에서 주간/월간 롤업을 처음부터 다시 계산.
+    (초기 백필, 누적합 드리프트 보정용)
+    """
+    for period, model in ROLLUP_MODELS.items():
+        q = session.query(model)
+        if user_id:
+            q = q.filter(model.user_id == user_id)
+        q.delete(synchronize_session=False)
+
+        rows: Dict[tuple, object] = {}
+        for kind, src in KIND_MODEL.items():
+            label = period_label(src.date, period).label("label")
+            cols = [src.user_id, label, func.min(src.date), func.count(src.id)]
+            cols += [func.sum(getattr(src, f)) for f in KIND_FIELDS[kind]]
+            if kind == "exercise":
+                cols.append(func.sum(case((src.duration_min > 0, 1), else_=0)))
+            q = session.query(*cols)
+            if user_id:
+                q = q.filter(src.user_id == user_id)
+            for rec in q.group_by(src.user_id, label).all():
+                uid, key, first_day, n = rec[0], rec[1], rec[2], rec[3]
+                r = rows.get((uid, key))
+                if r is None:
+                    _, start = period_key(first_day, period)
+                    r = rows[(uid, key)] = _new_rollup(model, uid, key, start)
+                setattr(r, KIND_DAYS[kind], n)
+                for f, v in zip(KIND_FIELDS[kind], rec[4:]):
+                    setattr(r, f"{f}_sum", float(v or 0.0))
+                if kind == "exercise":
+                    r.active_ex_days = int(rec[-1] or 0)
+        session.add_all(rows.values())
+    session.commit()
+
+
+def ensure_backfilled(session: Session):
+    """롤업 테이블이 비어 있고 일일 데이터가 있으면 1회 백필"""
+    has_rollup = session.query(db.WeeklyUserRollup.id).first() is not None
+    has_daily = any(session.query(m.id).first() is not None for m in KIND_MODEL.values())
+    if has_daily and not has_rollup:
+        rebuild_rollups(session)
@@ -3,6 +3,8 @@ from datetime import date
 from sqlalchemy.orm import Session
 from src import db
 from src.services.health_score import compute_daily_score
+from src.services import rollup_store
+from src.services.user_context import invalidate_user_context
 
 
 # 간단한 탄수화물 소스 태깅 (MealPlanner와 일관)
@@ -68,6 +70,7 @@ def recompute_daily_summaries(user_id: str, target_date: date, session: Session)
         .filter_by(user_id=user_id, date=target_date)
         .first()
     )
+    old_nut = rollup_store.snapshot(nut, "nutrition")
     if not nut:
         nut = db.DailyNutritionSummary(
             user_id=user_id, date=target_date
@@ -83,6 +86,7 @@ def recompute_daily_summaries(user_id: str, target_date: date, session: Session)
     nut.sodium_mg = round(sodium, 1)
     nut.processed_ratio = round(processed_ratio, 3)
     nut.distinct_main_sources = len(main_sources)
+    rollup_store.apply_change(session, user_id, target_date, "nutrition", old_nut, nut)
 
     # ---------- 운동 요약 ----------
     ex_logs = (
@@ -99,6 +103,7 @@ def recompute_daily_summaries(user_id: str, target_date: date, session: Session)
         .filter_by(user_id=user_id, date=target_date)
         .first()
     )
+    old_ex = rollup_store.snapshot(ex, "exercise")
     if not ex:
         ex = db.DailyExerciseSummary(user_id=user_id, date=target_date)
         session.add(ex)
@@ -106,8 +111,10 @@ def recompute_daily_summaries(user_id: str, target_date: date, session: Session)
     ex.duration_min = round(duration, 1)
     ex.calories_burned = round(burned, 1)
     ex.avg_intensity = round(avg_int, 2)
+    rollup_store.apply_change(session, user_id, target_date, "exercise", old_ex, ex)
 
     session.commit()
+    invalidate_user_context(user_id)
     
     # 마지막에 추가
     compute_daily_score(user_id, target_date, session)
@@ -0,0 +1,101 @@
+# src/services/timeseries.py
+from datetime import date
+from typing import List, Sequence, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from src import db
+from src.services.rollup_query import rollup, daily_nutrition_exercise
+from src.services.rollup_store import ROLLUP_MODELS, get_rollups
+
+
+# ----------------------------------------------------------
+# 1️⃣ 건강 점수 시계열 (GROUP BY 집계)
+# ----------------------------------------------------------
+def score_series(session: Session, user_id: str, start: date, period: str = "daily") -> Tuple[List[str], List[str], List[float]]:
+    """
+    DailyHealthScore.total_score를 기간별 평균으로 집계.
+    - weekly / monthly: 주간·월간 롤업 테이블에서 기간당 1행 조회
+      (start가 속한 주/월 전체 포함)
+    - daily: 일일 테이블 GROUP BY
+    반환: (labels, dates(버킷 시작일), values) — 길이가 같은 정렬된 배열
+    """
+    if period in ROLLUP_MODELS:
+        rows = [r for r in get_rollups(session, user_id, period, start) if r.score_days]
+        labels = [r.period for r in rows]
+        dates = [r.period_start.isoformat() for r in rows]
+        values = [round(r.total_score_sum / r.score_days, 1) for r in rows]
+        return labels, dates, values
+
+    rows = rollup(session, db.DailyHealthScore, user_id, start, period=period, avg=["total_score"])
+    labels = [str(r.label) for r in rows]
+    dates = [r.start.isoformat() for r in rows]
+    values = [round(float(r.avg_total_score or 0.0), 1) for r in rows]
+    return labels, dates, values
+
+
+# ----------------------------------------------------------
+# 2️⃣ 섭취 vs 소모 칼로리 (날짜별 정렬 배열)
+# ----------------------------------------------------------
+def calorie_balance_series(session: Session, user_id: str, start: date) -> Tuple[List[str], List[float], List[float]]:
+    """날짜별 섭취 kcal / 운동 소모 kcal (없는 날은 0)"""
+    rows = daily_nutrition_exercise(session, user_id, start)
+    dates = [r.date.isoformat() for r in rows]
+    kcal_in = [round(float(r.kcal), 1) for r in rows]
+    kcal_out = [round(float(r.calories_burned), 1) for r in rows]
+    return dates, kcal_in, kcal_out
+
+
+# ----------------------------------------------------------
+# 3️⃣ LTTB 다운샘플링 (Largest-Triangle-Three-Buckets)
+# ----------------------------------------------------------
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """
+    시각적 형태를 유지하며 threshold개 포인트로 줄일 인덱스 반환.
+    첫/마지막 포인트는 항상 포함.
+    """
+    n = len(y)
+    if threshold is None or threshold >= n or threshold < 3:
+        return list(range(n))
+
+    xs = np.asarray(x, dtype=float)
+    ys = np.asarray(y, dtype=float)
+    bucket = (n - 2) / (threshold - 2)
+
+    picked = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo = int(i * bucket) + 1
+        hi = int((i + 1) * bucket) + 1
+        nxt_lo, nxt_hi = hi, min(int((i + 2) * bucket) + 1, n)
+        avg_x = xs[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else xs[-1]
+        avg_y = ys[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else ys[-1]
+
+        area = np.abs(
+            (xs[a] - avg_x) * (ys[lo:hi] - ys[a])
+            - (xs[a] - xs[lo:hi]) * (avg_y - ys[a])
+        )
+        a = lo + int(np.argmax(area))
+        picked.append(a)
+    picked.append(n - 1)
+    return picked
+
+
+def _x_axis(dates: List[str]) -> List[float]:
+    """ISO 날짜면 실제 일수 간격, 라벨(주차/월)이면 순서 인덱스"""
+    try:
+        return [date.fromisoformat(d).toordinal() for d in dates]
+    except ValueError:
+        return list(range(len(dates)))
+
+
+def downsample(dates: List[str], *series: List[float], max_points: int | None = None):
+    """
+    첫 번째 시리즈 기준 LTTB 인덱스를 구해 모든 시리즈에 동일 적용 (배열 정렬 유지).
+    LTTB는 첫/마지막 포인트를 항상 남기므로 max_points는 3 이상이어야 함 (라우터에서 ge=3 검증).
+    """
+    if max_points is not None and max_points < 3:
+        raise ValueError("max_points must be >= 3")
+    if not max_points or not series or len(dates) <= max_points:
+        return (dates, *series)
+    idx = lttb_indices(_x_axis(dates), series[0], max_points)
+    return ([dates[i] for i in idx], *[[s[i] for i in idx] for s in series])
@@ -0,0 +1,189 @@
+# src/services/translation_store.py
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List
+
+from sqlalchemy import insert, select, literal
+from googletrans import Translator
+from src import db
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+TRANSLATE_LRU_SIZE = int(os.getenv("TRANSLATE_LRU_SIZE", "4096"))     # 메모리 LRU 항목 수
+TRANSLATE_TIMEOUT = float(os.getenv("TRANSLATE_TIMEOUT", "0.5"))      # 요청당 번역 대기 한도(초)
+TRANSLATE_BATCH_SIZE = 50
+
+_HANGUL = re.compile(r"[가-힣]")
+
+# googletrans Translator는 스레드 안전하지 않으므로 워커 1개에서만 사용
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translate")
+_translator = None
+
+
+# ----------------------------------------------------------
+# 1️⃣ 메모리 LRU (DB 앞단)
+# ----------------------------------------------------------
+_lru: "OrderedDict[str, str]" = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def _lru_get(name: str):
+    with _lru_lock:
+        txt = _lru.get(name)
+        if txt is not None:
+            _lru.move_to_end(name)
+        return txt
+
+
+def _lru_put(items: Dict[str, str]):
+    with _lru_lock:
+        for k, v in items.items():
+            _lru[k] = v
+            _lru.move_to_end(k)
+        while len(_lru) > TRANSLATE_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+# ----------------------------------------------------------
+# 2️⃣ SQLite 저장소
+# ----------------------------------------------------------
+def _db_get(names: List[str]) -> Dict[str, str]:
+    if not names:
+        return {}
+    session = db.SessionLocal()
+    try:
+        found = {}
+        for i in range(0, len(names), 500):  # SQLite 바인드 변수 한도
+            chunk = names[i:i + 500]
+            rows = session.query(db.Translation.source, db.Translation.target).filter(
+                db.Translation.source.in_(chunk)
+            )
+            found.update({src: tgt for src, tgt in rows})
+        return found
+    finally:
+        session.close()
+
+
+def _db_put(items: Dict[str, str], origin: str = "googletrans"):
+    if not items:
+        return
+    session = db.SessionLocal()
+    try:
+        for src, tgt in items.items():
+            session.merge(db.Translation(source=src, target=tgt, origin=origin))
+        session.commit()
+    finally:
+        session.close()
+
+
+def seed_from_food_db() -> int:
+    """foods 테이블의 한글 음식명을 그대로(원문=번역) 등록 → 번역 호출 없이 조회"""
+    T, F = db.Translation, db.Food
+    stmt = (
+        insert(T)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            ["source", "target", "origin"],
+            select(F.name, F.name, literal("seed")).where(F.name.op("GLOB")("*[가-힣]*")).distinct(),
+        )
+    )
+    with db.engine.begin() as conn:
+        return conn.execute(stmt).rowcount
+
+
+# ----------------------------------------------------------
+# 3️⃣ 백그라운드 번역 (googletrans, 배치)
+# ----------------------------------------------------------
+_pending: Dict[str, object] = {}     # 번역 진행 중인 원문 → Future (중복 요청 방지)
+_pending_lock = threading.Lock()
+
+
+def _translate_remote(names: List[str]) -> Dict[str, str]:
+    global _translator
+    if _translator is None:
+        _translator = Translator()
+
+    out = {}
+    for i in range(0, len(names), TRANSLATE_BATCH_SIZE):
+        chunk = names[i:i + TRANSLATE_BATCH_SIZE]
+        try:
+            results = _translator.translate(chunk, src="en", dest="ko")
+            out.update({src: r.text for src, r in zip(chunk, results) if r and r.text})
+        except Exception:
+            # 배치 실패 시 개별 재시도, 그래도 실패하면 다음 요청 때 다시 시도
+            for name in chunk:
+                try:
+                    out[name] = _translator.translate(name, src="en", dest="ko").text
+                except Exception:
+                    pass
+    return out
+
+
+def _translate_job(names: List[str]) -> Dict[str, str]:
+    try:
+        done = _translate_remote(names)
+        _db_put(done)
+        _lru_put(done)
+        return done
+    finally:
+        with _pending_lock:
+            for n in names:
+                _pending.pop(n, None)
+
+
+# ----------------------------------------------------------
+# 4️⃣ 공개 API
+# ----------------------------------------------------------
+def translate_batch(names: Iterable[str], timeout: float | None = None) -> Dict[str, str]:
+    """
+    영문 음식명 → 한글. LRU → SQLite → (없으면) 백그라운드 번역 후 timeout까지만 대기.
+    시간 안에 못 끝난 항목은 원문 그대로 반환하고, 번역은 계속 진행되어 저장소에 기록된다.
+    """
+    timeout = TRANSLATE_TIMEOUT if timeout is None else timeout
+    result: Dict[str, str] = {}
+    missing = []
+    for name in dict.fromkeys(n for n in names if n):
+        if _HANGUL.search(name):
+            result[name] = name
+            continue
+        txt = _lru_get(name)
+        if txt is None:
+            missing.append(name)
+        else:
+            result[name] = txt
+
+    found = _db_get(missing)
+    _lru_put(found)
+    result.update(found)
+    missing = [n for n in missing if n not in found]
+    if not missing:
+        return result
+
+    with _pending_lock:
+        new = [n for n in missing if n not in _pending]
+        futures = {_pending[n] for n in missing if n in _pending}
+        if new:
+            fut = _executor.submit(_translate_job, new)
+            futures.add(fut)
+            for n in new:
+                _pending[n] = fut
+
+    if timeout > 0:
+        wait(futures, timeout=timeout)
+    for name in missing:
+        result[name] = _lru_get(name) or name
+    return result
+
+
+def ko(name_en: str, timeout: float = 0) -> str:
+    """
+    단일 음식명 번역 (translate_batch 래퍼). 기본은 대기 없음:
+    저장된 번역이 없으면 영어 그대로 반환하고 번역은 백그라운드 배치가 채움 (다음 조회부터 한글).
+    """
+    if not name_en:
+        return name_en
+    return translate_batch([name_en], timeout=timeout).get(name_en, name_en)
@@ -0,0 +1,125 @@
+# src/services/usda_import.py
+from typing import Dict, List
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from src import db
+from src.usda_api import search_usda_food
+
+# ----------------------------------------------------------
+# 설정: USDA nutrientId → foods 컬럼
+# ----------------------------------------------------------
+NUTRIENT_IDS = {
+    1003: "protein",    # Protein (g)
+    1004: "fat",        # Total lipid (fat) (g)
+    1005: "carbs",      # Carbohydrate, by difference (g)
+    1079: "fiber",      # Fiber, total dietary (g)
+    2000: "sugar",      # Sugars, total including NLEA (g)
+    1063: "sugar_alt",  # Sugars, Total (g) — 2000 없을 때
+    1093: "sodium",     # Sodium, Na (mg)
+    1008: "calories",   # Energy (kcal)
+    2047: "energy_general",   # Energy (Atwater General Factors) — 1008 없을 때
+    2048: "energy_specific",  # Energy (Atwater Specific Factors)
+}
+FOOD_COLS = ["calories", "carbs", "protein", "fat", "fiber", "sugar", "sodium"]
+DEFAULT_COMPANY = "해당없음"
+
+
+# ----------------------------------------------------------
+# 1️⃣ 응답 → 영양소 표 (한 번의 pivot)
+# ----------------------------------------------------------
+def nutrients_frame(foods: List[Dict]) -> pd.DataFrame:
+    """
+    USDA 검색 응답 foods → fdc_id 인덱스, FOOD_COLS + name/company 컬럼 (100g 기준).
+    foodNutrients 목록을 (fdc_id, nutrientId, value) long 표로 펼친 뒤 한 번에 pivot.
+    """
+    meta = pd.DataFrame(
+        [
+            {
+                "fdc_id": f.get("fdcId"),
+                "name": (f.get("description") or "").strip(),
+                "company": (f.get("brandOwner") or "").strip() or DEFAULT_COMPANY,
+            }
+            for f in foods
+        ],
+        columns=["fdc_id", "name", "company"],
+    )
+    meta = meta.dropna(subset=["fdc_id"])
+    meta = meta[meta["name"] != ""].drop_duplicates("fdc_id").set_index("fdc_id")
+
+    long = pd.DataFrame(
+        [
+            (f.get("fdcId"), n.get("nutrientId"), n.get("value"))
+            for f in foods
+            for n in f.get("foodNutrients") or []
+        ],
+        columns=["fdc_id", "nutrient_id", "value"],
+    )
+    long["col"] = long["nutrient_id"].map(NUTRIENT_IDS)
+    long["value"] = pd.to_numeric(long["value"], errors="coerce")
+    long = long.dropna(subset=["col", "value"])
+
+    wide = long.pivot_table(index="fdc_id", columns="col", values="value", aggfunc="first")
+    wide = wide.reindex(index=meta.index, columns=list(dict.fromkeys(NUTRIENT_IDS.values())))
+
+    # 대체 영양소 ID 보정
+    wide["calories"] = wide["calories"].fillna(wide["energy_general"]).fillna(wide["energy_specific"])
+    wide["sugar"] = wide["sugar"].fillna(wide["sugar_alt"])
+
+    out = meta.join(wide[FOOD_COLS].fillna(0.0).round(2))
+    out.index = out.index.astype(int)
+    # 같은 (name, company)는 foods 유니크 제약상 하나만
+    return out[~out.duplicated(["name", "company"])]
+
+
+# ----------------------------------------------------------
+# 2️⃣ foods upsert (FDC ID가 안정 키)
+# ----------------------------------------------------------
+def upsert_usda_foods(session: Session, frame: pd.DataFrame) -> List[db.Food]:
+    """
+    fdc_id가 같은 행은 영양소 갱신, 없으면 (name, company)가 같은 기존 행에 fdc_id를 붙여 갱신,
+    둘 다 없으면 새로 추가. 응답 순서대로 Food 목록 반환.
+    """
+    if frame.empty:
+        return []
+
+    F = db.Food
+    ids = [int(i) for i in frame.index]
+    by_fdc = {f.fdc_id: f for f in session.query(F).filter(F.fdc_id.in_(ids))}
+    by_name = {
+        (f.name, f.company): f
+        for f in session.query(F).filter(F.name.in_(frame["name"].unique().tolist()))
+    }
+
+    result = []
+    for fdc_id, row in zip(ids, frame.to_dict("records")):
+        values = {c: float(row[c]) for c in FOOD_COLS}
+        food = by_fdc.get(fdc_id)
+        if food is None:
+            food = by_name.get((row["name"], row["company"]))
+            if food is not None and food.fdc_id not in (None, fdc_id):
+                # 같은 이름이 이미 다른 FDC 항목으로 등록됨 → 기존 행 유지
+                result.append(food)
+                continue
+        if food is None:
+            food = F(name=row["name"], company=row["company"], weight=100.0, fdc_id=fdc_id, **values)
+            session.add(food)
+            by_name[(row["name"], row["company"])] = food
+        else:
+            food.fdc_id = fdc_id
+            for c, v in values.items():
+                setattr(food, c, v)
+        result.append(food)
+
+    session.commit()
+    return result
+
+
+def import_usda_foods(session: Session, query: str, page_size: int = 5) -> List[db.Food]:
+    """USDA 검색(캐시) → 영양소 매핑 → foods upsert. 결과 없음/오류면 빈 리스트."""
+    body = search_usda_food(query, page_size)
+    foods = (body or {}).get("foods") or []
+    if not foods:
+        return []
+    return upsert_usda_foods(session, nutrients_frame(foods))
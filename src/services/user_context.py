@@ -0,0 +1,166 @@
+# src/services/user_context.py
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from src import db
+from src.services.rollup_query import daily_window
+
+# ----------------------------------------------------------
+# 설정
+# ----------------------------------------------------------
+CONTEXT_DAYS = 14                                                   # 이번 주 + 지난주
+USER_CONTEXT_TTL = float(os.getenv("USER_CONTEXT_TTL", "30"))       # 스냅샷 캐시 유지 시간(초)
+USER_CONTEXT_CACHE_SIZE = int(os.getenv("USER_CONTEXT_CACHE_SIZE", "1024"))  # 최대 사용자 수 (LRU)
+
+PROFILE_COLS = ["id", "name", "age", "sex", "height", "weight", "body_fat", "skeletal_muscle", "activity_level", "goal"]
+
+
+# ----------------------------------------------------------
+# 1️⃣ 스냅샷 (세션과 분리된 읽기 전용 값)
+# ----------------------------------------------------------
+class UserContextSnapshot:
+    """
+    코치 리포트 / 코치 채팅 / 홈 피드백이 공통으로 쓰는 최근 사용자 문맥.
+    - profile: User 컬럼 dict
+    - rows: 최근 14일 날짜별 Row (rollup_query.daily_window: 섭취/운동/점수 + has_* 플래그)
+    - body_comp: 최신 BodyCompLog dict (없으면 None)
+    ORM 객체를 들고 있지 않으므로 세션이 닫혀도 캐시에서 재사용 가능.
+    """
+
+    def __init__(self, today: date, profile: Dict, rows: List, body_comp: Optional[Dict]):
+        self.today = today
+        self.start = today - timedelta(days=CONTEXT_DAYS - 1)
+        self.profile = profile
+        self.rows = rows
+        self.body_comp = body_comp
+
+    def since(self, days: int) -> List:
+        """오늘 포함 최근 days일 Row"""
+        first = self.today - timedelta(days=days - 1)
+        return [r for r in self.rows if r.date >= first]
+
+    def on(self, d: date):
+        return next((r for r in self.rows if r.date == d), None)
+
+    def latest_scores(self, n: int) -> List:
+        """점수 기록이 있는 최근 n일 (날짜 오름차순)"""
+        return [r for r in self.rows if r.has_score][-n:]
+
+    @property
+    def latest_score(self) -> Optional[float]:
+        scored = self.latest_scores(1)
+        return scored[0].total_score if scored else None
+
+
+# ----------------------------------------------------------
+# 2️⃣ 로더 (프로필 + 최신 인바디 1회, 14일 조인 1회)
+# ----------------------------------------------------------
+def load_user_context(user_id: str, session: Session, today: date | None = None) -> Optional[UserContextSnapshot]:
+    today = today or date.today()
+
+    latest_bc = (
+        session.query(db.BodyCompLog.id)
+        .filter(db.BodyCompLog.user_id == db.User.id)
+        .order_by(db.BodyCompLog.date.desc(), db.BodyCompLog.id.desc())
+        .limit(1)
+        .correlate(db.User)
+        .scalar_subquery()
+    )
+    rec = (
+        session.query(db.User, db.BodyCompLog)
+        .outerjoin(db.BodyCompLog, db.BodyCompLog.id == latest_bc)
+        .filter(db.User.id == user_id)
+        .first()
+    )
+    if rec is None:
+        return None
+    user, bc = rec
+
+    profile = {c: getattr(user, c) for c in PROFILE_COLS}
+    body_comp = None
+    if bc is not None:
+        body_comp = {
+            "date": bc.date,
+            "weight_kg": bc.weight_kg,
+            "body_fat_pct": bc.body_fat_pct,
+            "smm_kg": bc.smm_kg,
+        }
+
+    start = today - timedelta(days=CONTEXT_DAYS - 1)
+    rows = daily_window(session, user_id, start, today)
+    return UserContextSnapshot(today, profile, rows, body_comp)
+
+
+# ----------------------------------------------------------
+# 3️⃣ 사용자별 단기 캐시
+# ----------------------------------------------------------
+_cache: "OrderedDict[str, tuple]" = OrderedDict()   # user_id → (만료 시각, 스냅샷)
+_cache_lock = threading.Lock()
+
+
+def get_user_context(user_id: str, session: Session) -> Optional[UserContextSnapshot]:
+    """TTL 내 캐시된 스냅샷, 없거나 날짜가 바뀌었으면 새로 로드. 없는 사용자는 None."""
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(user_id)
+        if hit and hit[0] > now and hit[1].today == date.today():
+            _cache.move_to_end(user_id)
+            return hit[1]
+
+    ctx = load_user_context(user_id, session)
+    if ctx is not None and USER_CONTEXT_TTL > 0:
+        with _cache_lock:
+            _cache[user_id] = (now + USER_CONTEXT_TTL, ctx)
+            _cache.move_to_end(user_id)
+            while len(_cache) > USER_CONTEXT_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return ctx
+
+
+def invalidate_user_context(user_id: str):
+    """일일 요약/점수 갱신 후 호출"""
+    with _cache_lock:
+        _cache.pop(user_id, None)
+
+
+# ----------------------------------------------------------
+# 4️⃣ 프로필 / 인바디 변경 시 자동 무효화 (ORM 이벤트)
+#    User·BodyCompLog 쓰기를 flush 시점에 세션에 모아 두고 commit 후 무효화
+#    (commit 전에 무효화하면 다른 요청이 이전 값을 다시 캐시할 수 있음)
+# ----------------------------------------------------------
+_PENDING_KEY = "user_context_pending"
+_registered = False
+
+
+def _on_profile_write(mapper, connection, target):
+    session = object_session(target)
+    user_id = target.id if isinstance(target, db.User) else target.user_id
+    if session is not None and user_id is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(str(user_id))
+
+
+def _after_commit(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user_context(user_id)
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_context_invalidation():
+    """User / BodyCompLog INSERT·UPDATE·DELETE commit 후 스냅샷 캐시 무효화 (앱 시작 시 1회)"""
+    global _registered
+    if _registered:
+        return
+    for model in (db.User, db.BodyCompLog):
+        for name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, name, _on_profile_write)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _registered = True
@@ -1,63 +1,93 @@
 # src/services/user_preference_updater.py
-import os, json, time
+import os, time, threading
+from typing import Dict, Iterable, Tuple
 import pandas as pd
+from src import db
 
 DATA_DIR = os.path.join("src","data")
-PREF_PATH = os.path.join(DATA_DIR, "user_prefs.parquet")
+PREF_PATH = os.path.join(DATA_DIR, "user_prefs.parquet")  # 이전 저장 형식 (최초 1회 user_food_prefs로 이관)
 
 DEFAULT_ALPHA = 0.5  # EMA 가중 (최근 선호 반영 강도)
 SCORE_MIN, SCORE_MAX = 0.0, 100.0
 
-def _load_df():
-    if os.path.exists(PREF_PATH):
-        return pd.read_parquet(PREF_PATH)
-    return pd.DataFrame(columns=["user_id","food_name","ema_score","count","updated_ts"])
+# 없으면 추가(첫 점수 그대로), 있으면 EMA 갱신 → 행 하나만 건드리는 PK 업서트
+UPSERT_SQL = (
+    "INSERT INTO user_food_prefs (user_id, food_name, ema_score, count, updated_ts) VALUES (?, ?, ?, 1, ?) "
+    "ON CONFLICT(user_id, food_name) DO UPDATE SET "
+    f"ema_score = MAX({SCORE_MIN}, MIN({SCORE_MAX}, ? * excluded.ema_score + (1 - ?) * ema_score)), "
+    "count = count + 1, updated_ts = excluded.updated_ts"
+)
 
-def _save_df(df):
-    os.makedirs(DATA_DIR, exist_ok=True)
-    df.to_parquet(PREF_PATH, index=False)
+_ready = False
+_ready_lock = threading.Lock()
 
-def rate(user_id:str, food_name:str, rating:int, alpha:float=DEFAULT_ALPHA):
-    """
-    rating: 1~5 (별점) → 0~100 점수로 변환해 EMA 갱신
-    """
-    df = _load_df()
 
+def _ensure_store():
+    """테이블 생성 + 기존 parquet 이관 (프로세스당 1회)"""
+    global _ready
+    if _ready:
+        return
+    with _ready_lock:
+        if _ready:
+            return
+        with db.engine.begin() as conn:
+            # 쓰기 잠금을 먼저 잡고 생성/이관 → 여러 프로세스가 동시에 시작해도 1번만 실행
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            db.UserFoodPreference.__table__.create(bind=conn, checkfirst=True)
+            empty = conn.exec_driver_sql("SELECT 1 FROM user_food_prefs LIMIT 1").fetchone() is None
+            if empty and os.path.exists(PREF_PATH):
+                df = pd.read_parquet(PREF_PATH)
+                rows = [
+                    (str(r.user_id), str(r.food_name), float(r.ema_score), int(r.count), int(r.updated_ts))
+                    for r in df.itertuples(index=False)
+                ]
+                if rows:
+                    conn.exec_driver_sql(
+                        "INSERT OR IGNORE INTO user_food_prefs (user_id, food_name, ema_score, count, updated_ts) "
+                        "VALUES (?, ?, ?, ?, ?)", rows,
+                    )
+                    print(f"[user_prefs] {PREF_PATH} → user_food_prefs 이관 ({len(rows)} rows)")
+        _ready = True
+
+
+def _to_score(rating) -> float:
     # 1~5 → 0~100 변환 (가중치 선형 매핑)
     rating = max(1, min(5, int(rating)))
-    new_score = (rating - 1) / 4 * 100.0
+    return (rating - 1) / 4 * 100.0
+
 
-    idx = (df["user_id"]==user_id) & (df["food_name"]==food_name)
-    if idx.any():
-        row = df[idx].iloc[0]
-        ema_prev = float(row["ema_score"])
-        cnt_prev = int(row["count"])
-        ema_new = alpha*new_score + (1-alpha)*ema_prev
-        df.loc[idx, "ema_score"] = max(SCORE_MIN, min(SCORE_MAX, ema_new))
-        df.loc[idx, "count"] = cnt_prev + 1
-        df.loc[idx, "updated_ts"] = int(time.time())
-    else:
-        df.loc[len(df)] = {
-            "user_id": user_id,
-            "food_name": food_name,
-            "ema_score": float(new_score),
-            "count": 1,
-            "updated_ts": int(time.time())
-        }
-    _save_df(df)
+def _upsert(conn, user_id: str, items: Iterable[Tuple[str, float]], alpha: float):
+    now = int(time.time())
+    params = [(user_id, food, score, now, alpha, alpha) for food, score in items]
+    if params:
+        conn.exec_driver_sql(UPSERT_SQL, params)
+
+
+def rate(user_id:str, food_name:str, rating:int, alpha:float=DEFAULT_ALPHA):
+    """
+    rating: 1~5 (별점) → 0~100 점수로 변환해 EMA 갱신
+    """
+    _ensure_store()
+    new_score = _to_score(rating)
+    with db.engine.begin() as conn:
+        _upsert(conn, user_id, [(food_name, new_score)], alpha)
     return float(new_score)
 
 def bulk_rate(user_id:str, feedbacks:dict, alpha:float=DEFAULT_ALPHA):
     """
-    feedbacks: {food_name: rating(1~5), ...}
+    feedbacks: {food_name: rating(1~5), ...} → 한 트랜잭션에서 일괄 업서트
     """
-    for food, r in feedbacks.items():
-        rate(user_id, food, r, alpha=alpha)
+    _ensure_store()
+    with db.engine.begin() as conn:
+        _upsert(conn, user_id, [(food, _to_score(r)) for food, r in feedbacks.items()], alpha)
 
-def get_user_pref_map(user_id:str) -> dict:
-    df = _load_df()
-    df = df[df["user_id"]==user_id]
-    return {r["food_name"]: float(r["ema_score"]) for _,r in df.iterrows()}
+def get_user_pref_map(user_id:str) -> Dict[str, float]:
+    _ensure_store()
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT food_name, ema_score FROM user_food_prefs WHERE user_id = ?", (user_id,)
+        ).fetchall()
+    return {food: float(score) for food, score in rows}
 
 if __name__ == "__main__":
     # quick test
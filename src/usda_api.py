@@ -1,16 +1,78 @@
 import requests
 import os
+import json
+import time
+
+from src import db
 
 USDA_API_KEY = os.getenv("USDA_API_KEY", "NWV0qcDRTdPxcxLmebG1nsi2sPDYITi56HIoiZy3")
 BASE_URL = "https://api.nal.usda.gov/fdc/v1/foods/search"
 
+# 검색 응답 캐시 유지 시간(초). 결과 없음은 짧게 (USDA 데이터가 추가될 수 있음)
+USDA_CACHE_TTL = float(os.getenv("USDA_CACHE_TTL", str(30 * 24 * 3600)))
+USDA_NEGATIVE_TTL = float(os.getenv("USDA_NEGATIVE_TTL", str(24 * 3600)))
+USDA_TIMEOUT = float(os.getenv("USDA_TIMEOUT", "10"))
+
+
+def _cache_key(query: str, page_size: int) -> str:
+    """대소문자/연속 공백 차이는 같은 검색어로 취급"""
+    return f"{' '.join(query.lower().split())}|{page_size}"
+
+
+def _cache_get(key: str):
+    """(hit 여부, 응답 dict 또는 None)"""
+    session = db.SessionLocal()
+    try:
+        row = session.get(db.UsdaQueryCache, key)
+        if row is None or row.expires_at <= time.time():
+            return False, None
+        return True, (json.loads(row.response) if row.response else None)
+    finally:
+        session.close()
+
+
+def _cache_put(key: str, body):
+    foods = (body or {}).get("foods") or []
+    now = time.time()
+    ttl = USDA_CACHE_TTL if foods else USDA_NEGATIVE_TTL
+    session = db.SessionLocal()
+    try:
+        session.merge(db.UsdaQueryCache(
+            query=key,
+            response=json.dumps(body, ensure_ascii=False) if foods else None,
+            hit_count=len(foods),
+            fetched_at=now,
+            expires_at=now + ttl,
+        ))
+        session.commit()
+    finally:
+        session.close()
+
+
 def search_usda_food(query: str, page_size: int = 5):
+    """
+    USDA FoodData Central 검색. 캐시(SQLite) → API 순.
+    결과 없음도 캐시해 같은 검색어로 반복 호출하지 않음. HTTP 오류는 캐시하지 않고 None.
+    결과가 없으면 None.
+    """
+    key = _cache_key(query, page_size)
+    hit, body = _cache_get(key)
+    if hit:
+        return body
+
     params = {
         "query": query,
         "pageSize": page_size,
         "api_key": USDA_API_KEY
     }
-    response = requests.get(BASE_URL, params=params)
+    try:
+        response = requests.get(BASE_URL, params=params, timeout=USDA_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"[USDA] 요청 실패: {e}")
+        return None
     if response.status_code != 200:
         return None
-    return response.json()
+
+    body = response.json()
+    _cache_put(key, body)
+    return body if body.get("foods") else None
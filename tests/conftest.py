@@ -0,0 +1,14 @@
+# tests/conftest.py
+import pytest
+from sqlalchemy import create_engine
+
+from src import db
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """db.engine을 임시 SQLite 파일로 교체 (실제 food_db.sqlite는 건드리지 않음)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.sqlite'}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(db, "engine", engine)
+    yield engine
+    engine.dispose()
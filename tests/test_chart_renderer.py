@@ -0,0 +1,63 @@
+# tests/test_chart_renderer.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from src import db
+from src.routers import score_trend
+from src.services import chart_renderer
+from src.services.chart_renderer import ChartTimeout
+
+SPEC = {"title": "t", "series": [{"x": [1, 2, 3], "y": [1, 4, 9]}]}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    chart_renderer.clear_cache()
+    yield
+    chart_renderer.clear_cache()
+
+
+def test_render_inline_without_pool(monkeypatch):
+    monkeypatch.setattr(chart_renderer, "_get_pool", lambda: None)
+    png = chart_renderer.get_chart_png("t", "u1", SPEC)
+    assert png.startswith(b"\x89PNG")
+    assert chart_renderer.get_chart_png("t", "u1", SPEC) is png   # 캐시 적중
+
+
+def test_slow_render_raises_chart_timeout(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(chart_renderer, "_get_pool", lambda: pool)
+    monkeypatch.setattr(chart_renderer, "render_line_chart", lambda spec: time.sleep(0.5) or b"png")
+    monkeypatch.setattr(chart_renderer, "CHART_RENDER_TIMEOUT", 0.05)
+    try:
+        with pytest.raises(ChartTimeout):
+            chart_renderer.get_chart_png("t", "u1", SPEC)
+    finally:
+        pool.shutdown(wait=True)
+    assert not chart_renderer._cache   # 실패한 렌더링은 캐시하지 않음
+
+
+def test_router_maps_chart_timeout_to_504(temp_db, monkeypatch):
+    db.DailyHealthScore.__table__.create(bind=temp_db)
+    Session = sessionmaker(bind=temp_db)
+    with Session() as session:
+        session.add(db.DailyHealthScore(user_id="u1", date=date.today(), total_score=70.0))
+        session.commit()
+
+    def slow(*args):
+        raise ChartTimeout("차트 렌더링 시간 초과")
+
+    monkeypatch.setattr(score_trend, "get_chart_png", slow)
+    app = FastAPI()
+    app.include_router(score_trend.router)
+    app.dependency_overrides[score_trend.get_db] = lambda: Session()
+
+    res = TestClient(app).get("/score/trend/daily/u1")
+    assert res.status_code == 504
+    assert res.json()["detail"] == "차트 렌더링 시간 초과"
@@ -0,0 +1,58 @@
+# tests/test_feedback_store.py
+import json
+import multiprocessing as mp
+
+import pytest
+
+from src.services import feedback_store as fs
+
+
+@pytest.fixture
+def store(tmp_path, temp_db, monkeypatch):
+    monkeypatch.setattr(fs, "LEGACY_PATH", str(tmp_path / "user_feedback.json"))
+    monkeypatch.setattr(fs, "_ready", False)
+    return temp_db
+
+
+def test_append_updates_aggregate(store):
+    for rating in [5, 3, 4]:
+        fs.append_feedback({"user_id": "u1", "food_name": "현미밥", "rating": rating})
+    fs.append_feedback({"user_id": "u1", "food_name": "두부", "rating": 2})
+    fs.append_feedback({"user_id": "u2", "food_name": "현미밥", "rating": 1})
+
+    ratings = fs.get_user_food_ratings("u1")
+    assert ratings["현미밥"] == {"count": 3, "avg": 4.0, "last": 4.0}
+    assert ratings["두부"]["count"] == 1
+    assert fs.food_feedback_scores("u1") == {"현미밥": 80.0, "두부": 40.0}
+    # 사용자 미지정: 가장 최근 평가 기준
+    assert fs.food_feedback_scores()["현미밥"] == 20.0
+
+
+def test_unrated_feedback_is_logged_only(store):
+    fs.append_feedback({"user_id": "u1", "food_name": "현미밥", "comment": "맛있음", "rating": "bad"})
+    with store.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM user_feedback").scalar() == 1
+    assert fs.get_user_food_ratings("u1") == {}
+
+
+def _first_use(i):
+    fs._ready = False
+    fs.append_feedback({"user_id": f"p{i}", "food_name": "두부", "rating": 5})
+
+
+def test_legacy_import_once_under_concurrent_first_use(store):
+    legacy = [{"user_id": "u1", "food_name": "현미밥", "rating": r, "timestamp": "2024-01-01"} for r in (5, 4)]
+    with open(fs.LEGACY_PATH, "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+
+    ctx = mp.get_context("fork")
+    procs = [ctx.Process(target=_first_use, args=(i,)) for i in range(6)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    assert fs.get_user_food_ratings("u1")["현미밥"]["count"] == 2
+    with store.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM user_feedback").scalar() == 2 + 6
@@ -0,0 +1,149 @@
+# tests/test_food_pair_trainer.py
+import functools
+import json
+import os
+
+import pytest
+
+from src.services import food_pair_trainer as fpt
+
+MEALS = [
+    ["현미밥", "닭가슴살", "샐러드"],
+    ["잡곡밥", "두부", "나물"],
+    ["현미밥", "두부", "샐러드"],
+    ["고구마", "계란", "브로콜리"],
+    ["현미밥", "닭가슴살", "브로콜리"],
+]
+
+
+def _day(i: int) -> str:
+    meals = [MEALS[(i + k) % len(MEALS)] for k in range(3)]
+    plan = {"meals": [{"items": [{"food_name": f} for f in m]} for m in meals]}
+    return json.dumps({"daily_plan": plan}, ensure_ascii=False) + "\n"
+
+
+def _append(path, days):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(_day(i) for i in days)
+
+
+@pytest.fixture
+def trainer(tmp_path, temp_db, monkeypatch):
+    out_parquet, out_json = str(tmp_path / "pairs.parquet"), str(tmp_path / "pairs.json")
+    monkeypatch.setattr(fpt, "FOOD_DB_PATH", str(tmp_path / "missing.parquet"))   # 유효 음식 필터 없음
+    monkeypatch.setattr(fpt, "PAIR_OUT_JSON", out_json)
+    monkeypatch.setattr(fpt, "write_outputs", functools.partial(fpt.write_outputs, parquet_path=out_parquet, json_path=out_json))
+    return str(tmp_path / "meal_logs.jsonl"), out_json
+
+
+def _counts(engine):
+    with engine.connect() as conn:
+        return (
+            conn.exec_driver_sql("SELECT food_name, count FROM food_single_counts ORDER BY 1").fetchall(),
+            conn.exec_driver_sql("SELECT food_a, food_b, count_ab FROM food_pair_counts ORDER BY 1, 2").fetchall(),
+            conn.exec_driver_sql("SELECT offset, n_meals, refresh_meals FROM food_pair_trainer_state").fetchall(),
+        )
+
+
+def test_accumulated_counters_match_batch(trainer, temp_db):
+    log_path, _ = trainer
+    _append(log_path, range(0, 20))
+    fpt.train_from_logs(log_path)
+    _append(log_path, range(20, 45))
+    fpt.train_from_logs(log_path)
+    _append(log_path, range(45, 48))   # 증분 경로
+    fpt.train_from_logs(log_path)
+    assert fpt.check_parity(log_path) <= 1e-9   # 누적 카운트 → 점수 == 로그 일괄 학습
+
+    # 전체 재계산 후에는 저장된 pmi/lift/score도 일괄 학습 결과와 같음
+    fpt.train_from_logs(log_path, full=True)
+    stored = {k: v for k, v in _stored_scores(temp_db).items() if v[2] is not None}
+    batch = fpt._train_in_memory(fpt.iter_logs(log_path), write=False).set_index(["food_a", "food_b"])
+    assert set(stored) == set(batch.index)
+    for key, values in stored.items():
+        assert values == pytest.approx(tuple(batch.loc[key, ["pmi", "lift", "score"]]))
+
+
+def _stored_scores(engine):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT food_a, food_b, pmi, lift, score FROM food_pair_counts").fetchall()
+    return {(a, b): (pmi, lift, score) for a, b, pmi, lift, score in rows}
+
+
+def test_incremental_rescores_only_touched_pairs(trainer, temp_db):
+    log_path, _ = trainer
+    _append(log_path, range(0, 40))
+    fpt.train_from_logs(log_path)
+    before = _stored_scores(temp_db)
+    (_, n_meals, refresh_meals), = _counts(temp_db)[2]
+    assert refresh_meals == n_meals == 120
+
+    # 전체 재계산 기준(N × (1 + FULL_REFRESH_RATIO))보다 적은 끼니: 현미밥/두부/샐러드 한 끼 × 6
+    meal = {"items": [{"food_name": f} for f in ["현미밥", "두부", "샐러드"]]}
+    with open(log_path, "a", encoding="utf-8") as f:
+        for _ in range(2):
+            f.write(json.dumps({"daily_plan": {"meals": [meal] * 3}}, ensure_ascii=False) + "\n")
+    fpt.train_from_logs(log_path)
+
+    after = _stored_scores(temp_db)
+    (_, n_meals, refresh_meals), = _counts(temp_db)[2]
+    assert (n_meals, refresh_meals) == (126, 120)   # 증분 경로 (전체 재계산 아님)
+
+    touched = {("두부", "샐러드"), ("두부", "현미밥"), ("샐러드", "현미밥")}
+    assert touched <= set(after)
+    with temp_db.connect() as conn:
+        expected = fpt._score_all(conn, n_meals).set_index(["food_a", "food_b"])
+    for key in touched:
+        assert after[key] != before.get(key)
+        assert after[key] == pytest.approx(tuple(expected.loc[key, ["pmi", "lift", "score"]]), nan_ok=True)
+
+    untouched = set(before) - touched
+    assert untouched
+    for key in untouched:
+        assert after[key] == before[key]
+    # 건너뛴 페어는 N 변화만큼 전체 재계산 값과 달라짐 → 다음 전체 재계산에서 반영
+    stale = [k for k in untouched if before[k][2] is not None]
+    assert any(after[k][2] != pytest.approx(expected.loc[k, "score"]) for k in stale)
+
+
+def test_check_parity_is_read_only(trainer, temp_db):
+    log_path, out_json = trainer
+    _append(log_path, range(0, 30))
+    fpt.train_from_logs(log_path)
+    _append(log_path, range(30, 40))   # 아직 학습 안 한 로그 → check는 저장된 offset까지만 비교
+    before, mtime = _counts(temp_db), os.path.getmtime(out_json)
+
+    fpt.check_parity(log_path)
+
+    assert _counts(temp_db) == before
+    assert os.path.getmtime(out_json) == mtime
+
+
+def test_missing_log_keeps_counters(trainer, temp_db):
+    log_path, _ = trainer
+    _append(log_path, range(0, 20))
+    fpt.train_from_logs(log_path)
+    before = _counts(temp_db)
+
+    os.remove(log_path)   # 로테이션 등으로 잠시 없음
+    fpt.train_from_logs(log_path)
+    assert _counts(temp_db)[:2] == before[:2]
+    assert _counts(temp_db)[2][0][:2] == before[2][0][:2]
+
+    with pytest.raises(FileNotFoundError):
+        fpt.train_from_logs(log_path, rebuild=True)
+    assert _counts(temp_db)[:2] == before[:2]
+
+
+def test_truncated_log_rebuilds(trainer, temp_db):
+    log_path, _ = trainer
+    _append(log_path, range(0, 30))
+    fpt.train_from_logs(log_path)
+
+    os.remove(log_path)
+    _append(log_path, range(0, 10))   # offset보다 작은 새 파일
+    fpt.train_from_logs(log_path)
+    offset, n_meals, _ = _counts(temp_db)[2][0]
+    assert offset == os.path.getsize(log_path)
+    assert n_meals == 30
+    assert fpt.check_parity(log_path) <= 1e-9
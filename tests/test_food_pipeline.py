@@ -0,0 +1,45 @@
+# tests/test_food_pipeline.py
+from src.services import food_pipeline as fp
+
+
+def test_code_deps_follow_project_imports():
+    deps = fp.code_deps("src.services.extend_food_db")
+    assert {"src.services.extend_food_db", "src.services.food_quality",
+            "src.services.ai_meal_quality", "src.services.food_table"} <= set(deps)
+    assert not any(m.split(".")[0] in ("pandas", "numpy", "os") for m in deps)
+
+
+def _write(root, module, source):
+    path = root.joinpath(*module.split(".")).with_suffix(".py")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(source, encoding="utf-8")
+    return path
+
+
+def test_stage_key_changes_with_indirect_dependency(tmp_path, monkeypatch):
+    monkeypatch.setattr(fp, "PROJECT_ROOT", str(tmp_path))
+    _write(tmp_path, "pkg.__init__", "")
+    _write(tmp_path, "pkg.stage", "import os\nfrom pkg import helper\n\ndef run(out_path):\n    helper.go()\n")
+    helper = _write(tmp_path, "pkg.helper", "def go():\n    from pkg.scoring import score\n    return score()\n")
+    scoring = _write(tmp_path, "pkg.scoring", "def score():\n    return 1\n")
+    monkeypatch.setitem(fp.STAGES, "demo", {"run": "pkg.stage:run", "inputs": {}, "outputs": {}})
+
+    assert set(fp.code_deps("pkg.stage")) == {"pkg", "pkg.stage", "pkg.helper", "pkg.scoring"}
+    key = fp.stage_key("demo")
+    scoring.write_text("def score():\n    return 2\n", encoding="utf-8")
+    assert fp.stage_key("demo") != key
+    key = fp.stage_key("demo")
+    helper.write_text(helper.read_text(encoding="utf-8") + "# 주석\n", encoding="utf-8")
+    assert fp.stage_key("demo") != key
+
+
+def test_score_stage_key_tracks_model_file(tmp_path, monkeypatch):
+    model = tmp_path / "health_score_model.pkl"
+    model.write_bytes(b"model-v1")
+    monkeypatch.setitem(fp.STAGES, "score", {**fp.STAGES["score"], "extra_inputs": [str(model)]})
+    key = fp.stage_key("score")
+    assert fp.stage_key("score") == key
+    model.write_bytes(b"model-v2")
+    assert fp.stage_key("score") != key
+    # 모델은 의존 관계를 만들지 않음 (ml_score → ... → score 순환 방지)
+    assert fp.stage_deps("score") == {"extend", "cluster_stage1"}
@@ -0,0 +1,79 @@
+# tests/test_food_quality.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.food_quality import (
+    GOALS,
+    add_or_recalculate_health_scores,
+    calculate_health_score_row,
+    calculate_health_scores,
+    check_parity,
+)
+
+
+def _row_scores(df: pd.DataFrame, goal) -> np.ndarray:
+    return df.apply(lambda r: calculate_health_score_row(r, goal=goal), axis=1).to_numpy(dtype=float)
+
+
+@pytest.fixture
+def messy_foods() -> pd.DataFrame:
+    """결측 / 숫자가 아닌 문자열 / 범위 밖 값이 섞인 표"""
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        "sugar_g": rng.uniform(0, 60, n),
+        "sodium_mg": rng.uniform(0, 3000, n),
+        "fiber_g": rng.uniform(0, 15, n),
+        "protein_g": rng.uniform(0, 60, n),
+        "glycemic_index": rng.uniform(20, 100, n),
+        "processing_level": rng.integers(1, 6, n).astype(float),
+    }).astype(object)
+    for i, col in enumerate(df.columns):
+        df.loc[df.sample(frac=0.1, random_state=i).index, col] = np.nan
+    df.loc[0:4, "sugar_g"] = ["n/a", "", "12.5", None, "abc"]
+    df.loc[5:7, "sodium_mg"] = ["1,200", "300", "-"]
+    # 범위 밖: 음수, GI 100 초과, 가공도 5 초과, 점수가 0 아래/100 위로 잘리는 값
+    df.loc[10, ["sugar_g", "fiber_g", "protein_g"]] = [-5.0, -3.0, -10.0]
+    df.loc[11, ["glycemic_index", "processing_level"]] = [180.0, 9.0]
+    df.loc[12, "sodium_mg"] = 1e6
+    df.loc[13, ["protein_g", "fiber_g"]] = [500.0, 80.0]
+    return df
+
+
+@pytest.mark.parametrize("goal", GOALS)
+def test_vectorized_matches_row_for_each_goal(messy_foods, goal):
+    col = "health_score" if goal is None else f"health_score_{goal}"
+    vec = calculate_health_scores(messy_foods, [goal])[col].to_numpy()
+    np.testing.assert_allclose(vec, _row_scores(messy_foods, goal), rtol=0, atol=1e-9)
+
+
+def test_scores_are_clipped_to_0_100(messy_foods):
+    scores = calculate_health_scores(messy_foods)
+    assert scores.to_numpy().min() >= 0.0
+    assert scores.to_numpy().max() <= 100.0
+    assert scores.loc[12, "health_score"] == 0.0     # 나트륨 1,000,000mg
+    assert scores.loc[13, "health_score"] == 100.0   # 단백질/섬유 과다
+
+
+def test_check_parity(messy_foods):
+    assert check_parity(messy_foods) <= 1e-9
+
+
+def test_missing_columns_use_row_defaults():
+    df = pd.DataFrame({"protein_g": [10.0, None]})
+    for goal in GOALS:
+        col = "health_score" if goal is None else f"health_score_{goal}"
+        np.testing.assert_allclose(calculate_health_scores(df, [goal])[col], _row_scores(df, goal))
+
+
+def test_add_or_recalculate_all_goals(messy_foods):
+    out = add_or_recalculate_health_scores(messy_foods.copy(), goal="Diet", all_goals=True)
+    np.testing.assert_allclose(out["health_score"], _row_scores(messy_foods, "diet"), atol=1e-9)
+    for goal in GOALS[1:]:
+        np.testing.assert_allclose(out[f"health_score_{goal}"], _row_scores(messy_foods, goal), atol=1e-9)
+
+
+def test_unknown_goal_falls_back_to_default(messy_foods):
+    out = add_or_recalculate_health_scores(messy_foods.copy(), goal="unknown")
+    np.testing.assert_allclose(out["health_score"], _row_scores(messy_foods, None), atol=1e-9)
@@ -0,0 +1,99 @@
+# tests/test_food_scorer.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src import db
+from src.services import food_scorer as fs
+
+COLS = ["energy_kcal", "protein_g", "fat_g", "carb_g", "fiber_g", "sugar_g", "sodium_mg",
+        "glycemic_index", "processing_level", "hybrid_health_score"]
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    """합성 2차 군집 결과로 food_scorer.npz 생성 (모델 파일은 없음)"""
+    rng = np.random.default_rng(0)
+    n = 300
+    df = pd.DataFrame({c: rng.uniform(0, 100, n) for c in COLS})
+    df["food_group"] = rng.choice(["곡류", "육류", "채소"], n)
+    df["category_cluster"] = df["food_group"].map({"곡류": 0, "육류": 1, "채소": 2})
+    scaler = StandardScaler().fit(df[COLS])
+    kmeans = KMeans(n_clusters=4, random_state=0, n_init=3).fit(scaler.transform(df[COLS]))
+    df["nutrition_cluster"] = kmeans.labels_
+    df["ml_health_score"] = df["nutrition_cluster"] * 10.0 + 40.0   # 중심점별 평균 = 40/50/60/70
+
+    path = str(tmp_path / "food_scorer.npz")
+    fs.save_scorer_artifacts(df, COLS, df[COLS].mean(), scaler, kmeans, path)
+    monkeypatch.setattr(fs, "SCORER_PATH", path)
+    monkeypatch.setitem(fs._state, "mtime", None)
+    return path
+
+
+def _food(**kw):
+    values = dict(name="닭가슴살", calories=120, protein=23, fat=2, carbs=0, fiber=0, sugar=0, sodium=60,
+                  glycemic_index=50, processing_level=1)
+    return db.Food(**{**values, **kw})
+
+
+def test_centroid_ml_is_persisted(artifacts):
+    with np.load(artifacts) as z:
+        assert sorted(z["centroid_ml"].tolist()) == [40.0, 50.0, 60.0, 70.0]
+
+
+def test_apply_to_food_uses_centroids_not_model(artifacts, monkeypatch):
+    monkeypatch.setattr(fs, "_model", lambda: pytest.fail("request path must not load the model"))
+    food = _food()
+    assert fs.apply_to_food(food)
+
+    art = fs._artifacts()
+    assert food.ml_health_score == art["centroid_ml"][food.nutrition_cluster]
+    assert food.category_cluster == art["default_category_cluster"] or food.category_cluster in art["group_map"].values()
+    assert 0 <= food.health_score <= 100
+
+
+def test_single_row_matches_vectorized_centroid_path(artifacts):
+    foods = [_food(name=f"음식{i}", calories=float(i * 37 % 500), sugar=float(i % 30), sodium=None) for i in range(20)]
+    for f in foods:
+        fs.apply_to_food(f)
+
+    art = fs._artifacts()
+    frame = pd.DataFrame({feat: [getattr(f, attr) for f in foods] for attr, feat in fs.FOOD_FEATURES.items()})
+    X = frame.reindex(columns=art["cols"]).to_numpy(dtype=float)
+    rule = fs.calculate_health_scores(frame, goals=[None])["health_score"].to_numpy()
+    cluster, ml, hybrid = fs.centroid_scores(X, rule, art)
+
+    assert [f.nutrition_cluster for f in foods] == cluster.tolist()
+    assert np.allclose([f.ml_health_score for f in foods], ml)
+    assert np.allclose([f.hybrid_health_score for f in foods], hybrid)
+
+
+def test_update_rescores_only_when_nutrients_change(artifacts, temp_db, monkeypatch):
+    db.Food.__table__.create(bind=temp_db)
+    monkeypatch.setattr(fs, "_registered", False)
+    fs.register_food_scoring()
+    session = sessionmaker(bind=temp_db)()
+    try:
+        food = _food()
+        session.add(food)
+        session.commit()
+        scored = food.health_score
+        assert scored is not None
+
+        food.health_score = 1.0            # load_db 파이프라인이 쓴 값이라고 가정
+        food.company = "다른 업체"
+        session.commit()
+        assert food.health_score == 1.0
+
+        food.sugar, food.protein = 30, 5
+        session.commit()
+        expected = fs.calculate_health_score_row({feat: getattr(food, attr) for attr, feat in fs.FOOD_FEATURES.items()})
+        assert food.health_score == pytest.approx(expected) and expected != scored
+    finally:
+        session.close()
+        event.remove(db.Food, "before_insert", fs._on_food_write)
+        event.remove(db.Food, "before_update", fs._on_food_update)
@@ -0,0 +1,113 @@
+# tests/test_gemini_stream.py
+import json
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test")   # chat_coach 라우터는 import 시 키 확인
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.routers import chat_coach
+from src.services import gemini_client
+from src.services.gemini_client import GeminiError, stream_gemini
+
+CHUNKS = ["안녕하세요, 코치입니다. ", "단백질 섭취가 부족해요 — 닭가슴살·두부를 추천합니다. ", "화이팅! 💪"]
+
+
+def _event(text: str) -> bytes:
+    body = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    return f"data: {json.dumps(body, ensure_ascii=False)}\r\n\r\n".encode("utf-8")
+
+
+class _Stub(BaseHTTPRequestHandler):
+    """streamGenerateContent(alt=sse) 흉내: charset 없는 text/event-stream, 이벤트마다 HTTP chunk 1개"""
+    protocol_version = "HTTP/1.1"
+    mode = "ok"
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        if self.mode == "disconnect":
+            # 첫 조각만 보내고 종료 chunk 없이 연결 끊기
+            self._chunk(_event(CHUNKS[0]))
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        for text in CHUNKS:
+            self._chunk(_event(text))
+        self._chunk(b'data: {"usageMetadata": {"totalTokenCount": 3}}\r\n\r\n')
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(gemini_client, "GEMINI_BASE_URL", f"http://127.0.0.1:{server.server_port}/models")
+    monkeypatch.setenv("LLM_CACHE_TTL_CHAT_COACH", "0")
+    monkeypatch.setattr(_Stub, "mode", "ok")
+    yield _Stub
+    server.shutdown()
+    server.server_close()
+
+
+def test_stream_decodes_utf8_without_charset(stub):
+    assert list(stream_gemini("질문")) == CHUNKS
+
+
+def test_stream_disconnect_raises_gemini_error(stub):
+    stub.mode = "disconnect"
+    received = []
+    with pytest.raises(GeminiError):
+        for text in stream_gemini("질문"):
+            received.append(text)
+    assert received == CHUNKS[:1]
+
+
+def _sse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    monkeypatch.setattr(chat_coach, "_build_coach_prompt", lambda user_id, message, session: ("프롬프트", {"weekly_score": 80}))
+    app = FastAPI()
+    app.include_router(chat_coach.router)
+    app.dependency_overrides[chat_coach.get_db] = lambda: None
+    return TestClient(app)
+
+
+def test_coach_stream_sse_events(client):
+    res = client.post("/chat/coach/stream", params={"user_id": "u1", "message": "단백질?"})
+    events = _sse_events(res.text)
+    assert [e for e, _ in events] == ["context", "chunk", "chunk", "chunk", "done"]
+    assert "".join(d["text"] for e, d in events if e == "chunk") == "".join(CHUNKS)
+
+
+def test_coach_stream_disconnect_ends_with_error_event(client, stub):
+    stub.mode = "disconnect"
+    res = client.post("/chat/coach/stream", params={"user_id": "u1", "message": "단백질?"})
+    events = _sse_events(res.text)
+    assert [e for e, _ in events] == ["context", "chunk", "error"]
+    assert events[1][1]["text"] == CHUNKS[0]
+    assert "Gemini API error" in events[-1][1]["detail"]
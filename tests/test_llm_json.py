@@ -0,0 +1,127 @@
+# tests/test_llm_json.py
+import time
+
+import pytest
+
+from src.services import llm_json
+from src.services.llm_json import LLMParseError, iter_json_candidates, parse_json, schema_errors
+
+MEAL_SCHEMA = {
+    "type": "OBJECT",
+    "required": ["meals"],
+    "properties": {
+        "meals": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "required": ["name", "calories"],
+                "properties": {
+                    "name": {"type": "STRING"},
+                    "calories": {"type": "NUMBER"},
+                    "note": {"type": "STRING", "nullable": True},
+                },
+            },
+        },
+    },
+}
+
+
+def test_direct_json():
+    assert parse_json('{"meals": []}', MEAL_SCHEMA) == {"meals": []}
+
+
+def test_extracts_from_fenced_block_with_prose():
+    text = '물론입니다! 식단입니다:\n```json\n{"meals": [{"name": "현미밥", "calories": 300}]}\n```\n맛있게 드세요 {웃음}'
+    assert parse_json(text, MEAL_SCHEMA) == {"meals": [{"name": "현미밥", "calories": 300}]}
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    text = 'x {"meals": [{"name": "닭 \\"}\\" {가슴살]", "calories": 1.5e2}]} y'
+    value = parse_json(text, MEAL_SCHEMA)
+    assert value["meals"][0]["name"] == '닭 "}" {가슴살]'
+    assert value["meals"][0]["calories"] == 150
+
+
+def test_skips_candidates_that_fail_schema():
+    text = '예시: {"foo": 1} 실제: {"meals": [{"name": "두부", "calories": 120, "note": null}]}'
+    assert parse_json(text, MEAL_SCHEMA)["meals"][0]["name"] == "두부"
+
+
+def test_schema_invalid_raises():
+    with pytest.raises(LLMParseError, match="스키마 불일치"):
+        parse_json('{"meals": [{"name": "두부", "calories": "많음"}]}', MEAL_SCHEMA)
+
+
+def test_no_json_raises():
+    with pytest.raises(LLMParseError, match="JSON을 찾을 수 없음"):
+        parse_json("죄송합니다, 지금은 답할 수 없어요. {깨진", MEAL_SCHEMA)
+
+
+def test_unbalanced_brackets_are_not_candidates():
+    assert list(iter_json_candidates('{"a": [1, 2}')) == []
+    # 가장 바깥 구간만 (안쪽은 parse_json이 스키마 불일치일 때만 탐색)
+    assert list(iter_json_candidates('[1, {"b": 2}] x {"c": 3}')) == ['[1, {"b": 2}]', '{"c": 3}']
+    # 짝 없는 괄호 안에서 닫힌 구간은 후보, 어긋난 괄호 뒤에서 다시 시작
+    assert list(iter_json_candidates('{설명 [1, {"b": 2}] 끝')) == ['[1, {"b": 2}]']
+    assert list(iter_json_candidates('{ [ {"a": 1} ] ] {"b": 2}')) == ['[ {"a": 1} ]', '{"b": 2}']
+
+
+def test_descends_into_schema_invalid_json_only():
+    wrapped = '결과: {"data": {"meals": [{"name": "두부", "calories": 120}]}}'
+    assert parse_json(wrapped, MEAL_SCHEMA)["meals"][0]["name"] == "두부"
+    # JSON이 아닌 바깥 구간은 안쪽을 다시 스캔하지 않고 건너뜀
+    with pytest.raises(LLMParseError, match="JSON을 찾을 수 없음"):
+        parse_json('{메모: {"meals": []} 끝}', MEAL_SCHEMA)
+
+
+def test_long_prose_is_linear():
+    # 예전 방식(여는 괄호마다 끝까지 재스캔)은 O(n²): 이 입력에서 2분 이상
+    unclosed = "{설명 " * 40_000 + '{"meals": [{"name": "현미밥", "calories": 300}]}'
+    nested = "{" * 20_000 + "산문" + "}" * 20_000 + ' {"meals": []}'
+    stray = "[주의] {메모} " * 20_000 + '{"meals": []}'
+    t0 = time.perf_counter()
+    assert parse_json(unclosed, MEAL_SCHEMA)["meals"][0]["name"] == "현미밥"
+    assert parse_json(nested, MEAL_SCHEMA) == {"meals": []}
+    assert parse_json(stray, MEAL_SCHEMA) == {"meals": []}
+    assert time.perf_counter() - t0 < 2.0
+
+
+def test_schema_errors_types():
+    assert schema_errors(3.0, {"type": "INTEGER"}) == []
+    assert schema_errors(3.5, {"type": "INTEGER"})
+    assert schema_errors(True, {"type": "NUMBER"})
+    assert schema_errors(None, {"type": "STRING"}) == ["$: null"]
+    assert schema_errors({"meals": [{"name": 1}]}, MEAL_SCHEMA) == [
+        "$.meals[0].calories: missing",
+        "$.meals[0].name: expected STRING, got int",
+    ]
+
+
+def test_metrics_recorded_per_endpoint():
+    ep = "test_llm_json_metrics"
+    parse_json('{"meals": []}', MEAL_SCHEMA, endpoint=ep)
+    parse_json('text {"meals": []}', MEAL_SCHEMA, endpoint=ep)
+    with pytest.raises(LLMParseError):
+        parse_json("nothing", MEAL_SCHEMA, endpoint=ep)
+    assert llm_json.parse_metrics()[ep] == {"direct": 1, "extracted": 1, "no_json": 1}
+
+
+def test_generate_json_validates_before_caching(monkeypatch):
+    calls = {}
+
+    def fake_generate_text(prompt, endpoint, generation_config=None, validate=None):
+        calls["config"] = generation_config
+        text = 'ok {"meals": [{"name": "연어", "calories": 200}]}'
+        validate(text)  # 캐시 저장 전 검증 (실패 시 예외가 전파되어 저장 안 됨)
+        return text
+
+    monkeypatch.setattr(llm_json, "generate_text", fake_generate_text)
+    value = llm_json.generate_json("p", endpoint="test", schema=MEAL_SCHEMA, check=lambda v: v["meals"])
+    assert value == [{"name": "연어", "calories": 200}]
+    assert calls["config"]["responseSchema"] is MEAL_SCHEMA
+
+    def bad_check(v):
+        raise ValueError("too few days")
+
+    with pytest.raises(ValueError, match="too few days"):
+        llm_json.generate_json("p", endpoint="test", schema=MEAL_SCHEMA, check=bad_check)
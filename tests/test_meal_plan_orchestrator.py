@@ -0,0 +1,27 @@
+# tests/test_meal_plan_orchestrator.py
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("GEMINI_API_KEY", "test")   # ai_meal_generator_gemini는 import 시 키 확인
+
+from src.services.meal_plan_orchestrator import _plan_json
+
+
+def _item(name, serving_g, kcal, protein, fat, carb, **extra):
+    return {"food_name": name, "serving_size_g": serving_g, "ps_energy_kcal": kcal,
+            "ps_protein_g": protein, "ps_fat_g": fat, "ps_carb_g": carb, **extra}
+
+
+def test_plan_json_uses_adjusted_serving():
+    # 현미밥 210g/300kcal → 1.5배 조정(315g, 450kcal), 계란은 고정 1인분 × 2
+    rice = _item("현미밥", 210, 450.0, 9.0, 3.0, 96.0, adjusted_serving_g=315.0, is_flexible=1)
+    egg = _item("계란", 50, 70.0, 6.0, 5.0, 0.5, multiplier=2)
+    day = {"meals": [{"meal_number": 1, "items": [rice, egg]}], "actual_daily": {"kcal": 590.4}}
+
+    plan = _plan_json(SimpleNamespace(goal="감량"), day)
+
+    rice_out, egg_out = plan["meals"][0]["foods"]
+    assert rice_out == {"name": "현미밥", "amount_g": 315, "calories": 450, "protein": 9.0, "fat": 3.0, "carb": 96.0}
+    assert egg_out["amount_g"] == 100 and egg_out["calories"] == 140
+    assert plan["meals"][0]["meal_type"] == "meal_1"
+    assert plan["goal"] == "감량" and plan["total_kcal"] == 590
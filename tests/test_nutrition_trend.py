@@ -0,0 +1,56 @@
+# tests/test_nutrition_trend.py
+import os
+from datetime import date, timedelta
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from sqlalchemy.orm import sessionmaker
+
+from src import db
+from src.services import nutrition
+from src.services.summary import recompute_daily_summaries
+
+
+def _setup(temp_db, days):
+    db.Base.metadata.create_all(temp_db)
+    session = sessionmaker(bind=temp_db)()
+    user = db.User(id="u1", name="t", age=30, sex="male", height=175, weight=70, goal="maintenance")
+    session.add(user)
+    for d, burned, intensity in days:
+        session.add(db.ExerciseLog(user_id="u1", date=d, duration_min=30, calories_burned=burned, intensity=intensity))
+    session.commit()
+    for d in sorted({d for d, _, _ in days}):
+        recompute_daily_summaries("u1", d, session)
+    return session, user
+
+
+def test_weekly_trend_reads_rollups(temp_db):
+    monday = date.today() - timedelta(days=date.today().weekday())
+    prev = monday - timedelta(weeks=1)
+    old = monday - timedelta(weeks=6)          # 4주 범위 밖
+    session, user = _setup(temp_db, [(prev, 200, 4), (prev + timedelta(days=1), 100, 2), (monday, 300, 6), (old, 500, 9)])
+
+    trends = nutrition.get_weekly_trend(user)
+
+    assert [t["week_start"] for t in trends] == [prev.isoformat(), monday.isoformat()]
+    assert trends[0]["week_end"] == (prev + timedelta(days=6)).isoformat()
+    assert trends[0]["avg_intensity"] == 3.0
+    bmr = nutrition._bmr(user)
+    assert trends[0]["avg_goal_calories"] == round(bmr + 300 / 7, 1)
+    assert trends[1]["avg_goal_calories"] == round(bmr + 300 / 7, 1)
+    session.close()
+
+
+def test_monthly_trend_reads_rollups(temp_db):
+    first = date.today().replace(day=1)
+    session, user = _setup(temp_db, [(first, 200, 4), (first, 100, 2)])
+
+    trends = nutrition.get_monthly_trend(user)
+
+    assert trends == [{
+        "month": first.strftime("%Y-%m"),
+        "total_exercise_cal": 300.0,
+        "avg_goal_calories": round(nutrition._bmr(user) + 300, 1),
+        "avg_intensity": 3.0,
+    }]
+    session.close()
@@ -0,0 +1,57 @@
+# tests/test_user_preference_updater.py
+import multiprocessing as mp
+
+import pandas as pd
+import pytest
+
+from src.services import user_preference_updater as up
+
+
+@pytest.fixture
+def store(tmp_path, temp_db, monkeypatch):
+    monkeypatch.setattr(up, "PREF_PATH", str(tmp_path / "user_prefs.parquet"))
+    monkeypatch.setattr(up, "_ready", False)
+    return temp_db
+
+
+def test_rate_inserts_then_applies_ema(store):
+    assert up.rate("u1", "현미밥", 5) == 100.0
+    up.rate("u1", "현미밥", 1)            # 0.5 * 0 + 0.5 * 100
+    up.rate("u1", "현미밥", 3, alpha=0.2)  # 0.2 * 50 + 0.8 * 50
+    up.rate("u2", "현미밥", 2)
+    assert up.get_user_pref_map("u1") == {"현미밥": 50.0}
+    assert up.get_user_pref_map("u2") == {"현미밥": 25.0}
+    with store.connect() as conn:
+        assert conn.exec_driver_sql(
+            "SELECT count FROM user_food_prefs WHERE user_id = 'u1' AND food_name = '현미밥'"
+        ).scalar() == 3
+
+
+def test_bulk_rate_clamps_ratings(store):
+    up.rate("u1", "두부", 5)
+    up.bulk_rate("u1", {"두부": 1, "닭가슴살": 9, "나물": -3}, alpha=1.0)
+    assert up.get_user_pref_map("u1") == {"두부": 0.0, "닭가슴살": 100.0, "나물": 0.0}
+
+
+def _first_use(i):
+    up._ready = False
+    up.rate(f"p{i}", "두부", 4)
+
+
+def test_legacy_import_once_under_concurrent_first_use(store):
+    pd.DataFrame({
+        "user_id": ["u1", "u1"], "food_name": ["현미밥", "두부"],
+        "ema_score": [80.0, 30.0], "count": [4, 1], "updated_ts": [0, 0],
+    }).to_parquet(up.PREF_PATH, index=False)
+
+    ctx = mp.get_context("fork")
+    procs = [ctx.Process(target=_first_use, args=(i,)) for i in range(6)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    assert up.get_user_pref_map("u1") == {"현미밥": 80.0, "두부": 30.0}
+    with store.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM user_food_prefs").scalar() == 2 + 6